@@ -0,0 +1,123 @@
+"""
+Throughput of the per-item todo endpoints against the /todos/bulk ones.
+
+    python -m benchmarks.bulk --items 2000 --batch 500
+"""
+
+import argparse
+import asyncio
+import json
+from time import perf_counter
+
+from benchmarks.common import bench_client, login, seed_users
+
+
+def payload(index: int) -> dict:
+    return {"title": f"todo {index}", "description": "benchmark"}
+
+
+async def per_item(client, headers, items: int) -> dict:
+    timings = {}
+
+    start = perf_counter()
+    ids = []
+    for index in range(items):
+        response = await client.post(
+            "/todos/", headers=headers, json=payload(index)
+        )
+        ids.append(response.json()["id"])
+    timings["create"] = perf_counter() - start
+
+    start = perf_counter()
+    for todo_id in ids:
+        await client.patch(
+            f"/todos/{todo_id}", headers=headers, json={"state": "done"}
+        )
+    timings["update"] = perf_counter() - start
+
+    start = perf_counter()
+    for todo_id in ids:
+        await client.delete(f"/todos/{todo_id}", headers=headers)
+    timings["delete"] = perf_counter() - start
+
+    return timings
+
+
+async def bulk(client, headers, items: int, batch: int) -> dict:
+    timings = {}
+    batches = [
+        range(start, min(start + batch, items))
+        for start in range(0, items, batch)
+    ]
+
+    start = perf_counter()
+    ids = []
+    for indexes in batches:
+        response = await client.post(
+            "/todos/bulk",
+            headers=headers,
+            json={"todos": [payload(index) for index in indexes]},
+        )
+        ids.extend(todo["id"] for todo in response.json()["todos"])
+    timings["create"] = perf_counter() - start
+
+    id_batches = [
+        ids[start : start + batch] for start in range(0, items, batch)
+    ]
+
+    start = perf_counter()
+    for todo_ids in id_batches:
+        await client.patch(
+            "/todos/bulk",
+            headers=headers,
+            json={
+                "todos": [
+                    {"id": todo_id, "state": "done"} for todo_id in todo_ids
+                ]
+            },
+        )
+    timings["update"] = perf_counter() - start
+
+    start = perf_counter()
+    for todo_ids in id_batches:
+        await client.request(
+            "DELETE", "/todos/bulk", headers=headers, json={"ids": todo_ids}
+        )
+    timings["delete"] = perf_counter() - start
+
+    return timings
+
+
+def items_per_second(timings: dict, items: int) -> dict:
+    return {
+        operation: round(items / seconds, 1)
+        for operation, seconds in timings.items()
+    }
+
+
+async def main(items: int, batch: int):
+    async with bench_client() as client:
+        await seed_users(1)
+        headers = await login(client, "user0@bench.com")
+
+        results = {
+            "items": items,
+            "batch": batch,
+            "per_item_per_second": items_per_second(
+                await per_item(client, headers, items), items
+            ),
+            "bulk_per_second": items_per_second(
+                await bulk(client, headers, items, batch), items
+            ),
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=2_000)
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.items, args.batch))
@@ -0,0 +1,135 @@
+"""
+Helpers shared by the benchmark scripts.
+
+Benchmarks drive the ASGI app in-process, against whatever DATABASE_URL
+points to: a local Postgres, or `sqlite+aiosqlite:///bench.db` (needs
+aiosqlite installed). The schema is dropped and recreated on every run.
+Rate limits and concurrency caps are off for the in-process app; start a
+server under test with RATE_LIMIT_ENABLED=false and ROUTE_MAX_CONCURRENCY=0.
+"""
+
+from contextlib import asynccontextmanager
+from statistics import mean
+from time import perf_counter
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import insert
+
+from src.todo_list.app import app
+from src.todo_list.database import engine
+from src.todo_list.limits import get_concurrency_limiter, get_rate_limiter
+from src.todo_list.models import Todo, TodoState, User, table_registry
+from src.todo_list.security import create_access_token, get_password_hash
+
+PASSWORD = "benchmark"
+SEED_CHUNK_SIZE = 5_000
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[round(pct / 100 * (len(ordered) - 1))]
+
+
+def summarize(samples: list[float]) -> dict:
+    """
+    samples are in seconds, the summary is in milliseconds.
+    """
+    return {
+        "count": len(samples),
+        "mean_ms": round(mean(samples) * 1000, 3),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+    }
+
+
+@asynccontextmanager
+async def bench_client(base_url: str | None = None):
+    """
+    In-process client by default. With `base_url`, requests go over HTTP to
+    a running server, which must use the same DATABASE_URL.
+    """
+    async with engine.begin() as conn:
+        await conn.run_sync(table_registry.metadata.drop_all)
+        await conn.run_sync(table_registry.metadata.create_all)
+
+    if base_url:
+        client = AsyncClient(base_url=base_url, timeout=30)
+    else:
+        app.dependency_overrides[get_rate_limiter] = lambda: None
+        app.dependency_overrides[get_concurrency_limiter] = lambda: None
+        client = AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://bench"
+        )
+
+    async with client:
+        yield client
+
+    app.dependency_overrides.clear()
+
+    await engine.dispose()
+
+
+async def measure(client, headers: dict, url: str, repeat: int) -> dict:
+    samples = []
+
+    for _ in range(repeat):
+        start = perf_counter()
+        response = await client.get(url, headers=headers)
+        samples.append(perf_counter() - start)
+        response.raise_for_status()
+
+    return summarize(samples)
+
+
+async def seed_users(count: int) -> list[int]:
+    """
+    Insert `count` users sharing the same password, hashed only once.
+    """
+    hashed = get_password_hash(PASSWORD)
+    rows = [
+        {
+            "name": f"user {i}",
+            "email": f"user{i}@bench.com",
+            "password": hashed,
+        }
+        for i in range(count)
+    ]
+
+    async with engine.begin() as conn:
+        result = await conn.execute(insert(User).returning(User.id), rows)
+        return list(result.scalars())
+
+
+async def seed_todos(user_id: int, count: int):
+    states = list(TodoState)
+
+    async with engine.begin() as conn:
+        for start in range(0, count, SEED_CHUNK_SIZE):
+            rows = [
+                {
+                    "title": f"todo {i}",
+                    "description": f"description for todo {i} ref {i:08x}",
+                    "state": states[i % len(states)],
+                    "user_id": user_id,
+                }
+                for i in range(start, min(start + SEED_CHUNK_SIZE, count))
+            ]
+            await conn.execute(insert(Todo), rows)
+
+
+async def login(client: AsyncClient, email: str) -> dict:
+    response = await client.post(
+        "/auth/login", data={"username": email, "password": PASSWORD}
+    )
+    response.raise_for_status()
+
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def auth_headers(email: str, user_id: int) -> dict:
+    """
+    Mint a token directly, skipping the Argon2 cost of a real login.
+    """
+    token = create_access_token({"sub": email, "uid": user_id})
+    return {"Authorization": f"Bearer {token}"}
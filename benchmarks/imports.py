@@ -0,0 +1,75 @@
+"""
+Rows per second through POST /todos/import, with the body generated and
+streamed as it is sent so the upload never sits in memory.
+
+    python -m benchmarks.imports --rows 1000000 --format csv
+"""
+
+import argparse
+import asyncio
+import json
+from time import perf_counter
+
+from benchmarks.common import bench_client, login, seed_users
+from src.todo_list.database import engine
+
+CHUNK_ROWS = 1_000
+
+
+async def body(rows: int, import_format: str):
+    if import_format == "csv":
+        yield b"title,description,state\n"
+        line = b"imported todo,generated by the import benchmark,doing\n"
+    else:
+        line = (
+            json.dumps({
+                "title": "imported todo",
+                "description": "generated by the import benchmark",
+                "state": "doing",
+            }).encode()
+            + b"\n"
+        )
+
+    for start in range(0, rows, CHUNK_ROWS):
+        yield line * min(CHUNK_ROWS, rows - start)
+
+
+async def main(rows: int, import_format: str):
+    async with bench_client() as client:
+        await seed_users(1)
+        headers = await login(client, "user0@bench.com")
+
+        start = perf_counter()
+        response = await client.post(
+            f"/todos/import?format={import_format}",
+            headers=headers,
+            content=body(rows, import_format),
+            timeout=None,
+        )
+        elapsed = perf_counter() - start
+        response.raise_for_status()
+
+    print(
+        json.dumps(
+            {
+                "dialect": engine.dialect.name,
+                "format": import_format,
+                "rows": rows,
+                **response.json(),
+                "seconds": round(elapsed, 2),
+                "rows_per_second": round(rows / elapsed, 1),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument(
+        "--format", dest="import_format", choices=["ndjson", "csv"]
+    )
+    args = parser.parse_args()
+
+    asyncio.run(main(args.rows, args.import_format or "ndjson"))
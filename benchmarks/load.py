@@ -0,0 +1,263 @@
+"""
+Load test: seed N users x M todos, then drive a weighted mix of API calls
+from concurrent clients and report RPS and latency percentiles.
+
+    python -m benchmarks.load --users 50 --todos 200 --concurrency 32
+    python -m benchmarks.load --mix list=60,filter=20,create=10,delete=10
+    python -m benchmarks.load --compare benchmarks/results/<commit>.json
+
+Results are written as JSON to benchmarks/results/<commit>.json (or
+--output) so runs from different commits can be diffed with --compare.
+Pass --base-url to load a running server instead of the in-process app;
+it has to share this process's DATABASE_URL, since seeding is done
+directly in the database.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+
+from benchmarks.common import (
+    PASSWORD,
+    auth_headers,
+    bench_client,
+    seed_todos,
+    seed_users,
+    summarize,
+)
+from src.todo_list.database import engine
+
+RESULTS_DIR = Path(__file__).parent / "results"
+DEFAULT_MIX = "login=2,list=50,filter=20,create=12,update=10,delete=6"
+
+
+async def op_login(client, user: dict) -> int:
+    response = await client.post(
+        "/auth/login", data={"username": user["email"], "password": PASSWORD}
+    )
+    return response.status_code
+
+
+async def op_list(client, user: dict) -> int:
+    response = await client.get("/todos/?limit=20", headers=user["headers"])
+    return response.status_code
+
+
+async def op_filter(client, user: dict) -> int:
+    state = random.choice(["draft", "todo", "doing", "done", "trash"])
+    response = await client.get(
+        f"/todos/?state={state}&limit=20", headers=user["headers"]
+    )
+    return response.status_code
+
+
+async def op_create(client, user: dict) -> int:
+    response = await client.post(
+        "/todos/",
+        headers=user["headers"],
+        json={"title": "load test", "description": "created under load"},
+    )
+    if response.is_success:
+        user["todo_ids"].append(response.json()["id"])
+    return response.status_code
+
+
+async def op_update(client, user: dict) -> int:
+    if not user["todo_ids"]:
+        return await op_list(client, user)
+
+    response = await client.patch(
+        f"/todos/{random.choice(user['todo_ids'])}",
+        headers=user["headers"],
+        json={"state": "doing"},
+    )
+    return response.status_code
+
+
+async def op_delete(client, user: dict) -> int:
+    if not user["todo_ids"]:
+        return await op_list(client, user)
+
+    todo_id = user["todo_ids"].pop(random.randrange(len(user["todo_ids"])))
+    response = await client.delete(
+        f"/todos/{todo_id}", headers=user["headers"]
+    )
+    return response.status_code
+
+
+OPERATIONS = {
+    "login": op_login,
+    "list": op_list,
+    "filter": op_filter,
+    "create": op_create,
+    "update": op_update,
+    "delete": op_delete,
+}
+
+
+def parse_mix(mix: str) -> dict[str, int]:
+    weights = {}
+
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in OPERATIONS:
+            raise SystemExit(f"Unknown operation {name!r} in --mix.")
+        weights[name] = int(weight)
+
+    return weights
+
+
+async def seed(users: int, todos: int) -> list[dict]:
+    user_ids = await seed_users(users)
+
+    for user_id in user_ids:
+        await seed_todos(user_id, todos)
+
+    # ids are contiguous per user on a freshly seeded table
+    return [
+        {
+            "email": f"user{index}@bench.com",
+            "headers": auth_headers(f"user{index}@bench.com", user_id),
+            "todo_ids": list(
+                range(index * todos + 1, (index + 1) * todos + 1)
+            ),
+        }
+        for index, user_id in enumerate(user_ids)
+    ]
+
+
+class Recorder:
+    def __init__(self):
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, dict[str, int]] = defaultdict(
+            lambda: defaultdict(int)
+        )
+
+    def record(self, name: str, elapsed: float, status):
+        self.samples[name].append(elapsed)
+        self.statuses[name][str(status)] += 1
+
+
+async def worker(client, users, weights, deadline, recorder: Recorder):
+    names = list(weights)
+    name_weights = list(weights.values())
+
+    while perf_counter() < deadline:
+        [name] = random.choices(names, weights=name_weights)
+        user = random.choice(users)
+
+        start = perf_counter()
+        try:
+            status = await OPERATIONS[name](client, user)
+        except Exception as exc:  # noqa: BLE001
+            status = type(exc).__name__
+        recorder.record(name, perf_counter() - start, status)
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: dict, previous: dict):
+    print(f"\n{previous['commit']} -> {current['commit']}")
+
+    for name, stats in current["operations"].items():
+        before = previous["operations"].get(name)
+        if not before:
+            continue
+
+        print(
+            f"{name:>8}: "
+            f"rps {before['rps']:>9.1f} -> {stats['rps']:>9.1f}  "
+            f"p50 {before['p50_ms']:>8.2f} -> {stats['p50_ms']:>8.2f} ms  "
+            f"p99 {before['p99_ms']:>8.2f} -> {stats['p99_ms']:>8.2f} ms"
+        )
+
+
+async def main(args):
+    weights = parse_mix(args.mix)
+    random.seed(args.seed)
+
+    async with bench_client(args.base_url) as client:
+        users = await seed(args.users, args.todos)
+
+        recorder = Recorder()
+
+        start = perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(
+            *(
+                worker(client, users, weights, deadline, recorder)
+                for _ in range(args.concurrency)
+            )
+        )
+        elapsed = perf_counter() - start
+
+    samples = recorder.samples
+    all_samples = [sample for values in samples.values() for sample in values]
+    result = {
+        "commit": current_commit(),
+        "timestamp": datetime.now(tz=timezone.utc).isoformat(),
+        "dialect": engine.dialect.name,
+        "config": {
+            "users": args.users,
+            "todos_per_user": args.todos,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "mix": weights,
+            "base_url": args.base_url,
+        },
+        "overall": {
+            **summarize(all_samples),
+            "rps": round(len(all_samples) / elapsed, 1),
+        },
+        "operations": {
+            name: {
+                **summarize(values),
+                "rps": round(len(values) / elapsed, 1),
+                "statuses": dict(recorder.statuses[name]),
+            }
+            for name, values in sorted(samples.items())
+        },
+    }
+
+    output = args.output or RESULTS_DIR / f"{result['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+
+    print(json.dumps(result, indent=2))
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(result, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--todos", type=int, default=100, help="per user")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--base-url")
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--compare", type=Path)
+
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,97 @@
+"""
+p99 latency of an unrelated endpoint (`GET /`) while a burst of logins is
+in flight.
+
+    python -m benchmarks.login_storm --logins 200
+    python -m benchmarks.login_storm --logins 200 --inline
+
+`--inline` hashes on the event loop, which is how login behaved before
+password hashing moved to `security.hashing_pool`.
+"""
+
+import argparse
+import asyncio
+import json
+from time import perf_counter
+
+from benchmarks.common import PASSWORD, bench_client, seed_users, summarize
+from src.todo_list.security import hashing_pool
+
+PROBE_INTERVAL = 0.01
+
+
+async def probe(client, stop: asyncio.Event) -> list[float]:
+    """
+    Fire `GET /` on a fixed schedule and measure from the intended send
+    time, so time spent waiting on a blocked event loop is counted.
+    """
+    samples = []
+    next_send = perf_counter()
+
+    while not stop.is_set():
+        await asyncio.sleep(max(0, next_send - perf_counter()))
+        await client.get("/")
+        samples.append(perf_counter() - next_send)
+        next_send += PROBE_INTERVAL
+
+    return samples
+
+
+async def storm(client, email: str, logins: int) -> dict:
+    statuses: dict[int, int] = {}
+
+    async def one_login():
+        response = await client.post(
+            "/auth/login", data={"username": email, "password": PASSWORD}
+        )
+        statuses[response.status_code] = (
+            statuses.get(response.status_code, 0) + 1
+        )
+
+    await asyncio.gather(*(one_login() for _ in range(logins)))
+
+    return statuses
+
+
+async def main(logins: int, inline: bool):
+    if inline:
+
+        async def run_inline(func, *args):
+            return func(*args)
+
+        hashing_pool.run = run_inline
+
+    async with bench_client() as client:
+        await seed_users(1)
+
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(client, stop))
+
+        start = perf_counter()
+        statuses = await storm(client, "user0@bench.com", logins)
+        elapsed = perf_counter() - start
+
+        stop.set()
+        samples = await probe_task
+
+    print(
+        json.dumps(
+            {
+                "mode": "inline" if inline else "pool",
+                "logins": logins,
+                "login_statuses": statuses,
+                "storm_seconds": round(elapsed, 3),
+                "probe": summarize(samples),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--inline", action="store_true")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.logins, args.inline))
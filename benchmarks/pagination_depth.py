@@ -0,0 +1,62 @@
+"""
+Latency of `GET /todos/` pages at increasing depth, offset vs cursor mode.
+
+    python -m benchmarks.pagination_depth --todos 100000
+
+Offset pages get slower the deeper they are, since the database still
+walks every skipped row; cursor pages should stay flat.
+"""
+
+import argparse
+import asyncio
+import json
+
+from benchmarks.common import (
+    bench_client,
+    login,
+    measure,
+    seed_todos,
+    seed_users,
+)
+from src.todo_list.pagination import encode_cursor
+
+
+async def main(todos: int, limit: int, repeat: int):
+    depths = sorted({0, todos // 100, todos // 10, todos - limit})
+    results = []
+
+    async with bench_client() as client:
+        [user_id] = await seed_users(1)
+        await seed_todos(user_id, todos)
+        headers = await login(client, "user0@bench.com")
+
+        for depth in depths:
+            # ids are contiguous on a freshly seeded table, so the cursor
+            # for depth N is simply the id of the N-th todo.
+            results.append({
+                "depth": depth,
+                "offset": await measure(
+                    client,
+                    headers,
+                    f"/todos/?limit={limit}&offset={depth}",
+                    repeat,
+                ),
+                "cursor": await measure(
+                    client,
+                    headers,
+                    f"/todos/?limit={limit}&cursor={encode_cursor(depth)}",
+                    repeat,
+                ),
+            })
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--todos", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.todos, args.limit, args.repeat))
@@ -0,0 +1,79 @@
+"""
+Latency of filtered `GET /todos/` calls with and without the trigram
+indexes on todos.
+
+    python -m benchmarks.search --todos 100000
+
+On Postgres every query runs twice: with the pg_trgm indexes, then again
+after dropping them (the schema is recreated on the next run). Other
+databases have no trigram indexes, so only one round is reported.
+"""
+
+import argparse
+import asyncio
+import json
+
+from sqlalchemy import text
+
+from benchmarks.common import (
+    bench_client,
+    login,
+    measure,
+    seed_todos,
+    seed_users,
+)
+from src.todo_list.database import engine
+
+TRIGRAM_INDEXES = ("ix_todos_title_trgm", "ix_todos_description_trgm")
+
+
+async def measure_all(client, headers, todos: int, repeat: int) -> dict:
+    # a reference token present in exactly one description
+    needle = f"{todos // 2:08x}"
+    urls = {
+        "search": f"/todos/?search={needle}",
+        "description": f"/todos/?description={needle}",
+        "search_miss": "/todos/?search=zzzzzz",
+    }
+
+    return {
+        name: await measure(client, headers, url, repeat)
+        for name, url in urls.items()
+    }
+
+
+async def main(todos: int, repeat: int):
+    results = {}
+
+    async with bench_client() as client:
+        [user_id] = await seed_users(1)
+        await seed_todos(user_id, todos)
+        headers = await login(client, "user0@bench.com")
+
+        async with engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                await conn.execute(text("ANALYZE todos"))
+
+        results["with_indexes"] = await measure_all(
+            client, headers, todos, repeat
+        )
+
+        if engine.dialect.name == "postgresql":
+            async with engine.begin() as conn:
+                for index in TRIGRAM_INDEXES:
+                    await conn.execute(text(f"DROP INDEX {index}"))
+
+            results["without_indexes"] = await measure_all(
+                client, headers, todos, repeat
+            )
+
+    print(json.dumps({"dialect": engine.dialect.name, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--todos", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.todos, args.repeat))
@@ -0,0 +1,125 @@
+"""
+Per-item cost of serving a `GET /todos/` page: ORM instances validated
+through TodoList against plain rows rendered by FastJSONResponse.
+
+    python -m benchmarks.serialization --limit 1000 --repeat 50
+
+Fetching and serializing are timed separately, then the endpoint is
+measured end to end with FAST_JSON_RESPONSES off and on.
+"""
+
+import argparse
+import asyncio
+import json
+from time import perf_counter
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from benchmarks.common import (
+    bench_client,
+    login,
+    measure,
+    seed_todos,
+    seed_users,
+)
+from src.todo_list import responses
+from src.todo_list.database import engine
+from src.todo_list.models import Todo
+from src.todo_list.responses import (
+    TODO_PUBLIC_COLUMNS,
+    FastJSONResponse,
+    todo_list_rows,
+)
+from src.todo_list.schemas import TodoList
+
+
+async def fetch_orm(session, user_id: int, limit: int) -> list:
+    todos = await session.scalars(
+        select(Todo).where(Todo.user_id == user_id).limit(limit)
+    )
+    return todos.all()
+
+
+def serialize_orm(todos: list) -> bytes:
+    # What FastAPI does with a response_model and the default JSONResponse
+    page = TodoList.model_validate({"todos": todos}, from_attributes=True)
+    return json.dumps(page.model_dump(mode="json")).encode()
+
+
+async def fetch_rows(session, user_id: int, limit: int) -> list:
+    rows = await session.execute(
+        select(*TODO_PUBLIC_COLUMNS)
+        .where(Todo.user_id == user_id)
+        .limit(limit)
+    )
+    return rows.all()
+
+
+def serialize_rows(rows: list) -> bytes:
+    return FastJSONResponse(
+        {"todos": [row._asdict() for row in rows], "next_cursor": None},
+        todo_list_rows,
+    ).body
+
+
+async def per_item_us(fetch, serialize, user_id, limit, repeat) -> dict:
+    fetch_seconds = serialize_seconds = 0.0
+
+    for _ in range(repeat):
+        # A fresh session each time, so no identity map is reused
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            start = perf_counter()
+            items = await fetch(session, user_id, limit)
+            fetch_seconds += perf_counter() - start
+
+            start = perf_counter()
+            serialize(items)
+            serialize_seconds += perf_counter() - start
+
+    items = limit * repeat
+    return {
+        "fetch_us": round(fetch_seconds / items * 1e6, 2),
+        "serialize_us": round(serialize_seconds / items * 1e6, 2),
+    }
+
+
+async def main(limit: int, repeat: int):
+    async with bench_client() as client:
+        [user_id] = await seed_users(1)
+        await seed_todos(user_id, limit)
+        headers = await login(client, "user0@bench.com")
+
+        results = {
+            "dialect": engine.dialect.name,
+            "items": limit,
+            "per_item": {
+                "orm_validated": await per_item_us(
+                    fetch_orm, serialize_orm, user_id, limit, repeat
+                ),
+                "rows_fast_json": await per_item_us(
+                    fetch_rows, serialize_rows, user_id, limit, repeat
+                ),
+            },
+        }
+
+        url = f"/todos/?limit={limit}"
+        responses.settings.FAST_JSON_RESPONSES = False
+        results["endpoint_validated"] = await measure(
+            client, headers, url, repeat
+        )
+        responses.settings.FAST_JSON_RESPONSES = True
+        results["endpoint_fast_json"] = await measure(
+            client, headers, url, repeat
+        )
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limit", type=int, default=1_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.limit, args.repeat))
@@ -0,0 +1,116 @@
+"""
+Latency and query plans of state-filtered `GET /todos/` calls.
+
+    python -m benchmarks.state_filter --todos 100000
+
+Each URL is measured, then the SQL it issued is explained. The old
+`state LIKE '%doing%'` predicate is explained alongside for comparison:
+equality and IN can use ix_todos_user_id_state_id, LIKE cannot.
+"""
+
+import argparse
+import asyncio
+import json
+
+from sqlalchemy import event, select
+
+from benchmarks.common import (
+    bench_client,
+    login,
+    measure,
+    seed_todos,
+    seed_users,
+)
+from src.todo_list.database import engine
+from src.todo_list.models import Todo
+
+URLS = {
+    "one_state": "/todos/?state=doing&limit=20",
+    "two_states": "/todos/?state=doing&state=done&limit=20",
+    "all_but_trash": (
+        "/todos/?state=draft&state=todo&state=doing&state=done&limit=20"
+    ),
+}
+
+
+async def explain(statement: str, parameters) -> list[str]:
+    async with engine.connect() as conn:
+        prefix = (
+            "EXPLAIN "
+            if conn.dialect.name == "postgresql"
+            else "EXPLAIN QUERY PLAN "
+        )
+        result = await conn.exec_driver_sql(prefix + statement, parameters)
+
+        return [str(row[-1]) for row in result]
+
+
+async def captured(action) -> list[tuple]:
+    """
+    Run `action` and return the (statement, parameters) it sent.
+    """
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, *args):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        await action()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    return statements
+
+
+async def list_plan(client, headers: dict, url: str) -> list[str]:
+    async def get():
+        response = await client.get(url, headers=headers)
+        response.raise_for_status()
+
+    [page] = [
+        (statement, parameters)
+        for statement, parameters in await captured(get)
+        if "ORDER BY todos.id" in statement
+    ]
+    return await explain(*page)
+
+
+async def like_plan(user_id: int) -> list[str]:
+    async def select_like():
+        async with engine.connect() as conn:
+            await conn.execute(
+                select(Todo)
+                .where(Todo.user_id == user_id, Todo.state.contains("doing"))
+                .order_by(Todo.id)
+                .limit(20)
+            )
+
+    [statement] = await captured(select_like)
+    return await explain(*statement)
+
+
+async def main(todos: int, repeat: int):
+    async with bench_client() as client:
+        [user_id] = await seed_users(1)
+        await seed_todos(user_id, todos)
+        headers = await login(client, "user0@bench.com")
+
+        results = {"dialect": engine.dialect.name}
+        for name, url in URLS.items():
+            results[name] = {
+                **await measure(client, headers, url, repeat),
+                "plan": await list_plan(client, headers, url),
+            }
+        results["like_before"] = {"plan": await like_plan(user_id)}
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--todos", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.todos, args.repeat))
@@ -0,0 +1,111 @@
+"""
+Cost of `GET /users/?limit=1000`: full User entities validated into
+UserList against the column projection the endpoint now runs.
+
+    python -m benchmarks.users_list --users 1000 --repeat 50
+
+Per-item fetch and serialize times and the peak allocation of one page
+are measured in-process, then the endpoint end to end.
+"""
+
+import argparse
+import asyncio
+import json
+import tracemalloc
+from time import perf_counter
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from benchmarks.common import auth_headers, bench_client, measure, seed_users
+from src.todo_list.database import engine
+from src.todo_list.models import User
+from src.todo_list.responses import (
+    USER_PUBLIC_COLUMNS,
+    FastJSONResponse,
+    user_list_rows,
+)
+from src.todo_list.schemas import UserList
+
+
+async def fetch_entities(session, limit: int) -> list:
+    users = await session.scalars(select(User).order_by(User.id).limit(limit))
+    return users.all()
+
+
+def serialize_entities(users: list) -> bytes:
+    page = UserList.model_validate({"users": users}, from_attributes=True)
+    return json.dumps(page.model_dump(mode="json")).encode()
+
+
+async def fetch_columns(session, limit: int) -> list:
+    users = await session.execute(
+        select(*USER_PUBLIC_COLUMNS).order_by(User.id).limit(limit)
+    )
+    return users.all()
+
+
+def serialize_columns(users: list) -> bytes:
+    return FastJSONResponse(
+        {"users": [user._asdict() for user in users], "next_cursor": None},
+        user_list_rows,
+    ).body
+
+
+async def per_item(fetch, serialize, limit: int, repeat: int) -> dict:
+    fetch_seconds = serialize_seconds = 0.0
+
+    for _ in range(repeat):
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            start = perf_counter()
+            items = await fetch(session, limit)
+            fetch_seconds += perf_counter() - start
+
+            start = perf_counter()
+            serialize(items)
+            serialize_seconds += perf_counter() - start
+
+    # One more, untimed, pass to measure the page's peak allocation
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        tracemalloc.start()
+        serialize(await fetch(session, limit))
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    items = limit * repeat
+    return {
+        "fetch_us": round(fetch_seconds / items * 1e6, 2),
+        "serialize_us": round(serialize_seconds / items * 1e6, 2),
+        "peak_kib": round(peak_bytes / 1024, 1),
+    }
+
+
+async def main(users: int, repeat: int):
+    async with bench_client() as client:
+        user_ids = await seed_users(users)
+        headers = auth_headers("user0@bench.com", user_ids[0])
+
+        results = {
+            "dialect": engine.dialect.name,
+            "users": users,
+            "entities": await per_item(
+                fetch_entities, serialize_entities, users, repeat
+            ),
+            "columns": await per_item(
+                fetch_columns, serialize_columns, users, repeat
+            ),
+            "endpoint": await measure(
+                client, headers, f"/users/?limit={users}", repeat
+            ),
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.users, args.repeat))
@@ -0,0 +1,30 @@
+"""add indexes to todos query paths
+
+Revision ID: 5c1e7a92d3b4
+Revises: 89daa4c28d48
+Create Date: 2026-10-18 10:12:41.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e7a92d3b4'
+down_revision: Union[str, Sequence[str], None] = '89daa4c28d48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_todos_user_id_id', 'todos', ['user_id', 'id'], unique=False)
+    op.create_index('ix_todos_user_id_state_id', 'todos', ['user_id', 'state', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_todos_user_id_state_id', table_name='todos')
+    op.drop_index('ix_todos_user_id_id', table_name='todos')
@@ -0,0 +1,38 @@
+"""add trigram search indexes to todos
+
+Revision ID: a3f06d1b8e27
+Revises: 5c1e7a92d3b4
+Create Date: 2026-10-18 11:02:17.114862
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f06d1b8e27'
+down_revision: Union[str, Sequence[str], None] = '5c1e7a92d3b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # pg_trgm is Postgres only; SQLite keeps working with plain scans
+    if op.get_context().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_todos_title_trgm', 'todos', ['title'], unique=False, postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+    op.create_index('ix_todos_description_trgm', 'todos', ['description'], unique=False, postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_context().dialect.name != 'postgresql':
+        return
+
+    op.drop_index('ix_todos_description_trgm', table_name='todos', postgresql_using='gin')
+    op.drop_index('ix_todos_title_trgm', table_name='todos', postgresql_using='gin')
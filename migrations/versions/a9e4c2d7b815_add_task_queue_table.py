@@ -0,0 +1,40 @@
+"""add task_queue table
+
+Revision ID: a9e4c2d7b815
+Revises: f3c7d9e2a561
+Create Date: 2026-10-18 20:03:51.267904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9e4c2d7b815'
+down_revision: Union[str, Sequence[str], None] = 'f3c7d9e2a561'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('task_queue',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('run_after', sa.DateTime(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.String(), nullable=True),
+    sa.Column('failed_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_task_queue_kind_run_after', 'task_queue', ['kind', 'run_after'], unique=False, postgresql_where=sa.text('failed_at IS NULL'), sqlite_where=sa.text('failed_at IS NULL'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_task_queue_kind_run_after', table_name='task_queue', postgresql_where=sa.text('failed_at IS NULL'), sqlite_where=sa.text('failed_at IS NULL'))
+    op.drop_table('task_queue')
@@ -0,0 +1,39 @@
+"""add change_id to todos
+
+Revision ID: b5d8e3f1a27c
+Revises: a9e4c2d7b815
+Create Date: 2026-10-18 22:41:09.518230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d8e3f1a27c'
+down_revision: Union[str, Sequence[str], None] = 'a9e4c2d7b815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows are all committed: they sit at the start of the change
+    # log, in id order. Writes set change_id themselves from now on.
+    op.add_column('todos', sa.Column('change_id', sa.BigInteger(), server_default='0', nullable=False))
+    with op.batch_alter_table('todos') as batch_op:
+        batch_op.alter_column('change_id', existing_type=sa.BigInteger(), server_default=None)
+    op.create_index('ix_todos_user_id_change_id_id', 'todos', ['user_id', 'change_id', 'id'], unique=False)
+    # SQLite takes the next change_id from max(change_id)
+    if op.get_context().dialect.name == 'sqlite':
+        op.create_index('ix_todos_change_id', 'todos', ['change_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_context().dialect.name == 'sqlite':
+        op.drop_index('ix_todos_change_id', table_name='todos')
+    op.drop_index('ix_todos_user_id_change_id_id', table_name='todos')
+    op.drop_column('todos', 'change_id')
@@ -0,0 +1,28 @@
+"""add todos user_id updated_at index
+
+Revision ID: b7d2e4f19c05
+Revises: a3f06d1b8e27
+Create Date: 2026-10-18 14:02:17.318840
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2e4f19c05'
+down_revision: Union[str, Sequence[str], None] = 'a3f06d1b8e27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_todos_user_id_updated_at', 'todos', ['user_id', 'updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_todos_user_id_updated_at', table_name='todos')
@@ -0,0 +1,35 @@
+"""add todo event id sequence
+
+Revision ID: c4e9a1f27b36
+Revises: b7d2e4f19c05
+Create Date: 2026-10-18 15:21:44.902113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e9a1f27b36'
+down_revision: Union[str, Sequence[str], None] = 'b7d2e4f19c05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Only PostgresChangeFeed numbers events from it; SQLite has no sequences
+    if op.get_context().dialect.name != 'postgresql':
+        return
+
+    op.execute(sa.schema.CreateSequence(sa.Sequence('todo_event_id_seq')))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_context().dialect.name != 'postgresql':
+        return
+
+    op.execute(sa.schema.DropSequence(sa.Sequence('todo_event_id_seq')))
@@ -0,0 +1,36 @@
+"""add todo_list_versions table
+
+Revision ID: c8f2a6d4e913
+Revises: b5d8e3f1a27c
+Create Date: 2026-10-19 10:14:37.203581
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8f2a6d4e913'
+down_revision: Union[str, Sequence[str], None] = 'b5d8e3f1a27c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('todo_list_versions',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    # Only the todo list ETag read it, which now uses the version
+    op.drop_index('ix_todos_user_id_updated_at_id', table_name='todos')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_todos_user_id_updated_at_id', 'todos', ['user_id', 'updated_at', 'id'], unique=False)
+    op.drop_table('todo_list_versions')
@@ -0,0 +1,32 @@
+"""add deleted_at to todos
+
+Revision ID: d1a5b3c8e742
+Revises: c4e9a1f27b36
+Create Date: 2026-10-18 16:40:09.127455
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1a5b3c8e742'
+down_revision: Union[str, Sequence[str], None] = 'c4e9a1f27b36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('todos', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_todos_user_id_updated_at_id', 'todos', ['user_id', 'updated_at', 'id'], unique=False)
+    op.drop_index('ix_todos_user_id_updated_at', table_name='todos')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_todos_user_id_updated_at', 'todos', ['user_id', 'updated_at'], unique=False)
+    op.drop_index('ix_todos_user_id_updated_at_id', table_name='todos')
+    op.drop_column('todos', 'deleted_at')
@@ -0,0 +1,41 @@
+"""add todo_counts table
+
+Revision ID: e8b2f6a4c913
+Revises: d1a5b3c8e742
+Create Date: 2026-10-18 18:05:41.502318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b2f6a4c913'
+down_revision: Union[str, Sequence[str], None] = 'd1a5b3c8e742'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('todo_counts',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    # Same type as todos.state, created with the todos table
+    sa.Column('state', postgresql.ENUM('draft', 'todo', 'doing', 'done', 'trash', name='todostate', create_type=False), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'state')
+    )
+    op.execute(
+        'INSERT INTO todo_counts (user_id, state, count) '
+        'SELECT user_id, state, count(*) FROM todos '
+        'WHERE deleted_at IS NULL GROUP BY user_id, state'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('todo_counts')
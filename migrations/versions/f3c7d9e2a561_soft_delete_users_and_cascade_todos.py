@@ -0,0 +1,53 @@
+"""soft delete users and cascade todos
+
+Revision ID: f3c7d9e2a561
+Revises: e8b2f6a4c913
+Create Date: 2026-10-18 19:12:27.840113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c7d9e2a561'
+down_revision: Union[str, Sequence[str], None] = 'e8b2f6a4c913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# SQLite's unique and foreign key constraints from the first migrations
+# are unnamed; batch mode names them as Postgres did
+naming_convention = {
+    'uq': '%(table_name)s_%(column_0_name)s_key',
+    'fk': '%(table_name)s_%(column_0_name)s_fkey',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    with op.batch_alter_table('users', naming_convention=naming_convention) as batch_op:
+        batch_op.drop_constraint('users_email_key', type_='unique')
+    op.create_index('ix_users_email_live', 'users', ['email'], unique=True, postgresql_where=sa.text('deleted_at IS NULL'), sqlite_where=sa.text('deleted_at IS NULL'))
+    with op.batch_alter_table('todos', naming_convention=naming_convention) as batch_op:
+        batch_op.drop_constraint('todos_user_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('todos_user_id_fkey', 'users', ['user_id'], ['id'], ondelete='CASCADE')
+    op.create_index('ix_todos_deleted_at', 'todos', ['deleted_at'], unique=False, postgresql_where=sa.text('deleted_at IS NOT NULL'), sqlite_where=sa.text('deleted_at IS NOT NULL'))
+    op.create_index('ix_todos_trash_updated_at', 'todos', ['updated_at'], unique=False, postgresql_where=sa.text("state = 'trash' AND deleted_at IS NULL"), sqlite_where=sa.text("state = 'trash' AND deleted_at IS NULL"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_todos_trash_updated_at', table_name='todos', postgresql_where=sa.text("state = 'trash' AND deleted_at IS NULL"), sqlite_where=sa.text("state = 'trash' AND deleted_at IS NULL"))
+    op.drop_index('ix_todos_deleted_at', table_name='todos', postgresql_where=sa.text('deleted_at IS NOT NULL'), sqlite_where=sa.text('deleted_at IS NOT NULL'))
+    with op.batch_alter_table('todos', naming_convention=naming_convention) as batch_op:
+        batch_op.drop_constraint('todos_user_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('todos_user_id_fkey', 'users', ['user_id'], ['id'])
+    op.drop_index('ix_users_email_live', table_name='users', postgresql_where=sa.text('deleted_at IS NULL'), sqlite_where=sa.text('deleted_at IS NULL'))
+    # Fails if deleted users share an email with live ones: purge first
+    with op.batch_alter_table('users', naming_convention=naming_convention) as batch_op:
+        batch_op.create_unique_constraint('users_email_key', ['email'])
+    op.drop_column('users', 'deleted_at')
@@ -1,17 +1,54 @@
+from contextlib import asynccontextmanager
 from http import HTTPStatus
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 
-from src.todo_list.routers import auth, todos, users
+from src.todo_list.database import engine
+from src.todo_list.events import change_feed
+from src.todo_list.instrumentation import (
+    InstrumentationMiddleware,
+    instrument_engine,
+)
+from src.todo_list.limits import api_rate_limit, limit_concurrency
+from src.todo_list.purge import purger
+from src.todo_list.replicas import replica_router
+from src.todo_list.routers import auth, metrics, todos, users
 from src.todo_list.schemas import (
     Message,
 )
+from src.todo_list.settings import Settings
+from src.todo_list.tasks import task_runner
+
+settings = Settings()  # pyright: ignore[reportCallIssue]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await change_feed.start()
+    if settings.PURGE_ENABLED:
+        await purger.start()
+    if settings.TASKS_ENABLED:
+        await task_runner.start()
+    yield
+    await task_runner.stop()
+    await purger.stop()
+    await change_feed.stop()
+
+
+app = FastAPI(title="Todo List API", lifespan=lifespan)
+
+# Rate limit first, so rejected callers never take a concurrency slot
+admission = [Depends(api_rate_limit), Depends(limit_concurrency)]
 
-app = FastAPI(title="Todo List API")
+app.include_router(users.router, dependencies=admission)
+app.include_router(auth.router, dependencies=admission)
+app.include_router(todos.router, dependencies=admission)
 
-app.include_router(users.router)
-app.include_router(auth.router)
-app.include_router(todos.router)
+if settings.INSTRUMENTATION_ENABLED:
+    for instrumented in [engine, *replica_router.replicas]:
+        instrument_engine(instrumented)
+    app.add_middleware(InstrumentationMiddleware)
+    app.include_router(metrics.router)
 
 
 @app.get("/", status_code=HTTPStatus.OK, response_model=Message)
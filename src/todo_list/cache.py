@@ -0,0 +1,95 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from time import time
+
+from src.todo_list.settings import Settings
+
+settings = Settings()  # pyright: ignore[reportCallIssue]
+
+
+class PrincipalCache(ABC):
+    """
+    Token subject -> user snapshot, consulted by `get_current_user`.
+
+    Backends only implement storage. Hit/miss accounting lives here so
+    every backend, in-process or shared, reports the same counters.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, subject: str) -> dict | None:
+        snapshot = await self._get(subject)
+
+        if snapshot is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return snapshot
+
+    @abstractmethod
+    async def _get(self, subject: str) -> dict | None: ...
+
+    @abstractmethod
+    async def set(self, subject: str, snapshot: dict, expires_at: float):
+        """
+        expires_at is an epoch timestamp, usually the token `exp`.
+        """
+
+    @abstractmethod
+    async def delete(self, subject: str): ...
+
+
+class InMemoryPrincipalCache(PrincipalCache):
+    """
+    Per-process LRU cache. Entries live for `ttl` seconds at most and
+    never outlive the token that populated them.
+    """
+
+    def __init__(self, max_size: int, ttl: int):
+        super().__init__()
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def _get(self, subject: str) -> dict | None:
+        entry = self._entries.get(subject)
+
+        if entry is None:
+            return None
+
+        expires_at, snapshot = entry
+        if expires_at <= time():
+            del self._entries[subject]
+            return None
+
+        self._entries.move_to_end(subject)
+        return snapshot
+
+    async def set(self, subject: str, snapshot: dict, expires_at: float):
+        if self.max_size <= 0:
+            return
+
+        self._entries[subject] = (min(expires_at, time() + self.ttl), snapshot)
+        self._entries.move_to_end(subject)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def delete(self, subject: str):
+        self._entries.pop(subject, None)
+
+
+principal_cache = InMemoryPrincipalCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def get_principal_cache() -> PrincipalCache:
+    return principal_cache
@@ -1,13 +1,90 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy import event, make_url, text
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+)
 
+from src.todo_list.instrumentation import InstrumentedPool
 from src.todo_list.settings import Settings
 
-engine = create_async_engine(
-    Settings().DATABASE_URL,  # pyright: ignore[reportCallIssue]
-    max_overflow=10,
-    pool_size=5,
-    pool_recycle=200,
-)
+
+def engine_options(settings: Settings, url: str | None = None) -> dict:
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+    if settings.INSTRUMENTATION_ENABLED:
+        options["poolclass"] = InstrumentedPool
+
+    if make_url(url or settings.DATABASE_URL).get_driver_name() == "psycopg":
+        options["connect_args"] = {
+            "prepare_threshold": (
+                None
+                if settings.DB_PGBOUNCER_MODE
+                else settings.DB_PREPARE_THRESHOLD
+            )
+        }
+
+    return options
+
+
+def set_prepared_max(prepared_max: int):
+    """
+    Connect listener sizing psycopg's prepared statement cache. It isn't
+    a libpq parameter, so it can't go through connect_args.
+    """
+
+    def on_connect(dbapi_connection, connection_record):
+        dbapi_connection.driver_connection.prepared_max = prepared_max
+
+    return on_connect
+
+
+async def limit_transactions(session: AsyncSession, seconds: float):
+    """
+    Have Postgres end the transaction `session` is in, and any it begins
+    later, after `seconds`. SET LOCAL keeps the limit off the connection
+    once it's back in the pool, so reads elsewhere (streamed exports)
+    aren't cut short.
+    """
+    statement = text(f"SET LOCAL transaction_timeout = {int(seconds * 1_000)}")
+
+    def after_begin(session, transaction, connection):
+        if connection.dialect.name == "postgresql":
+            connection.execute(statement)
+
+    event.listen(session.sync_session, "after_begin", after_begin)
+
+    if session.in_transaction():
+        connection = await session.connection()
+        if connection.dialect.name == "postgresql":
+            await connection.execute(statement)
+
+
+def make_engine(settings: Settings, url: str | None = None) -> AsyncEngine:
+    engine = create_async_engine(
+        url or settings.DATABASE_URL, **engine_options(settings, url)
+    )
+
+    if (
+        make_url(url or settings.DATABASE_URL).get_driver_name() == "psycopg"
+        and not settings.DB_PGBOUNCER_MODE
+    ):
+        event.listen(
+            engine.sync_engine,
+            "connect",
+            set_prepared_max(settings.DB_STATEMENT_CACHE_SIZE),
+        )
+
+    return engine
+
+
+engine = make_engine(Settings())  # pyright: ignore[reportCallIssue]
 
 
 async def get_session():  # pragma: nocover
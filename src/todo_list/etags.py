@@ -0,0 +1,56 @@
+from hashlib import sha256
+from http import HTTPStatus
+
+from fastapi import Request, Response
+from sqlalchemy import Select, select
+
+from src.todo_list.models import TodoListVersion
+
+# Responses are per caller and may change at any time: let the client
+# keep them, but only reuse them after revalidating with If-None-Match.
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    digest = sha256("\x1f".join(map(str, parts)).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Weak comparison, as If-None-Match requires.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    return any(
+        tag.strip().removeprefix("W/") == etag
+        for tag in if_none_match.split(",")
+    )
+
+
+def conditional_response(
+    request: Request, response: Response, etag: str
+) -> Response | None:
+    """
+    Return a 304 when the client already holds `etag`, otherwise set the
+    caching headers on `response` and return None.
+    """
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return None
+
+
+def todo_list_version(user_id: int) -> Select:
+    """
+    The user's todo list version, None before their first todo write.
+    """
+    return select(TodoListVersion.version).where(
+        TodoListVersion.user_id == user_id
+    )
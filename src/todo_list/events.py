@@ -0,0 +1,379 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from itertools import count
+from json import dumps, loads
+from time import time_ns
+
+import psycopg
+from psycopg import sql
+from sqlalchemy import make_url
+
+from src.todo_list.models import Todo
+from src.todo_list.schemas import TodoPublic
+from src.todo_list.settings import Settings
+
+settings = Settings()  # pyright: ignore[reportCallIssue]
+logger = logging.getLogger(__name__)
+
+# (kind, data), kind being "created", "updated", "deleted" or "reset"
+Change = tuple[str, dict]
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    id: int
+    user_id: int
+    kind: str
+    data: dict
+
+
+def todo_change(kind: str, todo: Todo) -> Change:
+    return kind, TodoPublic.model_validate(
+        todo, from_attributes=True
+    ).model_dump(mode="json")
+
+
+def todo_deleted(todo_id: int) -> Change:
+    return "deleted", {"id": todo_id}
+
+
+def todos_reset() -> Change:
+    """
+    For changes too many to send one by one: subscribers refetch, or
+    catch up from GET /todos/changes.
+    """
+    return "reset", {}
+
+
+def format_sse(event: ChangeEvent) -> str:
+    return (
+        f"id: {event.id}\nevent: {event.kind}\ndata: {dumps(event.data)}\n\n"
+    )
+
+
+RESET = "event: reset\ndata: {}\n\n"
+KEEP_ALIVE = ": keep-alive\n\n"
+
+
+class Subscription:
+    """
+    One streaming connection. Its queue is bounded: a client that can't
+    keep up is disconnected once it has drained what was queued, and
+    resumes from the replay buffer when it reconnects.
+    """
+
+    def __init__(self, queue_size: int, backlog: list[ChangeEvent]):
+        self.backlog = backlog
+        self.queue: asyncio.Queue[ChangeEvent | None] = asyncio.Queue(
+            maxsize=queue_size
+        )
+        self.overflowed = False
+
+    def offer(self, event: ChangeEvent) -> bool:
+        if self.overflowed:
+            return False
+
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            return False
+
+        return True
+
+    def reset(self):
+        """
+        Events may have been lost: drop what is queued and tell the client
+        to resynchronise.
+        """
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class ChangeFeed(ABC):
+    """
+    Per-user stream of todo changes.
+
+    Fan-out, the replay buffer used to resume from a Last-Event-ID and
+    backpressure live here; backends only move published changes to
+    `_dispatch`, in event id order, in every process.
+    """
+
+    def __init__(self, buffer_size: int, queue_size: int):
+        self.queue_size = queue_size
+        self.dropped = 0
+        self.last_id = 0
+        self._buffer: deque[ChangeEvent] = deque(maxlen=buffer_size)
+        self._subscriptions: dict[int, set[Subscription]] = defaultdict(set)
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(map(len, self._subscriptions.values()))
+
+    @abstractmethod
+    async def publish(self, user_id: int, changes: list[Change]):
+        """
+        Called after the changes are committed.
+        """
+
+    async def start(self): ...
+
+    async def stop(self): ...
+
+    def _dispatch(self, event: ChangeEvent):
+        self.last_id = max(self.last_id, event.id)
+        self._buffer.append(event)
+
+        for subscription in self._subscriptions.get(event.user_id, ()):
+            if not subscription.offer(event):
+                self.dropped += 1
+
+    def _reset_all(self):
+        for subscriptions in self._subscriptions.values():
+            for subscription in subscriptions:
+                subscription.reset()
+
+    def _subscribe(
+        self, user_id: int, last_event_id: int | None
+    ) -> Subscription:
+        backlog = []
+        if last_event_id is not None:
+            backlog = [
+                event
+                for event in self._buffer
+                if event.user_id == user_id and event.id > last_event_id
+            ]
+
+        subscription = Subscription(self.queue_size, backlog)
+        self._subscriptions[user_id].add(subscription)
+
+        oldest_id = self._buffer[0].id if self._buffer else self.last_id + 1
+        # Events between last_event_id and the buffer were evicted, or the
+        # id comes from before a restart: either way we can't replay.
+        if last_event_id is not None and not (
+            oldest_id - 1 <= last_event_id <= self.last_id
+        ):
+            subscription.backlog = []
+            subscription.reset()
+
+        return subscription
+
+    async def stream(
+        self,
+        user_id: int,
+        last_event_id: int | None,
+        heartbeat_seconds: float,
+    ) -> AsyncIterator[str]:
+        """
+        Server-sent events for `user_id`, replaying what was missed since
+        `last_event_id` first.
+        """
+        subscription = self._subscribe(user_id, last_event_id)
+
+        try:
+            for event in subscription.backlog:
+                yield format_sse(event)
+
+            while not (subscription.overflowed and subscription.queue.empty()):
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(), heartbeat_seconds
+                    )
+                except TimeoutError:
+                    yield KEEP_ALIVE
+                    continue
+
+                if event is None:
+                    yield RESET
+                    return
+
+                yield format_sse(event)
+        finally:
+            self._subscriptions[user_id].discard(subscription)
+            if not self._subscriptions[user_id]:
+                del self._subscriptions[user_id]
+
+
+class InMemoryChangeFeed(ChangeFeed):
+    """
+    Single-process feed: only clients connected to the worker that
+    handled a write see it.
+    """
+
+    def __init__(self, buffer_size: int, queue_size: int):
+        super().__init__(buffer_size, queue_size)
+        # Counting from the boot time in microseconds puts ids handed out
+        # before a restart below the replay window, so resuming from one
+        # resets instead of splicing two processes' events together.
+        first_id = time_ns() // 1_000
+        self._ids = count(first_id)
+        self.last_id = first_id - 1
+
+    async def publish(self, user_id: int, changes: list[Change]):
+        for kind, data in changes:
+            self._dispatch(ChangeEvent(next(self._ids), user_id, kind, data))
+
+
+class PostgresChangeFeed(ChangeFeed):
+    """
+    Multi-worker feed over LISTEN/NOTIFY. Event ids come from the
+    todo_event_id_seq sequence so they mean the same thing in every
+    worker. NOTIFY payloads are capped at 8000 bytes; larger changes are
+    sent with the todo id only and `"truncated": true`.
+    """
+
+    MAX_PAYLOAD = 7_900
+
+    def __init__(
+        self,
+        database_url: str,
+        buffer_size: int,
+        queue_size: int,
+        channel: str = "todo_changes",
+        start_timeout: float = 10,
+    ):
+        super().__init__(buffer_size, queue_size)
+        self.start_timeout = start_timeout
+        self.conninfo = (
+            make_url(database_url)
+            .set(drivername="postgresql")
+            .render_as_string(hide_password=False)
+        )
+        self.channel = channel
+        self.publish_errors = 0
+        self._publisher: psycopg.AsyncConnection | None = None
+        self._publish_lock = asyncio.Lock()
+        self._listener: asyncio.Task | None = None
+        self._listening = asyncio.Event()
+
+    async def start(self):
+        """
+        Start listening, waiting up to `start_timeout` for the connection.
+        Past that the app starts anyway and the listener keeps retrying.
+        """
+        self._listener = asyncio.create_task(self._listen())
+
+        try:
+            await asyncio.wait_for(self._listening.wait(), self.start_timeout)
+        except TimeoutError:
+            logger.warning(
+                "Change feed listener not connected after %ss, retrying in "
+                "the background",
+                self.start_timeout,
+            )
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+        if self._publisher:
+            await self._publisher.close()
+
+    def _payload(self, user_id: int, kind: str, data: dict) -> str:
+        payload = dumps({"user_id": user_id, "kind": kind, "data": data})
+
+        if len(payload.encode()) > self.MAX_PAYLOAD:
+            payload = dumps({
+                "user_id": user_id,
+                "kind": kind,
+                "data": {"id": data["id"], "truncated": True},
+            })
+
+        return payload
+
+    async def publish(self, user_id: int, changes: list[Change]):
+        payloads = [
+            self._payload(user_id, kind, data) for kind, data in changes
+        ]
+
+        try:
+            async with self._publish_lock:
+                await self._notify(payloads)
+        except psycopg.Error:
+            # The write is already committed; a lost event must not turn
+            # it into an error response.
+            self.publish_errors += 1
+            logger.exception("Could not publish %d todo changes", len(changes))
+
+    async def _notify(self, payloads: list[str]):
+        if self._publisher is None or self._publisher.closed:
+            self._publisher = await psycopg.AsyncConnection.connect(
+                self.conninfo, autocommit=True
+            )
+
+        # NOTIFY delivers in commit order. Holding the lock until commit
+        # makes that id order too, whichever worker publishes; nextval
+        # runs after ORDER BY, so ids follow payload order.
+        async with self._publisher.transaction():
+            await self._publisher.execute(
+                "SELECT pg_advisory_xact_lock(hashtext(%s))", [self.channel]
+            )
+            await self._publisher.execute(
+                "SELECT pg_notify(%s, nextval('todo_event_id_seq') "
+                "|| ':' || payload) "
+                "FROM unnest(%s::text[]) WITH ORDINALITY AS t(payload, n) "
+                "ORDER BY n",
+                [self.channel, payloads],
+            )
+
+    def _receive(self, notification: str):
+        try:
+            event_id, _, payload = notification.partition(":")
+            event = ChangeEvent(id=int(event_id), **loads(payload))
+        except (ValueError, TypeError):
+            logger.exception("Malformed change notification: %r", notification)
+            # Whoever it was for can't be told what they missed
+            self._reset_all()
+            return
+
+        self._dispatch(event)
+
+    async def _listen(self):
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(
+                    self.conninfo, autocommit=True
+                ) as conn:
+                    await conn.execute(
+                        sql.SQL("LISTEN {}").format(
+                            sql.Identifier(self.channel)
+                        )
+                    )
+                    self._listening.set()
+
+                    async for notify in conn.notifies():
+                        self._receive(notify.payload)
+            except psycopg.Error:
+                logger.exception("Change feed listener lost its connection")
+            except Exception:
+                logger.exception("Change feed listener failed")
+            # Whatever was sent while reconnecting is gone for good.
+            self._reset_all()
+            await asyncio.sleep(1)
+
+
+def make_change_feed(settings: Settings) -> ChangeFeed:
+    if settings.CHANGE_FEED_BACKEND == "postgres":
+        return PostgresChangeFeed(
+            settings.DATABASE_URL,
+            buffer_size=settings.CHANGE_FEED_BUFFER_SIZE,
+            queue_size=settings.CHANGE_FEED_QUEUE_SIZE,
+            start_timeout=settings.CHANGE_FEED_START_TIMEOUT_SECONDS,
+        )
+
+    return InMemoryChangeFeed(
+        buffer_size=settings.CHANGE_FEED_BUFFER_SIZE,
+        queue_size=settings.CHANGE_FEED_QUEUE_SIZE,
+    )
+
+
+change_feed = make_change_feed(settings)
+
+
+def get_change_feed() -> ChangeFeed:
+    return change_feed
@@ -0,0 +1,311 @@
+import codecs
+import csv
+from collections import deque
+from collections.abc import AsyncIterator, Iterator
+from json import JSONDecodeError, loads
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.todo_list.events import ChangeFeed, todos_reset
+from src.todo_list.models import Todo, current_change_id
+from src.todo_list.schemas import BulkItemError, TodoSchema
+from src.todo_list.stats import adjust_todo_counts, state_deltas
+
+COPY_TODOS = (
+    "COPY todos (title, description, state, user_id, change_id) FROM STDIN"
+)
+
+
+async def read_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[list[str]]:
+    """
+    Split a byte stream into lines, yielding whatever lines each chunk
+    completes.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+
+    async for chunk in chunks:
+        *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+        if lines:
+            yield lines
+
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield [pending]
+
+
+def parse_ndjson(lines: list[str]) -> Iterator[dict | str]:
+    """
+    One record per non-blank line, or an error message for the line.
+    """
+    for line in lines:
+        if not line.strip():
+            continue
+
+        try:
+            record = loads(line)
+        except JSONDecodeError:
+            yield "Invalid JSON."
+            continue
+
+        yield record if isinstance(record, dict) else "Expected an object."
+
+
+def _ends_in_quoted_field(line: str, in_quotes: bool) -> bool:
+    """
+    Whether a quoted field is still open at the end of `line`, given
+    whether one was open at its start. Follows csv.reader's default
+    dialect: a quote opens a field only as its first character, "" in a
+    quoted field is a quote, and any other quote is plain text.
+    """
+    if not in_quotes and '"' not in line:
+        return False
+
+    position = 0
+    while True:
+        if in_quotes:
+            end = line.find('"', position)
+            if end == -1:
+                return True
+            if line.startswith('"', end + 1):
+                position = end + 2
+                continue
+            in_quotes = False
+            position = end + 1
+        elif line.startswith('"', position):
+            in_quotes = True
+            position += 1
+            continue
+
+        comma = line.find(",", position)
+        if comma == -1:
+            return False
+        position = comma + 1
+
+
+class CsvParser:
+    """
+    CSV with a header row. Quoted fields may span lines, so lines are
+    joined while a quoted field is open, up to `max_record_chars`. A
+    record that is longer, or still open at the end of the upload, fails
+    on its own and parsing starts over on the line after its first.
+    """
+
+    def __init__(self, max_record_chars: int):
+        self.max_record_chars = max_record_chars
+        self.header: list[str] | None = None
+        self._partial: list[str] = []
+        self._partial_chars = 0
+        self._in_quotes = False
+
+    def __call__(self, lines: list[str]) -> Iterator[dict | str]:
+        pending = deque(lines)
+
+        while pending:
+            line = pending.popleft()
+            self._partial.append(line)
+            self._partial_chars += len(line) + 1
+            self._in_quotes = _ends_in_quoted_field(line, self._in_quotes)
+
+            if self._in_quotes:
+                if self._partial_chars > self.max_record_chars:
+                    pending.extendleft(reversed(self._restart()))
+                    yield (
+                        f"Record longer than {self.max_record_chars} "
+                        "characters."
+                    )
+                continue
+
+            record = "\n".join(self._partial)
+            self._restart()
+            if record.strip() and (parsed := self._parse(record)):
+                yield parsed
+
+    def _parse(self, record: str) -> dict | str | None:
+        [values] = csv.reader([record])
+
+        if self.header is None:
+            self.header = [name.strip() for name in values]
+            return None
+        if len(values) != len(self.header):
+            return f"Expected {len(self.header)} columns."
+
+        return dict(zip(self.header, values))
+
+    def _restart(self) -> list[str]:
+        """
+        Drop the record being joined; returns its lines after the first.
+        """
+        rest = self._partial[1:]
+        self._partial = []
+        self._partial_chars = 0
+        self._in_quotes = False
+
+        return rest
+
+    def finish(self) -> Iterator[dict | str]:
+        while self._partial:
+            rest = self._restart()
+            yield "Unterminated quoted field."
+            yield from self(rest)
+
+
+def _error_detail(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, detail['loc']))}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+class TodoImport:
+    """
+    Validates records and writes them in batches of `batch_size`, each
+    committed on its own so no transaction stays open while the client
+    sends the rest. Only the first `max_errors` errors are kept, so memory
+    stays flat however large the upload. The user's change feed
+    subscribers get a reset every `reset_rows` rows and at the end.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        session: AsyncSession,
+        user_id: int,
+        feed: ChangeFeed,
+        *,
+        batch_size: int,
+        reset_rows: int,
+        max_errors: int,
+    ):
+        self.session = session
+        self.user_id = user_id
+        self.feed = feed
+        self.batch_size = batch_size
+        self.reset_rows = reset_rows
+        self.max_errors = max_errors
+        self.imported = 0
+        self.failed = 0
+        self.errors: list[BulkItemError] = []
+        self._index = 0
+        self._batch: list[TodoSchema] = []
+        self._unannounced = 0
+
+    def _fail(self, detail: str):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(BulkItemError(index=self._index, detail=detail))
+
+    async def add(self, record: dict | str):
+        try:
+            if isinstance(record, str):
+                self._fail(record)
+                return
+
+            try:
+                self._batch.append(TodoSchema.model_validate(record))
+            except ValidationError as error:
+                self._fail(_error_detail(error))
+                return
+        finally:
+            self._index += 1
+
+        if len(self._batch) >= self.batch_size:
+            await self._flush()
+
+    async def _flush(self):
+        if not self._batch:
+            return
+
+        connection = await self.session.connection()
+        if connection.dialect.driver == "psycopg":
+            # COPY skips the ORM's column defaults
+            change_id = await self.session.scalar(select(current_change_id()))
+            raw_connection = await connection.get_raw_connection()
+            cursor = raw_connection.driver_connection.cursor()  # pyright: ignore[reportOptionalMemberAccess]
+            async with cursor.copy(COPY_TODOS) as copy:
+                for todo in self._batch:
+                    await copy.write_row((
+                        todo.title,
+                        todo.description,
+                        todo.state.name,
+                        self.user_id,
+                        change_id,
+                    ))
+        else:
+            await self.session.execute(
+                insert(Todo),
+                [
+                    {**todo.model_dump(), "user_id": self.user_id}
+                    for todo in self._batch
+                ],
+            )
+
+        await adjust_todo_counts(
+            self.session,
+            self.user_id,
+            state_deltas(added=[todo.state for todo in self._batch]),
+        )
+
+        await self.session.commit()
+
+        self.imported += len(self._batch)
+        self._unannounced += len(self._batch)
+        self._batch = []
+
+        if self._unannounced >= self.reset_rows:
+            await self._announce()
+
+    async def _announce(self):
+        await self.feed.publish(self.user_id, [todos_reset()])
+        self._unannounced = 0
+
+    async def finish(self) -> dict:
+        await self._flush()
+        if self._unannounced:
+            await self._announce()
+
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
+
+
+async def import_todos(  # noqa: PLR0913
+    session: AsyncSession,
+    user_id: int,
+    feed: ChangeFeed,
+    chunks: AsyncIterator[bytes],
+    import_format: str,
+    *,
+    batch_size: int,
+    reset_rows: int,
+    max_errors: int,
+    max_record_chars: int,
+) -> dict:
+    todo_import = TodoImport(
+        session,
+        user_id,
+        feed,
+        batch_size=batch_size,
+        reset_rows=reset_rows,
+        max_errors=max_errors,
+    )
+    # End the transaction authentication opened before reading the body
+    await session.commit()
+    parse = (
+        parse_ndjson
+        if import_format == "ndjson"
+        else CsvParser(max_record_chars)
+    )
+
+    async for lines in read_lines(chunks):
+        for record in parse(lines):
+            await todo_import.add(record)
+
+    if isinstance(parse, CsvParser):
+        for record in parse.finish():
+            await todo_import.add(record)
+
+    return await todo_import.finish()
@@ -0,0 +1,246 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+STATEMENT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34)
+
+
+@dataclass
+class RequestMetrics:
+    sql_statements: int = 0
+    sql_seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+    hash_seconds: float = 0.0
+    jwt_seconds: float = 0.0
+
+
+_current_metrics: ContextVar[RequestMetrics | None] = ContextVar(
+    "current_metrics", default=None
+)
+
+
+@contextmanager
+def timed(field: str):
+    """
+    Add the time spent in the block to `field` of the current request's
+    metrics. A no-op outside an instrumented request.
+    """
+    metrics = _current_metrics.get()
+    if metrics is None:
+        yield
+        return
+
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        setattr(
+            metrics, field, getattr(metrics, field) + perf_counter() - start
+        )
+
+
+class Histogram:
+    """
+    Minimal Prometheus histogram; each distinct set of labels passed to
+    `observe` is its own series.
+    """
+
+    def __init__(self, name: str, help: str, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self._series: dict[tuple, list] = defaultdict(
+            lambda: [[0] * len(self.buckets), 0.0, 0]
+        )
+
+    def observe(self, value: float, **labels: str):
+        series = self._series[tuple(labels.items())]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[0][index] += 1
+        series[1] += value
+        series[2] += 1
+
+    def expose(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} histogram",
+        ]
+
+        for labels, (counts, total, count) in self._series.items():
+            prefix = "".join(f'{key}="{value}",' for key, value in labels)
+            suffix = f"{{{prefix.rstrip(',')}}}" if labels else ""
+            lines.extend(
+                f'{self.name}_bucket{{{prefix}le="{bound}"}} {bucket_count}'
+                for bound, bucket_count in zip(self.buckets, counts)
+            )
+            lines.extend([
+                f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}',
+                f"{self.name}_sum{suffix} {total}",
+                f"{self.name}_count{suffix} {count}",
+            ])
+
+        return lines
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "Request latency."
+)
+request_sql_statements = Histogram(
+    "http_request_sql_statements",
+    "SQL statements issued per request.",
+    buckets=STATEMENT_BUCKETS,
+)
+request_sql_duration = Histogram(
+    "http_request_sql_duration_seconds", "Time spent in SQL per request."
+)
+request_pool_wait = Histogram(
+    "http_request_pool_wait_seconds",
+    "Time spent waiting for a pooled connection per request.",
+)
+
+pool_checkout_wait = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time to check a connection out of the pool.",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+
+histograms = [
+    request_duration,
+    request_sql_statements,
+    request_sql_duration,
+    request_pool_wait,
+    pool_checkout_wait,
+]
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that reports how long each checkout took, including the
+    wait for a free connection when the pool is exhausted.
+    """
+
+    def connect(self):
+        start = perf_counter()
+        try:
+            return super().connect()
+        finally:
+            elapsed = perf_counter() - start
+            pool_checkout_wait.observe(elapsed)
+
+            metrics = _current_metrics.get()
+            if metrics is not None:
+                metrics.pool_wait_seconds += elapsed
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, *_):
+    context._instrumentation_start = perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, *_):
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return
+
+    metrics.sql_statements += 1
+    metrics.sql_seconds += perf_counter() - context._instrumentation_start
+
+
+def instrument_engine(engine: AsyncEngine):
+    for name, listener in (
+        ("before_cursor_execute", _before_cursor_execute),
+        ("after_cursor_execute", _after_cursor_execute),
+    ):
+        if not event.contains(engine.sync_engine, name, listener):
+            event.listen(engine.sync_engine, name, listener)
+
+
+def server_timing(metrics: RequestMetrics, total: float) -> str:
+    return ", ".join([
+        f'db;dur={metrics.sql_seconds * 1000:.2f};desc="'
+        f'{metrics.sql_statements} queries"',
+        f"pool;dur={metrics.pool_wait_seconds * 1000:.2f}",
+        f"hash;dur={metrics.hash_seconds * 1000:.2f}",
+        f"jwt;dur={metrics.jwt_seconds * 1000:.2f}",
+        f"total;dur={total * 1000:.2f}",
+    ])
+
+
+class InstrumentationMiddleware:
+    """
+    Collects RequestMetrics for every HTTP request, adds them as a
+    Server-Timing header and feeds the per-route histograms.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        start = perf_counter()
+
+        async def send_with_server_timing(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(
+                    "Server-Timing",
+                    server_timing(metrics, perf_counter() - start),
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_server_timing)
+        finally:
+            _current_metrics.reset(token)
+
+            labels = {
+                "method": scope["method"],
+                "route": getattr(scope.get("route"), "path", "unmatched"),
+            }
+            request_duration.observe(perf_counter() - start, **labels)
+            request_sql_statements.observe(metrics.sql_statements, **labels)
+            request_sql_duration.observe(metrics.sql_seconds, **labels)
+            request_pool_wait.observe(metrics.pool_wait_seconds, **labels)
+
+
+def sample(name: str, kind: str, help: str, value: float) -> list[str]:
+    return [
+        f"# HELP {name} {help}",
+        f"# TYPE {name} {kind}",
+        f"{name} {value}",
+    ]
+
+
+def labelled_samples(
+    name: str, kind: str, help: str, label: str, values: dict[str, float]
+) -> list[str]:
+    return [
+        f"# HELP {name} {help}",
+        f"# TYPE {name} {kind}",
+        *(
+            f'{name}{{{label}="{key}"}} {value}'
+            for key, value in sorted(values.items())
+        ),
+    ]
+
+
+def render_metrics(extra_lines: list[str]) -> str:
+    lines = []
+    for histogram in histograms:
+        lines.extend(histogram.expose())
+    lines.extend(extra_lines)
+
+    return "\n".join(lines) + "\n"
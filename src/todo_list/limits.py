@@ -0,0 +1,240 @@
+"""
+Admission control: token-bucket rate limits per caller and concurrency
+caps per route. Both answer right away (429 and 503, with Retry-After)
+instead of letting requests queue for a database connection.
+"""
+
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from collections.abc import Callable
+from http import HTTPStatus
+from math import ceil
+from time import monotonic
+from typing import Annotated
+
+from fastapi import Depends, HTTPException, Request
+from jwt import InvalidTokenError, decode
+
+from src.todo_list.instrumentation import timed
+from src.todo_list.settings import Settings
+
+settings = Settings()  # pyright: ignore[reportCallIssue]
+
+
+class RateLimiter(ABC):
+    """
+    Token buckets by key.
+
+    Backends only store buckets; rejection accounting lives here. A shared
+    backend (Redis, the database) makes every worker draw from the same
+    buckets, and must refill and take in one atomic step, e.g. with a
+    server-side script.
+    """
+
+    def __init__(self):
+        self.rejected: Counter[str] = Counter()
+
+    async def take(
+        self, scope: str, key: str, rate: float, burst: int
+    ) -> float:
+        """
+        Take a token from `key`'s bucket in `scope`, refilled at `rate`
+        tokens per second up to `burst`. Returns 0, or the seconds until a
+        token is available when the bucket is empty.
+        """
+        retry_after = await self._take(f"{scope}:{key}", rate, burst)
+
+        if retry_after:
+            self.rejected[scope] += 1
+
+        return retry_after
+
+    @abstractmethod
+    async def _take(self, key: str, rate: float, burst: int) -> float: ...
+
+
+class InMemoryRateLimiter(RateLimiter):
+    """
+    Per-process buckets: with several workers each one allows the full
+    rate. Only the `max_keys` most recently used buckets are kept; a
+    dropped bucket comes back full, as an idle one would have refilled.
+    """
+
+    def __init__(self, max_keys: int):
+        super().__init__()
+        self.max_keys = max_keys
+        # key -> (tokens, monotonic time they were counted)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def _take(self, key: str, rate: float, burst: int) -> float:
+        now = monotonic()
+        tokens, counted_at = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - counted_at) * rate)
+
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / rate
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        return retry_after
+
+
+class ConcurrencyLimiter:
+    """
+    Requests in progress per route in this process. Past its cap a route
+    rejects new requests, leaving the pool to the other routes.
+    """
+
+    def __init__(self, default_limit: int, limits: dict[str, int]):
+        self.default_limit = default_limit
+        self.limits = limits
+        self.in_flight: Counter[str] = Counter()
+        self.rejected: Counter[str] = Counter()
+
+    def acquire(self, route: str) -> bool:
+        limit = self.limits.get(route, self.default_limit)
+
+        if limit and self.in_flight[route] >= limit:
+            self.rejected[route] += 1
+            return False
+
+        self.in_flight[route] += 1
+        return True
+
+    def release(self, route: str):
+        self.in_flight[route] -= 1
+
+
+rate_limiter = (
+    InMemoryRateLimiter(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+    if settings.RATE_LIMIT_ENABLED
+    else None
+)
+concurrency_limiter = ConcurrencyLimiter(
+    default_limit=settings.ROUTE_MAX_CONCURRENCY,
+    limits=settings.ROUTE_CONCURRENCY_LIMITS,
+)
+
+
+def get_rate_limiter() -> RateLimiter | None:
+    return rate_limiter
+
+
+def get_concurrency_limiter() -> ConcurrencyLimiter | None:
+    return concurrency_limiter
+
+
+def client_ip(request: Request) -> str:
+    if settings.RATE_LIMIT_CLIENT_IP_HEADER and (
+        forwarded := request.headers.get(settings.RATE_LIMIT_CLIENT_IP_HEADER)
+    ):
+        return forwarded
+
+    return request.client.host if request.client else "unknown"
+
+
+def client_key(request: Request) -> str:
+    """
+    The caller's user id if the request carries a valid access token, its
+    address otherwise. The token is verified: an unsigned uid would let
+    anyone drain another user's bucket.
+    """
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+
+    if scheme.lower() == "bearer" and token:
+        try:
+            with timed("jwt_seconds"):
+                payload = decode(
+                    token, settings.SECRET_KEY, algorithms=settings.ALGORITHM
+                )
+        except InvalidTokenError:
+            payload = {}
+
+        if isinstance(payload.get("uid"), int):
+            return f"user:{payload['uid']}"
+
+    return f"ip:{client_ip(request)}"
+
+
+class RateLimit:
+    """
+    Dependency allowing each caller `rate` requests per second, in bursts
+    of up to `burst`, from a bucket of its own for `scope`.
+    """
+
+    def __init__(
+        self,
+        scope: str,
+        rate: float,
+        burst: int,
+        key: Callable[[Request], str] = client_key,
+    ):
+        self.scope = scope
+        self.rate = rate
+        self.burst = burst
+        self.key = key
+
+    async def __call__(
+        self,
+        request: Request,
+        limiter: Annotated[RateLimiter | None, Depends(get_rate_limiter)],
+    ):
+        if limiter is None:
+            return
+
+        retry_after = await limiter.take(
+            self.scope, self.key(request), self.rate, self.burst
+        )
+        if retry_after:
+            raise HTTPException(
+                status_code=HTTPStatus.TOO_MANY_REQUESTS,
+                detail="Too many requests, slow down.",
+                headers={"Retry-After": str(ceil(retry_after))},
+            )
+
+
+async def limit_concurrency(
+    request: Request,
+    limiter: Annotated[
+        ConcurrencyLimiter | None, Depends(get_concurrency_limiter)
+    ],
+):
+    """
+    Holds a slot of the route's cap until the response is sent.
+    """
+    if limiter is None:
+        yield
+        return
+
+    route = request.scope["route"].name
+    if not limiter.acquire(route):
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail="Server is busy, try again later.",
+            headers={"Retry-After": "1"},
+        )
+
+    try:
+        yield
+    finally:
+        limiter.release(route)
+
+
+api_rate_limit = RateLimit(
+    "api", settings.RATE_LIMIT_PER_SECOND, settings.RATE_LIMIT_BURST
+)
+login_rate_limit = RateLimit(
+    "login",
+    settings.LOGIN_RATE_LIMIT_PER_MINUTE / 60,
+    settings.LOGIN_RATE_LIMIT_BURST,
+    key=client_ip,
+)
@@ -1,12 +1,89 @@
 from datetime import datetime
 from enum import Enum
 
+from sqlalchemy import (
+    DDL,
+    JSON,
+    BigInteger,
+    ForeignKey,
+    Index,
+    Sequence,
+    event,
+    func,
+    text,
+)
 from sqlalchemy import Enum as SAEnum
-from sqlalchemy import ForeignKey, func
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import Mapped, mapped_column, registry, relationship
+from sqlalchemy.sql.functions import FunctionElement
 
 table_registry = registry()
 
+# The trigram indexes on todos need pg_trgm, other databases skip them.
+event.listen(
+    table_registry.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(
+        dialect="postgresql"
+    ),
+)
+
+# Ids of todo change feed events, shared by every worker (see
+# events.PostgresChangeFeed); created by migration c4e9a1f27b36.
+todo_event_id_seq = Sequence(
+    "todo_event_id_seq", metadata=table_registry.metadata
+)
+
+
+class current_change_id(FunctionElement):  # noqa: N801
+    """
+    Position of the writing transaction in the todo change log
+    (GET /todos/changes). On Postgres it is the transaction id, so every
+    row a transaction writes shares it; see change_horizon for why.
+    SQLite runs one writer at a time, and one past the latest position
+    is already in commit order.
+    """
+
+    type = BigInteger()
+    name = "current_change_id"
+    inherit_cache = True
+
+
+@compiles(current_change_id)
+def _current_change_id_fallback(element, compiler, **kw):
+    return "(SELECT coalesce(max(change_id), 0) + 1 FROM todos)"
+
+
+@compiles(current_change_id, "postgresql")
+def _current_change_id_postgresql(element, compiler, **kw):
+    return "pg_current_xact_id()::text::bigint"
+
+
+class change_horizon(FunctionElement):  # noqa: N801
+    """
+    Change log positions below this are final. Postgres hands out
+    transaction ids when transactions start writing, not when they
+    commit, so a slow one can commit rows behind a client's cursor; they
+    are held back until the oldest transaction still running is over.
+    That's any user's transaction, so writers keep theirs short: request
+    writes are capped at DB_WRITE_TRANSACTION_TIMEOUT, and imports, purges
+    and tasks commit batch by batch. Nothing is held back on SQLite.
+    """
+
+    type = BigInteger()
+    name = "change_horizon"
+    inherit_cache = True
+
+
+@compiles(change_horizon)
+def _change_horizon_fallback(element, compiler, **kw):
+    return "9223372036854775807"
+
+
+@compiles(change_horizon, "postgresql")
+def _change_horizon_postgresql(element, compiler, **kw):
+    return "pg_snapshot_xmin(pg_current_snapshot())::text::bigint"
+
 
 class TodoState(str, Enum):
     draft = "draft"
@@ -19,12 +96,26 @@ class TodoState(str, Enum):
 @table_registry.mapped_as_dataclass
 class User:
     __tablename__ = "users"
+    # Fetch id/created_at/updated_at with RETURNING on INSERT and UPDATE,
+    # so writes don't need a session.refresh() afterwards.
+    __mapper_args__ = {"eager_defaults": True}
+    # Deleted users keep their row until the purger removes it, so emails
+    # are only unique among live users (migration f3c7d9e2a561).
+    __table_args__ = (
+        Index(
+            "ix_users_email_live",
+            "email",
+            unique=True,
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(
         init=False, autoincrement=True, primary_key=True
     )
     name: Mapped[str]
-    email: Mapped[str] = mapped_column(unique=True)
+    email: Mapped[str]
     password: Mapped[str]
     created_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now()
@@ -32,15 +123,64 @@ class User:
     updated_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now(), onupdate=func.now()
     )
+    # Set by DELETE /users/{id}; purge.py removes the user and its todos
+    # later. Every other query must filter deleted users out.
+    deleted_at: Mapped[datetime | None] = mapped_column(
+        init=False, default=None
+    )
 
+    # The database cascades the delete to todos (ON DELETE CASCADE), the
+    # ORM doesn't load them to do it.
     todos: Mapped[list["Todo"]] = relationship(
-        init=False, cascade="all, delete-orphan", lazy="selectin"
+        init=False,
+        cascade="all, delete-orphan",
+        lazy="raise",
+        passive_deletes=True,
     )
 
 
 @table_registry.mapped_as_dataclass
 class Todo:
     __tablename__ = "todos"
+    __mapper_args__ = {"eager_defaults": True}
+    # Every todo query filters on user_id and pages by id; keep the
+    # composites in sync with migrations 5c1e7a92d3b4 and d1a5b3c8e742, the
+    # trigram indexes with migration a3f06d1b8e27, the partial ones with
+    # migration f3c7d9e2a561 and the change log's with b5d8e3f1a27c.
+    __table_args__ = (
+        Index("ix_todos_user_id_id", "user_id", "id"),
+        Index("ix_todos_user_id_state_id", "user_id", "state", "id"),
+        # The change log (GET /todos/changes), and on SQLite the next
+        # change_id (see current_change_id)
+        Index("ix_todos_user_id_change_id_id", "user_id", "change_id", "id"),
+        Index("ix_todos_change_id", "change_id").ddl_if(dialect="sqlite"),
+        Index(
+            "ix_todos_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_todos_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        # Small partial indexes for the purger (purge.py): tombstones by
+        # age, and live todos left in the trash
+        Index(
+            "ix_todos_deleted_at",
+            "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+            sqlite_where=text("deleted_at IS NOT NULL"),
+        ),
+        Index(
+            "ix_todos_trash_updated_at",
+            "updated_at",
+            postgresql_where=text("state = 'trash' AND deleted_at IS NULL"),
+            sqlite_where=text("state = 'trash' AND deleted_at IS NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(
         init=False, autoincrement=True, primary_key=True
@@ -56,5 +196,89 @@ class Todo:
     updated_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now(), onupdate=func.now()
     )
+    # Deleted todos are kept as tombstones for the change log; every other
+    # query must filter them out.
+    deleted_at: Mapped[datetime | None] = mapped_column(
+        init=False, default=None
+    )
+    # Moved by every write, soft deletes included; writers that bypass
+    # the ORM defaults (COPY) must set it themselves.
+    change_id: Mapped[int] = mapped_column(
+        BigInteger,
+        init=False,
+        default=current_change_id(),
+        onupdate=current_change_id(),
+    )
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE")
+    )
+
+
+@table_registry.mapped_as_dataclass
+class TodoCount:
+    """
+    Live (not deleted) todos per user and state, behind GET /todos/stats.
+    Every write to todos adjusts these in the same transaction; see
+    stats.py for the helpers and the consistency checker.
+    """
+
+    __tablename__ = "todo_counts"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    state: Mapped[TodoState] = mapped_column(
+        SAEnum(TodoState, native_enum=False), primary_key=True
+    )
+    count: Mapped[int] = mapped_column(default=0)
+
+
+@table_registry.mapped_as_dataclass
+class TodoListVersion:
+    """
+    Bumped by every write to a user's todos, in the same transaction (see
+    stats.adjust_todo_counts); the todo list ETag is built from it. A
+    user without a row has version 0.
+    """
+
+    __tablename__ = "todo_list_versions"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    version: Mapped[int] = mapped_column(BigInteger, default=0)
+
+
+@table_registry.mapped_as_dataclass
+class QueuedTask:
+    """
+    Deferred work run by tasks.TaskRunner. `run_after` is when the task
+    is next due: claiming it pushes it a lease ahead, failing it a backoff
+    ahead. Done tasks are deleted; failed_at marks those out of attempts.
+    """
+
+    __tablename__ = "task_queue"
+    # What workers poll for; keep in sync with migration a9e4c2d7b815
+    __table_args__ = (
+        Index(
+            "ix_task_queue_kind_run_after",
+            "kind",
+            "run_after",
+            postgresql_where=text("failed_at IS NULL"),
+            sqlite_where=text("failed_at IS NULL"),
+        ),
+    )
 
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    id: Mapped[int] = mapped_column(
+        init=False, autoincrement=True, primary_key=True
+    )
+    kind: Mapped[str]
+    payload: Mapped[dict] = mapped_column(JSON)
+    run_after: Mapped[datetime]
+    attempts: Mapped[int] = mapped_column(default=0)
+    last_error: Mapped[str | None] = mapped_column(default=None)
+    failed_at: Mapped[datetime | None] = mapped_column(default=None)
+    created_at: Mapped[datetime] = mapped_column(
+        init=False, server_default=func.now()
+    )
@@ -0,0 +1,81 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
+from json import JSONDecodeError, dumps, loads
+
+from sqlalchemy import Select
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+def _encode(position: dict) -> str:
+    return urlsafe_b64encode(dumps(position).encode()).decode()
+
+
+def _decode(cursor: str) -> dict:
+    try:
+        position = loads(urlsafe_b64decode(cursor.encode()))
+    except (Base64Error, JSONDecodeError, UnicodeDecodeError, TypeError):
+        raise ValueError("Invalid cursor.")
+
+    if not isinstance(position, dict):
+        raise ValueError("Invalid cursor.")
+
+    return position
+
+
+def encode_cursor(last_id: int) -> str:
+    """
+    Cursors are opaque to clients: base64 of the last seen id.
+    """
+    return _encode({"id": last_id})
+
+
+def decode_cursor(cursor: str) -> int:
+    last_id = _decode(cursor).get("id")
+
+    if not isinstance(last_id, int):
+        raise ValueError("Invalid cursor.")
+
+    return last_id
+
+
+def encode_change_cursor(change_id: int, last_id: int) -> str:
+    """
+    Position in a (change_id, id) ordered change log.
+    """
+    return _encode({"change_id": change_id, "id": last_id})
+
+
+def decode_change_cursor(cursor: str) -> tuple[int, int]:
+    position = _decode(cursor)
+    change_id, last_id = position.get("change_id"), position.get("id")
+
+    if not (isinstance(change_id, int) and isinstance(last_id, int)):
+        raise ValueError("Invalid cursor.")
+
+    return change_id, last_id
+
+
+def paginate(
+    query: Select,
+    id_column: InstrumentedAttribute[int],
+    limit: int,
+    offset: int = 0,
+    cursor: str | None = None,
+) -> Select:
+    """
+    Keyset pagination when a cursor is given, offset pagination otherwise.
+    Both modes order by `id_column` so pages are stable between requests.
+    """
+    query = query.order_by(id_column).limit(limit)
+
+    if cursor:
+        return query.where(id_column > decode_cursor(cursor))
+
+    return query.offset(offset)
+
+
+def next_cursor(rows: list, limit: int) -> str | None:
+    if not rows or len(rows) < limit:
+        return None
+
+    return encode_cursor(rows[-1].id)
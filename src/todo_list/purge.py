@@ -0,0 +1,250 @@
+"""
+Background removal of deleted users and todos.
+
+Requests only mark rows deleted (`deleted_at`), so none of them waits on
+a large delete. The purger, started with the app, then:
+
+- deletes todos left in the trash for PURGE_TRASH_AFTER_DAYS, like
+  DELETE /todos/{id} would (counters, change feed and tombstone included);
+- removes tombstones older than PURGE_TOMBSTONE_DAYS;
+- removes deleted users' todos, then the users (ON DELETE CASCADE takes
+  their counters and anything written since).
+
+Each batch of PURGE_BATCH_SIZE rows is its own short transaction,
+followed by a PURGE_PAUSE_SECONDS pause, so a purge never holds locks
+for long or saturates the database. One pass can also be run by hand:
+
+    python -m src.todo_list.purge
+"""
+
+import argparse
+import asyncio
+import logging
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+from functools import partial
+from time import perf_counter
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from src.todo_list.database import engine
+from src.todo_list.events import ChangeFeed, change_feed, todo_deleted
+from src.todo_list.models import Todo, TodoState, User
+from src.todo_list.settings import Settings
+from src.todo_list.stats import adjust_todo_counts, state_deltas
+
+settings = Settings()  # pyright: ignore[reportCallIssue]
+logger = logging.getLogger(__name__)
+
+
+class TrashPurger:
+    """
+    Runs `purge` every `interval_seconds` between `start` and `stop`.
+    The counters are exposed on /metrics to follow its progress.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        engine: AsyncEngine,
+        feed: ChangeFeed,
+        *,
+        batch_size: int,
+        pause_seconds: float,
+        interval_seconds: float,
+        trash_after: timedelta,
+        tombstone_retention: timedelta,
+    ):
+        self.engine = engine
+        self.feed = feed
+        self.batch_size = batch_size
+        self.pause_seconds = pause_seconds
+        self.interval_seconds = interval_seconds
+        self.trash_after = trash_after
+        self.tombstone_retention = tombstone_retention
+        self.trashed_todos = 0
+        self.purged_todos = 0
+        self.purged_users = 0
+        self.batches = 0
+        self.failures = 0
+        self.last_run_seconds = 0.0
+        self._task: asyncio.Task | None = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run_forever(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.purge()
+            except Exception:
+                self.failures += 1
+                logger.exception("Purge failed, retrying next interval")
+
+    async def purge(self):
+        """
+        One full pass; returns once every phase ran out of rows.
+        """
+        start = perf_counter()
+        # Ages are measured with the database clock, which set them
+        async with AsyncSession(self.engine) as session:
+            now = await session.scalar(select(func.now()))
+
+        await self._in_batches(
+            partial(self._expire_trash, cutoff=now - self.trash_after)
+        )
+        await self._in_batches(
+            partial(
+                self._purge_tombstones, cutoff=now - self.tombstone_retention
+            )
+        )
+        await self._in_batches(self._purge_user_todos)
+        await self._in_batches(self._purge_users)
+
+        self.last_run_seconds = perf_counter() - start
+
+    async def _in_batches(
+        self, purge_batch: Callable[[AsyncSession], Awaitable[int]]
+    ):
+        while True:
+            async with AsyncSession(self.engine) as session:
+                purged = await purge_batch(session)
+            self.batches += 1
+
+            if purged < self.batch_size:
+                return
+            await asyncio.sleep(self.pause_seconds)
+
+    async def _expire_trash(self, session: AsyncSession, cutoff: datetime):
+        expired = (
+            Todo.state == TodoState.trash,
+            Todo.deleted_at.is_(None),
+            Todo.updated_at < cutoff,
+        )
+        batch = (
+            select(Todo.id)
+            .where(*expired)
+            .order_by(Todo.updated_at)
+            .limit(self.batch_size)
+        )
+        # The conditions are repeated outside the subquery so a todo
+        # restored in the meantime is left alone.
+        deleted = await session.execute(
+            update(Todo)
+            .where(Todo.id.in_(batch.scalar_subquery()), *expired)
+            .values(deleted_at=func.now())
+            .returning(Todo.user_id, Todo.id)
+            .execution_options(synchronize_session=False)
+        )
+        by_user = defaultdict(list)
+        for user_id, todo_id in deleted:
+            by_user[user_id].append(todo_id)
+
+        for user_id, todo_ids in sorted(by_user.items()):
+            await adjust_todo_counts(
+                session,
+                user_id,
+                state_deltas(removed=[TodoState.trash] * len(todo_ids)),
+            )
+        await session.commit()
+
+        for user_id, todo_ids in by_user.items():
+            await self.feed.publish(
+                user_id, [todo_deleted(id_) for id_ in sorted(todo_ids)]
+            )
+
+        trashed = sum(map(len, by_user.values()))
+        self.trashed_todos += trashed
+
+        return trashed
+
+    async def _purge_tombstones(self, session: AsyncSession, cutoff: datetime):
+        batch = (
+            select(Todo.id)
+            .where(Todo.deleted_at < cutoff)
+            .order_by(Todo.deleted_at)
+            .limit(self.batch_size)
+        )
+
+        return await self._delete_todos(session, batch)
+
+    async def _purge_user_todos(self, session: AsyncSession):
+        batch = (
+            select(Todo.id)
+            .join(User, Todo.user_id == User.id)
+            .where(User.deleted_at.is_not(None))
+            .limit(self.batch_size)
+        )
+
+        return await self._delete_todos(session, batch)
+
+    async def _delete_todos(self, session: AsyncSession, batch) -> int:
+        deleted = await session.execute(
+            delete(Todo)
+            .where(Todo.id.in_(batch.scalar_subquery()))
+            .returning(Todo.id)
+            .execution_options(synchronize_session=False)
+        )
+        purged = len(deleted.all())
+        await session.commit()
+        self.purged_todos += purged
+
+        return purged
+
+    async def _purge_users(self, session: AsyncSession):
+        batch = (
+            select(User.id)
+            .where(User.deleted_at.is_not(None))
+            .order_by(User.id)
+            .limit(self.batch_size)
+        )
+        deleted = await session.execute(
+            delete(User)
+            .where(User.id.in_(batch.scalar_subquery()))
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+        purged = len(deleted.all())
+        await session.commit()
+        self.purged_users += purged
+
+        return purged
+
+
+purger = TrashPurger(
+    engine,
+    change_feed,
+    batch_size=settings.PURGE_BATCH_SIZE,
+    pause_seconds=settings.PURGE_PAUSE_SECONDS,
+    interval_seconds=settings.PURGE_INTERVAL_SECONDS,
+    trash_after=timedelta(days=settings.PURGE_TRASH_AFTER_DAYS),
+    tombstone_retention=timedelta(days=settings.PURGE_TOMBSTONE_DAYS),
+)
+
+
+async def main():
+    await purger.purge()
+    print(
+        f"{purger.trashed_todos} trashed todos deleted, "
+        f"{purger.purged_todos} todos and {purger.purged_users} users "
+        f"purged in {purger.batches} batches "
+        f"({purger.last_run_seconds:.1f}s)"
+    )
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    ).parse_args()
+
+    asyncio.run(main())
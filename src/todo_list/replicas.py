@@ -0,0 +1,163 @@
+from contextlib import asynccontextmanager
+from itertools import count
+from time import time
+from typing import Annotated, Literal
+
+from fastapi import Depends
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from src.todo_list.database import (
+    get_session,
+    limit_transactions,
+    make_engine,
+)
+from src.todo_list.security import Principal, get_current_principal
+from src.todo_list.settings import Settings
+
+settings = Settings()  # pyright: ignore[reportCallIssue]
+
+
+class ReplicaRouter:
+    """
+    Picks the engine that serves a read: one of the replicas, or None for
+    the primary. Reads of data whose owner wrote recently, and reads
+    arriving while every replica is down, stay on the primary.
+    """
+
+    def __init__(
+        self,
+        replicas: list[AsyncEngine],
+        balancing: Literal["round_robin", "least_connections"] = (
+            "round_robin"
+        ),
+        read_your_writes_seconds: float = 5,
+        retry_seconds: float = 30,
+    ):
+        self.replicas = replicas
+        self.balancing = balancing
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.retry_seconds = retry_seconds
+        self.replica_reads = 0
+        self.fallbacks = 0
+        self._turn = count()
+        self._in_flight = dict.fromkeys(replicas, 0)
+        self._down_until: dict[AsyncEngine, float] = {}
+        self._written_at: dict[int, float] = {}
+
+    def record_write(self, owner_id: int):
+        now = time()
+        self._written_at[owner_id] = now
+
+        for written_owner_id, written_at in list(self._written_at.items()):
+            if written_at < now - self.read_your_writes_seconds:
+                del self._written_at[written_owner_id]
+
+    def engine_for_read(self, owner_id: int | None) -> AsyncEngine | None:
+        now = time()
+
+        if owner_id is not None and (
+            self._written_at.get(owner_id, 0)
+            >= now - self.read_your_writes_seconds
+        ):
+            return None
+
+        healthy = [
+            replica
+            for replica in self.replicas
+            if self._down_until.get(replica, 0) <= now
+        ]
+        if not healthy:
+            return None
+
+        if self.balancing == "least_connections":
+            return min(healthy, key=self._in_flight.__getitem__)
+
+        return healthy[next(self._turn) % len(healthy)]
+
+    @asynccontextmanager
+    async def read_session(self, owner_id: int | None, primary: AsyncSession):
+        """
+        Yield a session on a replica, or `primary` when the read has to
+        (or, after a failed connect, can only) be served by the primary.
+        """
+        replica = self.engine_for_read(owner_id)
+        if replica is None:
+            yield primary
+            return
+
+        self._in_flight[replica] += 1
+        try:
+            async with AsyncSession(
+                replica, expire_on_commit=False
+            ) as replica_session:
+                try:
+                    await replica_session.connection()
+                except (DBAPIError, OSError):
+                    self._down_until[replica] = time() + self.retry_seconds
+                    self.fallbacks += 1
+                    session = primary
+                else:
+                    self.replica_reads += 1
+                    session = replica_session
+
+                yield session
+        finally:
+            self._in_flight[replica] -= 1
+
+
+replica_router = ReplicaRouter(
+    [make_engine(settings, url) for url in settings.DATABASE_REPLICA_URLS],
+    balancing=settings.REPLICA_BALANCING,
+    read_your_writes_seconds=settings.REPLICA_READ_YOUR_WRITES_SECONDS,
+    retry_seconds=settings.REPLICA_RETRY_SECONDS,
+)
+
+
+def get_replica_router() -> ReplicaRouter:
+    return replica_router
+
+
+SessionDep = Annotated[AsyncSession, Depends(get_session)]
+CurrentPrincipalDep = Annotated[Principal, Depends(get_current_principal)]
+ReplicaRouterDep = Annotated[ReplicaRouter, Depends(get_replica_router)]
+
+
+async def get_read_session(
+    session: SessionDep,
+    current_principal: CurrentPrincipalDep,
+    replicas: ReplicaRouterDep,
+):
+    """
+    Session for a handler that only reads the caller's own data.
+    """
+    async with replicas.read_session(current_principal.id, session) as s:
+        yield s
+
+
+async def get_user_read_session(
+    user_id: int, session: SessionDep, replicas: ReplicaRouterDep
+):
+    """
+    Session for a handler that only reads the user in the `user_id` path
+    parameter.
+    """
+    async with replicas.read_session(user_id, session) as s:
+        yield s
+
+
+async def get_write_session(
+    session: SessionDep,
+    current_principal: CurrentPrincipalDep,
+    replicas: ReplicaRouterDep,
+):
+    """
+    Primary session for a handler that changes the caller's data. The
+    write is recorded up front as well, since the response can reach the
+    client before this dependency exits. Its transactions are limited to
+    DB_WRITE_TRANSACTION_TIMEOUT.
+    """
+    await limit_transactions(session, settings.DB_WRITE_TRANSACTION_TIMEOUT)
+    replicas.record_write(current_principal.id)
+    yield session
+    replicas.record_write(current_principal.id)
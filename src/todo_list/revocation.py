@@ -0,0 +1,45 @@
+from time import time
+
+from src.todo_list.settings import Settings
+
+settings = Settings()  # pyright: ignore[reportCallIssue]
+
+
+class TokenDenylist:
+    """
+    Per-process record of users whose previously issued tokens are no
+    longer valid. Entries only need to outlive the tokens they revoke, so
+    the list stays as small as the revocations of the last token lifetime.
+    """
+
+    def __init__(self, token_lifetime: int):
+        self.token_lifetime = token_lifetime
+        self._revoked_at: dict[int, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._revoked_at)
+
+    def revoke(self, user_id: int):
+        """
+        Revoke every token issued to `user_id` up to now.
+        """
+        now = time()
+        self._revoked_at[user_id] = now
+
+        for revoked_user_id, revoked_at in list(self._revoked_at.items()):
+            if revoked_at < now - self.token_lifetime:
+                del self._revoked_at[revoked_user_id]
+
+    def is_revoked(self, user_id: int, issued_at: float) -> bool:
+        revoked_at = self._revoked_at.get(user_id)
+
+        return revoked_at is not None and issued_at <= revoked_at
+
+
+token_denylist = TokenDenylist(
+    token_lifetime=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
+
+
+def get_token_denylist() -> TokenDenylist:
+    return token_denylist
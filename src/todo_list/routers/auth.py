@@ -7,12 +7,13 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.todo_list.database import get_session
+from src.todo_list.limits import login_rate_limit
 from src.todo_list.models import User
 from src.todo_list.schemas import Token
 from src.todo_list.security import (
     create_access_token,
     get_current_user,
-    verify_password,
+    verify_password_async,
 )
 
 router = APIRouter(tags=["auth"], prefix="/auth")
@@ -21,22 +22,28 @@ SessionDep = Annotated[AsyncSession, Depends(get_session)]
 OAuth2FormDep = Annotated[OAuth2PasswordRequestForm, Depends()]
 
 
-@router.post("/login", response_model=Token)
+@router.post(
+    "/login", response_model=Token, dependencies=[Depends(login_rate_limit)]
+)
 async def login(
     form_data: OAuth2FormDep,
     session: SessionDep,
 ):
     user = await session.scalar(
-        select(User).where(User.email == form_data.username)
+        select(User).where(
+            User.email == form_data.username, User.deleted_at.is_(None)
+        )
     )
 
-    if not user or not verify_password(form_data.password, user.password):
+    if not user or not await verify_password_async(
+        form_data.password, user.password
+    ):
         raise HTTPException(
             status_code=HTTPStatus.UNAUTHORIZED,
             detail="Incorret email or password",
         )
 
-    access_token = create_access_token({"sub": user.email})
+    access_token = create_access_token({"sub": user.email, "uid": user.id})
 
     return {"access_token": access_token, "token_type": "Bearer"}
 
@@ -45,6 +52,8 @@ async def login(
 async def refresh_access_token(
     user: Annotated[User, Depends(get_current_user)],
 ):
-    new_access_token = create_access_token(data={"sub": user.email})
+    new_access_token = create_access_token(
+        data={"sub": user.email, "uid": user.id}
+    )
 
     return {"access_token": new_access_token, "token_type": "Bearer"}
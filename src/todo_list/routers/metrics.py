@@ -0,0 +1,190 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.pool import QueuePool
+
+from src.todo_list.cache import PrincipalCache, get_principal_cache
+from src.todo_list.database import engine
+from src.todo_list.events import change_feed
+from src.todo_list.instrumentation import (
+    labelled_samples,
+    render_metrics,
+    sample,
+)
+from src.todo_list.limits import concurrency_limiter, rate_limiter
+from src.todo_list.purge import purger
+from src.todo_list.replicas import replica_router
+from src.todo_list.security import hashing_pool
+from src.todo_list.tasks import task_runner
+
+router = APIRouter(tags=["metrics"])
+
+PrincipalCacheDep = Annotated[PrincipalCache, Depends(get_principal_cache)]
+
+
+def pool_gauges() -> list[str]:
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return []
+
+    return [
+        *sample("db_pool_size", "gauge", "Configured pool size.", pool.size()),
+        *sample(
+            "db_pool_checked_out",
+            "gauge",
+            "Connections currently checked out.",
+            pool.checkedout(),
+        ),
+        *sample(
+            "db_pool_checked_in",
+            "gauge",
+            "Idle connections in the pool.",
+            pool.checkedin(),
+        ),
+        *sample(
+            "db_pool_overflow",
+            "gauge",
+            "Connections open beyond pool_size (negative while the pool "
+            "is still filling up).",
+            pool.overflow(),
+        ),
+    ]
+
+
+@router.get(
+    "/metrics", response_class=PlainTextResponse, include_in_schema=False
+)
+async def get_metrics(cache: PrincipalCacheDep):
+    return render_metrics([
+        *pool_gauges(),
+        *sample(
+            "principal_cache_hits_total",
+            "counter",
+            "Principal cache hits.",
+            cache.hits,
+        ),
+        *sample(
+            "principal_cache_misses_total",
+            "counter",
+            "Principal cache misses.",
+            cache.misses,
+        ),
+        *sample(
+            "password_hash_pending",
+            "gauge",
+            "Password hashing jobs queued or running.",
+            hashing_pool.pending,
+        ),
+        *sample(
+            "password_hash_rejected_total",
+            "counter",
+            "Password hashing jobs rejected with 503.",
+            hashing_pool.rejected,
+        ),
+        *sample(
+            "replica_reads_total",
+            "counter",
+            "Reads served by a read replica.",
+            replica_router.replica_reads,
+        ),
+        *sample(
+            "replica_fallbacks_total",
+            "counter",
+            "Reads sent to the primary after a replica failed to connect.",
+            replica_router.fallbacks,
+        ),
+        *sample(
+            "change_feed_subscribers",
+            "gauge",
+            "Open todo change streams.",
+            change_feed.subscriber_count,
+        ),
+        *sample(
+            "change_feed_dropped_total",
+            "counter",
+            "Events not queued because a stream fell too far behind.",
+            change_feed.dropped,
+        ),
+        *sample(
+            "purge_trashed_todos_total",
+            "counter",
+            "Todos deleted after too long in the trash.",
+            purger.trashed_todos,
+        ),
+        *sample(
+            "purge_todos_total",
+            "counter",
+            "Tombstones and deleted users' todos removed.",
+            purger.purged_todos,
+        ),
+        *sample(
+            "purge_users_total",
+            "counter",
+            "Deleted users removed.",
+            purger.purged_users,
+        ),
+        *sample(
+            "purge_batches_total",
+            "counter",
+            "Purge transactions run.",
+            purger.batches,
+        ),
+        *sample(
+            "purge_failures_total",
+            "counter",
+            "Purge passes that failed.",
+            purger.failures,
+        ),
+        *sample(
+            "purge_last_run_seconds",
+            "gauge",
+            "Duration of the last complete purge pass.",
+            purger.last_run_seconds,
+        ),
+        *sample(
+            "tasks_running",
+            "gauge",
+            "Queued tasks running in this process.",
+            task_runner.running,
+        ),
+        *sample(
+            "tasks_completed_total",
+            "counter",
+            "Queued tasks that succeeded.",
+            task_runner.completed,
+        ),
+        *sample(
+            "tasks_retried_total",
+            "counter",
+            "Queued task runs that failed and were scheduled again.",
+            task_runner.retried,
+        ),
+        *sample(
+            "tasks_failed_total",
+            "counter",
+            "Queued tasks that failed their last attempt.",
+            task_runner.failed,
+        ),
+        *labelled_samples(
+            "rate_limit_rejected_total",
+            "counter",
+            "Requests rejected with 429, by limit.",
+            "scope",
+            rate_limiter.rejected if rate_limiter else {},
+        ),
+        *labelled_samples(
+            "route_in_flight",
+            "gauge",
+            "Requests in progress, by route.",
+            "route",
+            concurrency_limiter.in_flight,
+        ),
+        *labelled_samples(
+            "route_concurrency_rejected_total",
+            "counter",
+            "Requests rejected with 503 at the route's concurrency cap.",
+            "route",
+            concurrency_limiter.rejected,
+        ),
+    ])
@@ -1,34 +1,102 @@
 from http import HTTPStatus
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, insert, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.todo_list.database import get_session
+from src.todo_list.etags import (
+    conditional_response,
+    make_etag,
+    todo_list_version,
+)
+from src.todo_list.events import (
+    ChangeFeed,
+    get_change_feed,
+    todo_change,
+    todo_deleted,
+)
+from src.todo_list.exports import MEDIA_TYPES, export_todos
+from src.todo_list.imports import import_todos
 from src.todo_list.models import (
     Todo,
+    TodoState,
     User,
+    change_horizon,
+)
+from src.todo_list.pagination import (
+    decode_change_cursor,
+    encode_change_cursor,
+    next_cursor,
+    paginate,
+)
+from src.todo_list.replicas import get_read_session, get_write_session
+from src.todo_list.responses import (
+    TODO_PUBLIC_COLUMNS,
+    fast_json,
+    todo_changes_rows,
+    todo_list_rows,
 )
 from src.todo_list.schemas import (
+    BulkItemError,
+    FilterChanges,
     FilterTodo,
     Message,
+    TodoBulkCreate,
+    TodoBulkDelete,
+    TodoBulkDeleted,
+    TodoBulkList,
+    TodoBulkUpdate,
+    TodoChanges,
+    TodoImportSummary,
     TodoList,
     TodoPublic,
     TodoSchema,
+    TodoStats,
     TodoUpdate,
 )
-from src.todo_list.security import get_current_user
+from src.todo_list.search import todo_search_filter, todo_search_rank
+from src.todo_list.security import (
+    Principal,
+    get_current_principal,
+    get_current_user,
+)
+from src.todo_list.settings import Settings
+from src.todo_list.stats import (
+    adjust_todo_counts,
+    state_deltas,
+    todo_counts_query,
+)
 
 router = APIRouter(prefix="/todos", tags=["todos"])
+settings = Settings()  # pyright: ignore[reportCallIssue]
 
-SessionDep = Annotated[AsyncSession, Depends(get_session)]
+# Reads may be served by a replica, see `replicas.ReplicaRouter`; writes
+# go to the primary and keep the caller's reads there for a while.
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_session)]
+WriteSessionDep = Annotated[AsyncSession, Depends(get_write_session)]
+# Creating a todo needs the user row to exist; reads, updates and deletes
+# only filter on the caller's id, which the token alone provides.
 CurrentUserDep = Annotated[User, Depends(get_current_user)]
+CurrentPrincipalDep = Annotated[Principal, Depends(get_current_principal)]
+ChangeFeedDep = Annotated[ChangeFeed, Depends(get_change_feed)]
 
 
 @router.post("/", response_model=TodoPublic)
 async def create_todo(
-    todo: TodoSchema, current_user: CurrentUserDep, session: SessionDep
+    todo: TodoSchema,
+    current_user: CurrentUserDep,
+    session: WriteSessionDep,
+    feed: ChangeFeedDep,
 ):
     db_todo = Todo(
         user_id=current_user.id,
@@ -38,20 +106,34 @@ async def create_todo(
     )
 
     session.add(db_todo)
+    await adjust_todo_counts(
+        session, current_user.id, state_deltas(added=[todo.state])
+    )
 
     await session.commit()
-    await session.refresh(db_todo)
+    await feed.publish(current_user.id, [todo_change("created", db_todo)])
 
     return db_todo
 
 
 @router.get("/", response_model=TodoList)
 async def get_all_todos(
-    session: SessionDep,
-    current_user: CurrentUserDep,
+    request: Request,
+    response: Response,
+    session: ReadSessionDep,
+    current_principal: CurrentPrincipalDep,
     todo_filter: Annotated[FilterTodo, Query()],
 ):
-    query = select(Todo).where(Todo.user_id == current_user.id)
+    version = await session.scalar(todo_list_version(current_principal.id))
+    etag = make_etag(current_principal.id, version or 0, request.url.query)
+    if not_modified := conditional_response(request, response, etag):
+        return not_modified
+
+    # Plain rows rather than ORM instances: no identity map, no per-object
+    # state, and they serialize without another validation pass.
+    query = select(*TODO_PUBLIC_COLUMNS).where(
+        Todo.user_id == current_principal.id, Todo.deleted_at.is_(None)
+    )
 
     if todo_filter.title:
         query = query.filter(Todo.title.contains(todo_filter.title))
@@ -60,29 +142,367 @@ async def get_all_todos(
             Todo.description.contains(todo_filter.description)
         )
     if todo_filter.state:
-        query = query.filter(Todo.state.contains(todo_filter.state))
+        # Equality, not LIKE, so ix_todos_user_id_state_id can serve it
+        query = query.filter(Todo.state.in_(todo_filter.state))
+    if todo_filter.search:
+        query = query.filter(todo_search_filter(todo_filter.search)).order_by(
+            todo_search_rank(todo_filter.search).desc()
+        )
+
+    todos = await session.execute(
+        paginate(
+            query,
+            Todo.id,
+            limit=todo_filter.limit,
+            offset=todo_filter.offset,
+            cursor=todo_filter.cursor,
+        )
+    )
+    todos = todos.all()
+
+    return fast_json(
+        {
+            "todos": [todo._asdict() for todo in todos],
+            "next_cursor": (
+                None
+                if todo_filter.search
+                else next_cursor(todos, todo_filter.limit)
+            ),
+        },
+        todo_list_rows,
+        response,
+    )
+
+
+@router.get("/changes", response_model=TodoChanges)
+async def get_todo_changes(
+    response: Response,
+    session: ReadSessionDep,
+    current_principal: CurrentPrincipalDep,
+    changes_filter: Annotated[FilterChanges, Query()],
+):
+    """
+    Todos created, updated or deleted after `since`, oldest change first.
+    Deleted todos come back as tombstones. Changes show up once every
+    transaction that started writing before them is over, so a slow
+    write delays the ones after it, by at most
+    DB_WRITE_TRANSACTION_TIMEOUT, instead of being skipped.
+    """
+    query = (
+        select(*TODO_PUBLIC_COLUMNS, Todo.deleted_at, Todo.change_id)
+        .where(
+            Todo.user_id == current_principal.id,
+            Todo.change_id < change_horizon(),
+        )
+        .order_by(Todo.change_id, Todo.id)
+        .limit(changes_filter.limit + 1)
+    )
+    if changes_filter.since:
+        query = query.where(
+            tuple_(Todo.change_id, Todo.id)
+            > tuple_(*decode_change_cursor(changes_filter.since))
+        )
+
+    todos = await session.execute(query)
+    todos = todos.all()
+    page = todos[: changes_filter.limit]
+
+    upserts, tombstones = [], []
+    for row in page:
+        todo = row._asdict()
+        deleted_at = todo.pop("deleted_at")
+        del todo["change_id"]
+        if deleted_at is None:
+            upserts.append(todo)
+        else:
+            tombstones.append({"id": todo["id"], "deleted_at": deleted_at})
+
+    return fast_json(
+        {
+            "upserts": upserts,
+            "tombstones": tombstones,
+            "next_cursor": (
+                encode_change_cursor(page[-1].change_id, page[-1].id)
+                if page
+                else changes_filter.since
+            ),
+            "has_more": len(todos) > changes_filter.limit,
+        },
+        todo_changes_rows,
+        response,
+    )
+
+
+@router.get("/stats", response_model=TodoStats)
+async def get_todo_stats(
+    session: ReadSessionDep, current_principal: CurrentPrincipalDep
+):
+    """
+    How many of the caller's todos are in each state, read from the
+    counters kept by every write instead of counting the todos.
+    """
+    stored = await session.execute(todo_counts_query(current_principal.id))
+    counts = dict.fromkeys(TodoState, 0)
+    counts.update(stored.tuples().all())
+
+    return {"counts": counts, "total": sum(counts.values())}
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_all_todos(
+    session: ReadSessionDep,
+    current_principal: CurrentPrincipalDep,
+    export_format: Annotated[
+        Literal["ndjson", "csv"], Query(alias="format")
+    ] = "ndjson",
+):
+    return StreamingResponse(
+        export_todos(session, current_principal.id, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="todos.{export_format}"'
+            )
+        },
+    )
+
+
+@router.post("/import", response_model=TodoImportSummary)
+async def import_all_todos(
+    request: Request,
+    current_user: CurrentUserDep,
+    session: WriteSessionDep,
+    feed: ChangeFeedDep,
+    import_format: Annotated[
+        Literal["ndjson", "csv"], Query(alias="format")
+    ] = "ndjson",
+):
+    """
+    Create todos from an NDJSON or CSV (with a header row) request body,
+    read as it arrives. Valid rows are imported even when others fail;
+    failures are reported by their position among the data rows.
+    """
+    return await import_todos(
+        session,
+        current_user.id,
+        feed,
+        request.stream(),
+        import_format,
+        batch_size=settings.IMPORT_BATCH_SIZE,
+        reset_rows=settings.IMPORT_RESET_ROWS,
+        max_errors=settings.IMPORT_MAX_ERRORS,
+        max_record_chars=settings.IMPORT_MAX_RECORD_CHARS,
+    )
+
+
+@router.get("/events", response_class=StreamingResponse)
+async def stream_todo_events(
+    current_principal: CurrentPrincipalDep,
+    feed: ChangeFeedDep,
+    last_event_id: Annotated[int | None, Header()] = None,
+):
+    """
+    Server-sent events for the caller's todos: `created`, `updated` and
+    `deleted`, plus `reset` when missed events can't be replayed and the
+    list has to be fetched again.
+    """
+    return StreamingResponse(
+        feed.stream(
+            current_principal.id,
+            last_event_id,
+            settings.CHANGE_FEED_HEARTBEAT_SECONDS,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _check_bulk_size(count: int):
+    if count > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.BULK_MAX_ITEMS} items per request.",
+        )
+
+
+@router.post("/bulk", response_model=TodoBulkList)
+async def create_todos_bulk(
+    bulk: TodoBulkCreate,
+    current_user: CurrentUserDep,
+    session: WriteSessionDep,
+    feed: ChangeFeedDep,
+):
+    _check_bulk_size(len(bulk.todos))
 
     todos = await session.scalars(
-        query.limit(todo_filter.limit).offset(todo_filter.offset)
+        insert(Todo).returning(Todo),
+        [
+            {**todo.model_dump(), "user_id": current_user.id}
+            for todo in bulk.todos
+        ],
+    )
+    todos = sorted(todos, key=lambda todo: todo.id)
+    await adjust_todo_counts(
+        session,
+        current_user.id,
+        state_deltas(added=[todo.state for todo in todos]),
+    )
+
+    await session.commit()
+    await feed.publish(
+        current_user.id, [todo_change("created", todo) for todo in todos]
+    )
+
+    return {"todos": todos, "errors": []}
+
+
+@router.patch("/bulk", response_model=TodoBulkList)
+async def update_todos_bulk(
+    bulk: TodoBulkUpdate,
+    current_principal: CurrentPrincipalDep,
+    session: WriteSessionDep,
+    feed: ChangeFeedDep,
+):
+    _check_bulk_size(len(bulk.todos))
+
+    # Locked until commit, so the states counted out below are the ones
+    # replaced, and rows deleted meanwhile are left out. In id order, so
+    # two overlapping bulk updates can't deadlock.
+    owned = await session.execute(
+        select(Todo.id, Todo.state)
+        .where(
+            Todo.user_id == current_principal.id,
+            Todo.id.in_({item.id for item in bulk.todos}),
+            Todo.deleted_at.is_(None),
+        )
+        .order_by(Todo.id)
+        .with_for_update()
+    )
+    owned_states = dict(owned.tuples().all())
+
+    errors = [
+        BulkItemError(index=index, id=item.id, detail="Task not found.")
+        for index, item in enumerate(bulk.todos)
+        if item.id not in owned_states
+    ]
+    changes = [
+        item.model_dump(exclude_unset=True)
+        for item in bulk.todos
+        if item.id in owned_states and item.model_fields_set - {"id"}
+    ]
+
+    # ORM bulk UPDATE by primary key, sent as executemany
+    if changes:
+        await session.execute(update(Todo), changes)
+
+    todos = await session.scalars(
+        select(Todo)
+        .where(Todo.id.in_(owned_states))
+        .order_by(Todo.id)
+        .execution_options(populate_existing=True)
+    )
+    todos = todos.all()
+    await adjust_todo_counts(
+        session,
+        current_principal.id,
+        state_deltas(
+            added=[todo.state for todo in todos],
+            removed=owned_states.values(),
+        ),
     )
 
-    return {"todos": todos.all()}
+    await session.commit()
+    changed_ids = {change["id"] for change in changes}
+    await feed.publish(
+        current_principal.id,
+        [
+            todo_change("updated", todo)
+            for todo in todos
+            if todo.id in changed_ids
+        ],
+    )
+
+    return {"todos": todos, "errors": errors}
+
+
+def _soft_delete():
+    """
+    Mark todos deleted, returning their ids and states. change_id moves
+    too, so the tombstone shows up in the change log.
+    """
+    return (
+        update(Todo)
+        .values(deleted_at=func.now())
+        .returning(Todo.id, Todo.state)
+        .execution_options(synchronize_session=False)
+    )
+
+
+@router.delete("/bulk", response_model=TodoBulkDeleted)
+async def delete_todos_bulk(
+    bulk: TodoBulkDelete,
+    current_principal: CurrentPrincipalDep,
+    session: WriteSessionDep,
+    feed: ChangeFeedDep,
+):
+    _check_bulk_size(len(bulk.ids))
+
+    deleted = await session.execute(
+        _soft_delete().where(
+            Todo.user_id == current_principal.id,
+            Todo.id.in_(bulk.ids),
+            Todo.deleted_at.is_(None),
+        )
+    )
+    deleted = deleted.all()
+    deleted_ids = {todo.id for todo in deleted}
+    await adjust_todo_counts(
+        session,
+        current_principal.id,
+        state_deltas(removed=[todo.state for todo in deleted]),
+    )
+
+    await session.commit()
+    await feed.publish(
+        current_principal.id,
+        [todo_deleted(todo_id) for todo_id in sorted(deleted_ids)],
+    )
+
+    return {
+        "deleted": sorted(deleted_ids),
+        "errors": [
+            BulkItemError(index=index, id=todo_id, detail="Task not found.")
+            for index, todo_id in enumerate(bulk.ids)
+            if todo_id not in deleted_ids
+        ],
+    }
 
 
 @router.delete("/{todo_id}", response_model=Message)
 async def delete_todo(
-    todo_id: int, session: SessionDep, current_user: CurrentUserDep
+    todo_id: int,
+    session: WriteSessionDep,
+    current_principal: CurrentPrincipalDep,
+    feed: ChangeFeedDep,
 ):
-    todo_db = await session.scalar(
-        select(Todo).where(Todo.id == todo_id, Todo.user_id == current_user.id)
+    deleted = await session.execute(
+        _soft_delete().where(
+            Todo.id == todo_id,
+            Todo.user_id == current_principal.id,
+            Todo.deleted_at.is_(None),
+        )
     )
+    deleted = deleted.first()
 
-    if not todo_db:
+    if deleted is None:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail="Task not found."
         )
-    await session.delete(todo_db)
+    await adjust_todo_counts(
+        session, current_principal.id, state_deltas(removed=[deleted.state])
+    )
     await session.commit()
+    await feed.publish(current_principal.id, [todo_deleted(todo_id)])
 
     return {"message": "Task has been deleted successfully."}
 
@@ -90,12 +510,22 @@ async def delete_todo(
 @router.patch("/{todo_id}", response_model=TodoPublic)
 async def update_todo(
     todo_id: int,
-    session: SessionDep,
-    current_user: CurrentUserDep,
+    session: WriteSessionDep,
+    current_principal: CurrentPrincipalDep,
     todo: TodoUpdate,
+    feed: ChangeFeedDep,
 ):
+    # Locked, and reloaded if already in the session, so previous_state
+    # is the state this update replaces
     db_todo = await session.scalar(
-        select(Todo).where(Todo.user_id == current_user.id, Todo.id == todo_id)
+        select(Todo)
+        .where(
+            Todo.user_id == current_principal.id,
+            Todo.id == todo_id,
+            Todo.deleted_at.is_(None),
+        )
+        .with_for_update()
+        .execution_options(populate_existing=True)
     )
 
     if not db_todo:
@@ -103,11 +533,17 @@ async def update_todo(
             status_code=HTTPStatus.NOT_FOUND, detail="Task not found."
         )
 
+    previous_state = db_todo.state
     for key, value in todo.model_dump(exclude_unset=True).items():
         setattr(db_todo, key, value)
 
     session.add(db_todo)
+    await adjust_todo_counts(
+        session,
+        current_principal.id,
+        state_deltas(added=[db_todo.state], removed=[previous_state]),
+    )
     await session.commit()
-    await session.refresh(db_todo)
+    await feed.publish(current_principal.id, [todo_change("updated", db_todo)])
 
     return db_todo
@@ -1,13 +1,29 @@
 from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import func, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio.session import AsyncSession
 
+from src.todo_list.cache import PrincipalCache, get_principal_cache
 from src.todo_list.database import get_session
+from src.todo_list.etags import conditional_response, make_etag
 from src.todo_list.models import User
+from src.todo_list.pagination import next_cursor, paginate
+from src.todo_list.replicas import (
+    ReplicaRouterDep,
+    get_read_session,
+    get_user_read_session,
+    get_write_session,
+)
+from src.todo_list.responses import (
+    USER_PUBLIC_COLUMNS,
+    fast_json,
+    user_list_rows,
+    user_row,
+)
+from src.todo_list.revocation import TokenDenylist, get_token_denylist
 from src.todo_list.schemas import (
     FilterPage,
     Message,
@@ -16,21 +32,31 @@ from src.todo_list.schemas import (
     UserSchema,
 )
 from src.todo_list.security import (
+    Principal,
+    get_current_principal,
     get_current_user,
-    get_password_hash,
+    get_password_hash_async,
 )
 
 router = APIRouter(tags=["users"], prefix="/users")
 
 SessionDep = Annotated[AsyncSession, Depends(get_session)]
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_session)]
+UserReadSessionDep = Annotated[AsyncSession, Depends(get_user_read_session)]
+WriteSessionDep = Annotated[AsyncSession, Depends(get_write_session)]
 CurrentUserDep = Annotated[User, Depends(get_current_user)]
+CurrentPrincipalDep = Annotated[Principal, Depends(get_current_principal)]
+PrincipalCacheDep = Annotated[PrincipalCache, Depends(get_principal_cache)]
+TokenDenylistDep = Annotated[TokenDenylist, Depends(get_token_denylist)]
 
 
 @router.post("/", status_code=HTTPStatus.CREATED, response_model=UserPublic)
-async def create_user(user: UserSchema, session: SessionDep):
+async def create_user(
+    user: UserSchema, session: SessionDep, replicas: ReplicaRouterDep
+):
 
     db_user = await session.scalar(
-        select(User).where(User.email == user.email)
+        select(User).where(User.email == user.email, User.deleted_at.is_(None))
     )
 
     if db_user:
@@ -41,31 +67,60 @@ async def create_user(user: UserSchema, session: SessionDep):
     db_user = User(
         name=user.name,
         email=user.email,
-        password=get_password_hash(user.password),
+        password=await get_password_hash_async(user.password),
     )
 
     session.add(db_user)
     await session.commit()
-    await session.refresh(db_user)
+    # So GET /users/{id} right after signup doesn't hit a lagging replica
+    replicas.record_write(db_user.id)
 
     return db_user
 
 
 @router.get("/", status_code=HTTPStatus.OK, response_model=UserList)
 async def get_all_users(
-    session: SessionDep,
-    current_user: CurrentUserDep,
+    response: Response,
+    session: ReadSessionDep,
+    current_principal: CurrentPrincipalDep,
     filter_users: Annotated[FilterPage, Query()],
 ):
-    users = await session.scalars(
-        select(User).limit(filter_users.limit).offset(filter_users.offset)
+    # Only what UserPublic needs: no password hash, no ORM instances
+    users = await session.execute(
+        paginate(
+            select(*USER_PUBLIC_COLUMNS).where(User.deleted_at.is_(None)),
+            User.id,
+            limit=filter_users.limit,
+            offset=filter_users.offset,
+            cursor=filter_users.cursor,
+        )
+    )
+    users = users.all()
+
+    return fast_json(
+        {
+            "users": [user._asdict() for user in users],
+            "next_cursor": next_cursor(users, filter_users.limit),
+        },
+        user_list_rows,
+        response,
     )
-    return {"users": users}
 
 
 @router.get("/{user_id}", status_code=HTTPStatus.OK, response_model=UserPublic)
-async def get_user(user_id: int, session: SessionDep):
-    user_db = await session.scalar(select(User).where(User.id == user_id))
+async def get_user(
+    user_id: int,
+    request: Request,
+    response: Response,
+    session: UserReadSessionDep,
+):
+    user_db = (
+        await session.execute(
+            select(*USER_PUBLIC_COLUMNS, User.updated_at).where(
+                User.id == user_id, User.deleted_at.is_(None)
+            )
+        )
+    ).first()
 
     if not user_db:
         raise HTTPException(
@@ -73,49 +128,79 @@ async def get_user(user_id: int, session: SessionDep):
             detail="User not found.",
         )
 
-    return user_db
+    # The row is loaded anyway; hashing what is served keeps the ETag exact
+    # even where updated_at only has second resolution.
+    etag = make_etag(
+        user_db.id, user_db.name, user_db.email, user_db.updated_at
+    )
+    if not_modified := conditional_response(request, response, etag):
+        return not_modified
+
+    return fast_json(
+        {"id": user_db.id, "name": user_db.name, "email": user_db.email},
+        user_row,
+        response,
+    )
 
 
 @router.put("/{user_id}", status_code=HTTPStatus.OK, response_model=UserPublic)
-async def update_user(
+async def update_user(  # noqa: PLR0913, PLR0917
     user_id: int,
     user: UserSchema,
-    session: SessionDep,
+    session: WriteSessionDep,
     current_user: CurrentUserDep,
+    cache: PrincipalCacheDep,
+    denylist: TokenDenylistDep,
 ):
     if current_user.id != user_id:
         raise HTTPException(
             status_code=HTTPStatus.FORBIDDEN, detail="Not enough permissions."
         )
 
+    subject_email = current_user.email
+    hashed_password = await get_password_hash_async(user.password)
+
     try:
         current_user.email = user.email
         current_user.name = user.name
-        current_user.password = get_password_hash(user.password)
+        current_user.password = hashed_password
 
         session.add(current_user)
         await session.commit()
-        await session.refresh(current_user)
-
-        return current_user
     except IntegrityError:
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT,
             detail="Already exists a user with this email.",
         )
 
+    await cache.delete(subject_email)
+    denylist.revoke(current_user.id)
+
+    return current_user
+
 
 @router.delete("/{user_id}", status_code=HTTPStatus.OK, response_model=Message)
 async def delete_user(
     user_id: int,
-    session: SessionDep,
+    session: WriteSessionDep,
     current_user: CurrentUserDep,
+    cache: PrincipalCacheDep,
+    denylist: TokenDenylistDep,
 ):
     if current_user.id != user_id:
         raise HTTPException(
             status_code=HTTPStatus.FORBIDDEN, detail="Not enough permissions."
         )
 
-    await session.delete(current_user)
+    # Only marked here: purge.py removes the user and its todos in the
+    # background.
+    await session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(deleted_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
     await session.commit()
+    await cache.delete(current_user.email)
+    denylist.revoke(current_user.id)
     return {"message": "User deleted."}
@@ -1,7 +1,15 @@
 from datetime import datetime
 
-from pydantic import BaseModel, ConfigDict, EmailStr, Field
-
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    EmailStr,
+    Field,
+    field_validator,
+    model_validator,
+)
+
+from src.todo_list.pagination import decode_change_cursor, decode_cursor
 from todo_list.models import TodoState
 
 
@@ -24,6 +32,7 @@ class UserPublic(BaseModel):
 
 class UserList(BaseModel):
     users: list[UserPublic]
+    next_cursor: str | None = None
 
 
 class Token(BaseModel):
@@ -34,12 +43,53 @@ class Token(BaseModel):
 class FilterPage(BaseModel):
     offset: int = Field(ge=0, default=0)
     limit: int = Field(ge=0, default=10)
+    cursor: str | None = Field(
+        default=None,
+        description="`next_cursor` of the previous page. Overrides offset.",
+    )
+
+    @field_validator("cursor")
+    @classmethod
+    def cursor_must_be_valid(cls, cursor: str | None) -> str | None:
+        if cursor is not None:
+            decode_cursor(cursor)
+        return cursor
 
 
 class FilterTodo(FilterPage):
     title: str | None = Field(default=None, min_length=3, max_length=20)
     description: str | None = None
-    state: TodoState | None = None
+    state: list[TodoState] | None = Field(
+        default=None,
+        description="Repeat to match any of several states.",
+    )
+    search: str | None = Field(
+        default=None,
+        min_length=3,
+        max_length=100,
+        description="Match title or description, most relevant first.",
+    )
+
+    @model_validator(mode="after")
+    def search_is_offset_paginated(self):
+        if self.search and self.cursor:
+            raise ValueError("Search results are paginated with offset.")
+        return self
+
+
+class FilterChanges(BaseModel):
+    since: str | None = Field(
+        default=None,
+        description="`next_cursor` of the previous sync; omit to start over.",
+    )
+    limit: int = Field(ge=1, le=1_000, default=100)
+
+    @field_validator("since")
+    @classmethod
+    def since_must_be_valid(cls, since: str | None) -> str | None:
+        if since is not None:
+            decode_change_cursor(since)
+        return since
 
 
 class TodoSchema(BaseModel):
@@ -56,9 +106,67 @@ class TodoPublic(TodoSchema):
 
 class TodoList(BaseModel):
     todos: list[TodoPublic]
+    next_cursor: str | None = None
 
 
 class TodoUpdate(BaseModel):
     title: str | None = None
     description: str | None = None
     state: TodoState | None = None
+
+
+class TodoTombstone(BaseModel):
+    id: int
+    deleted_at: datetime
+
+
+class TodoChanges(BaseModel):
+    upserts: list[TodoPublic]
+    tombstones: list[TodoTombstone]
+    next_cursor: str | None = Field(
+        description="Pass as `since` on the next sync."
+    )
+    has_more: bool
+
+
+class TodoBulkCreate(BaseModel):
+    todos: list[TodoSchema] = Field(min_length=1)
+
+
+class TodoBulkUpdateItem(TodoUpdate):
+    id: int
+
+
+class TodoBulkUpdate(BaseModel):
+    todos: list[TodoBulkUpdateItem] = Field(min_length=1)
+
+
+class TodoBulkDelete(BaseModel):
+    ids: list[int] = Field(min_length=1)
+
+
+class BulkItemError(BaseModel):
+    index: int
+    id: int | None = None
+    detail: str
+
+
+class TodoBulkList(BaseModel):
+    todos: list[TodoPublic]
+    errors: list[BulkItemError]
+
+
+class TodoBulkDeleted(BaseModel):
+    deleted: list[int]
+    errors: list[BulkItemError]
+
+
+class TodoStats(BaseModel):
+    counts: dict[TodoState, int]
+    total: int
+
+
+class TodoImportSummary(BaseModel):
+    imported: int
+    failed: int
+    errors: list[BulkItemError]
@@ -0,0 +1,59 @@
+from sqlalchemy import ColumnElement, Float, case, func, or_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+from src.todo_list.models import Todo
+
+
+class search_rank(FunctionElement):  # noqa: N801
+    """
+    Relevance of a search term for a (title, description) pair, higher is
+    better. Postgres ranks with pg_trgm, other databases fall back to
+    "title matches before description matches".
+    """
+
+    type = Float()
+    name = "search_rank"
+    inherit_cache = True
+
+
+@compiles(search_rank)
+def _search_rank_fallback(element, compiler, **kw):
+    title, description, term = list(element.clauses)
+
+    return compiler.process(
+        case(
+            (func.instr(func.lower(title), func.lower(term)) > 0, 1.0),
+            (func.instr(func.lower(description), func.lower(term)) > 0, 0.5),
+            else_=0.0,
+        ),
+        **kw,
+    )
+
+
+@compiles(search_rank, "postgresql")
+def _search_rank_postgresql(element, compiler, **kw):
+    title, description, term = list(element.clauses)
+
+    return compiler.process(
+        func.greatest(
+            func.word_similarity(term, title),
+            func.word_similarity(term, description),
+        ),
+        **kw,
+    )
+
+
+def todo_search_filter(term: str) -> ColumnElement[bool]:
+    """
+    Case-insensitive substring match on title or description. On Postgres
+    both ILIKEs are served by the gin_trgm_ops indexes on `todos`.
+    """
+    return or_(
+        Todo.title.icontains(term, autoescape=True),
+        Todo.description.icontains(term, autoescape=True),
+    )
+
+
+def todo_search_rank(term: str) -> search_rank:
+    return search_rank(Todo.title, Todo.description, term)
@@ -1,16 +1,24 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from http import HTTPStatus
+from time import time
 from zoneinfo import ZoneInfo
 
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from jwt import DecodeError, ExpiredSignatureError, decode, encode
+from jwt import InvalidTokenError, decode, encode
 from pwdlib import PasswordHash
-from sqlalchemy import select
+from sqlalchemy import inspect, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
+from src.todo_list.cache import PrincipalCache, get_principal_cache
 from src.todo_list.database import get_session
+from src.todo_list.instrumentation import timed
 from src.todo_list.models import User
+from src.todo_list.revocation import TokenDenylist, get_token_denylist
 from src.todo_list.settings import Settings
 
 pwd_context = PasswordHash.recommended()
@@ -18,6 +26,56 @@ settings = Settings()  # pyright: ignore[reportCallIssue]
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
+@dataclass(frozen=True)
+class Principal:
+    """
+    Caller identity taken from the token alone, without a database row.
+    """
+
+    id: int
+    email: str
+
+
+class HashingPool:
+    """
+    Runs Argon2 work on a dedicated thread pool so it never blocks the
+    event loop. Once `max_pending` jobs are queued or running, new ones are
+    rejected with 503 instead of piling up behind the workers.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hash"
+        )
+
+    async def run(self, func, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                detail="Server is busy, try again later.",
+                headers={"Retry-After": "1"},
+            )
+
+        self.pending += 1
+        try:
+            with timed("hash_seconds"):
+                return await asyncio.get_running_loop().run_in_executor(
+                    self._executor, func, *args
+                )
+        finally:
+            self.pending -= 1
+
+
+hashing_pool = HashingPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
@@ -26,9 +84,21 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def get_password_hash_async(password: str) -> str:
+    return await hashing_pool.run(get_password_hash, password)
+
+
+async def verify_password_async(
+    plain_password: str, hashed_password: str
+) -> bool:
+    return await hashing_pool.run(
+        verify_password, plain_password, hashed_password
+    )
+
+
 def create_access_token(data: dict) -> str:
     """
-    data = {'sub': email, ...}
+    data = {'sub': email, 'uid': user id, ...}
     """
     to_encode = data.copy()
 
@@ -36,42 +106,111 @@ def create_access_token(data: dict) -> str:
         minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
     )
 
-    to_encode.update({"exp": expire})
+    # iat keeps sub-second precision so a revocation never catches a
+    # token issued right after it
+    to_encode.update({"exp": expire, "iat": time()})
 
-    encode_jwt = encode(
-        to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
-    )
+    with timed("jwt_seconds"):
+        encode_jwt = encode(
+            to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
+        )
 
     return encode_jwt
 
 
-async def get_current_user(
-    session: AsyncSession = Depends(get_session),
-    token: str = Depends(oauth2_scheme),
-):
-    credentials_exception = HTTPException(
+def _user_snapshot(user: User) -> dict:
+    return {
+        attr.key: getattr(user, attr.key)
+        for attr in inspect(User).column_attrs
+    }
+
+
+async def _user_from_snapshot(session: AsyncSession, snapshot: dict) -> User:
+    """
+    Rebuild a persistent User from a cached snapshot without touching the
+    database, so handlers can still update or delete it.
+    """
+    user = User(
+        name=snapshot["name"],
+        email=snapshot["email"],
+        password=snapshot["password"],
+    )
+    user.id = snapshot["id"]
+    user.created_at = snapshot["created_at"]
+    user.updated_at = snapshot["updated_at"]
+
+    make_transient_to_detached(user)
+
+    return await session.merge(user, load=False)
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=HTTPStatus.UNAUTHORIZED,
         detail="Could not validate credentials.",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def _decode_token(token: str, denylist: TokenDenylist) -> dict:
     try:
-        payload = decode(
-            token, settings.SECRET_KEY, algorithms=settings.ALGORITHM
-        )
-        subject_email = payload["sub"]
-        if not subject_email:
-            raise credentials_exception
-    except DecodeError:
-        raise credentials_exception
-    except ExpiredSignatureError:
-        raise credentials_exception
+        with timed("jwt_seconds"):
+            payload = decode(
+                token, settings.SECRET_KEY, algorithms=settings.ALGORITHM
+            )
+    except InvalidTokenError:
+        raise _credentials_exception()
+
+    if not payload.get("sub"):
+        raise _credentials_exception()
+
+    if "uid" in payload and denylist.is_revoked(
+        payload["uid"], payload.get("iat", 0)
+    ):
+        raise _credentials_exception()
+
+    return payload
+
+
+async def get_current_user(
+    session: AsyncSession = Depends(get_session),
+    token: str = Depends(oauth2_scheme),
+    cache: PrincipalCache = Depends(get_principal_cache),
+    denylist: TokenDenylist = Depends(get_token_denylist),
+):
+    payload = _decode_token(token, denylist)
+    subject_email = payload["sub"]
+
+    snapshot = await cache.get(subject_email)
+    if snapshot:
+        return await _user_from_snapshot(session, snapshot)
 
     user = await session.scalar(
-        select(User).where(User.email == subject_email)
+        select(User).where(
+            User.email == subject_email, User.deleted_at.is_(None)
+        )
     )
 
     if not user:
-        raise credentials_exception
+        raise _credentials_exception()
+
+    await cache.set(subject_email, _user_snapshot(user), payload["exp"])
 
     return user
+
+
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    denylist: TokenDenylist = Depends(get_token_denylist),
+) -> Principal:
+    """
+    Stateless alternative to `get_current_user` for handlers that only
+    need the caller's id: no database access, revocation is checked
+    against the in-memory denylist.
+    """
+    payload = _decode_token(token, denylist)
+
+    if not isinstance(payload.get("uid"), int):
+        raise _credentials_exception()
+
+    return Principal(id=payload["uid"], email=payload["sub"])
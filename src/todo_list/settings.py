@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -7,6 +9,116 @@ class Settings(BaseSettings):
     )
 
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 200
+    DB_POOL_PRE_PING: bool = False
+    # Server-side prepared statements psycopg keeps per connection (its
+    # prepared_max); unused in PgBouncer mode, which prepares nothing
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # psycopg prepares a query server-side after this many executions
+    DB_PREPARE_THRESHOLD: int = 5
+    # PgBouncer in transaction mode can't keep server-side prepared
+    # statements, so this turns them off whatever DB_PREPARE_THRESHOLD says
+    DB_PGBOUNCER_MODE: bool = False
+    # Postgres (17+) ends a request's write transaction after this long.
+    # GET /todos/changes holds changes back until every transaction that
+    # started writing before them is over, so this bounds how far it lags.
+    DB_WRITE_TRANSACTION_TIMEOUT: float = 30
+
+    # JSON list, e.g. '["postgresql+psycopg://...", ...]'
+    DATABASE_REPLICA_URLS: list[str] = []
+    REPLICA_BALANCING: Literal["round_robin", "least_connections"] = (
+        "round_robin"
+    )
+    # Reads of data its owner wrote within this window go to the primary
+    REPLICA_READ_YOUR_WRITES_SECONDS: float = 5
+    # How long a replica that failed to connect is skipped
+    REPLICA_RETRY_SECONDS: float = 30
+
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10_000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    # Token bucket per caller (user id, or IP without a valid token):
+    # RATE_LIMIT_PER_SECOND sustained, bursts of up to RATE_LIMIT_BURST
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_PER_SECOND: float = 20
+    RATE_LIMIT_BURST: int = 40
+    # Login attempts per IP, on top of the above
+    LOGIN_RATE_LIMIT_PER_MINUTE: float = 10
+    LOGIN_RATE_LIMIT_BURST: int = 5
+    # Buckets kept in memory; the least recently used are dropped first
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    # Header carrying the client address when a proxy that overwrites it
+    # sits in front (e.g. "Fly-Client-IP"); the peer address otherwise
+    RATE_LIMIT_CLIENT_IP_HEADER: str | None = None
+    # Requests one route handles at once per process before answering 503,
+    # so a single hot route can't take the whole pool. Overrides are by
+    # route (endpoint) name, 0 meaning no cap.
+    ROUTE_MAX_CONCURRENCY: int = 10
+    ROUTE_CONCURRENCY_LIMITS: dict[str, int] = {"stream_todo_events": 0}
+
+    BULK_MAX_ITEMS: int = 1_000
+
+    # Rows per INSERT (COPY on psycopg) and per transaction for imports,
+    # and how often an import tells change feed subscribers to refetch
+    IMPORT_BATCH_SIZE: int = 5_000
+    IMPORT_RESET_ROWS: int = 50_000
+    # Row errors reported in an import summary; the rest are only counted
+    IMPORT_MAX_ERRORS: int = 100
+    # Longest CSV record; quoted fields may span lines, and a quote that is
+    # never closed would otherwise swallow the rest of the upload
+    IMPORT_MAX_RECORD_CHARS: int = 65_536
+
+    # Background removal of deleted users and todos (purge.py). Off unless
+    # the deploy config turns it on, so a test or local run never purges
+    # whatever database DATABASE_URL points at.
+    PURGE_ENABLED: bool = False
+    PURGE_INTERVAL_SECONDS: float = 300
+    # Rows per purge transaction, and the pause between two of them
+    PURGE_BATCH_SIZE: int = 1_000
+    PURGE_PAUSE_SECONDS: float = 0.1
+    # Todos left in the trash this long are deleted
+    PURGE_TRASH_AFTER_DAYS: float = 30
+    # Tombstones serve GET /todos/changes; clients that sync less often
+    # than this miss deletions and should start over
+    PURGE_TOMBSTONE_DAYS: float = 30
+
+    # Deferred work from the task_queue table (tasks.py); off unless the
+    # deploy config turns it on, like PURGE_ENABLED
+    TASKS_ENABLED: bool = False
+    # Tasks run at once per process; each kind also has its own limit
+    TASK_WORKERS: int = 4
+    TASK_POLL_SECONDS: float = 1
+    # A claimed task is run again if its worker hasn't finished it by then
+    TASK_LEASE_SECONDS: float = 600
+    TASK_MAX_ATTEMPTS: int = 5
+    # Retries wait base * 2 ** (attempt - 1), capped at max
+    TASK_RETRY_BASE_SECONDS: float = 10
+    TASK_RETRY_MAX_SECONDS: float = 3_600
+    # How long shutdown waits for running tasks before requeueing them
+    TASK_SHUTDOWN_SECONDS: float = 20
+
+    # "postgres" fans changes out to every worker with LISTEN/NOTIFY
+    CHANGE_FEED_BACKEND: Literal["memory", "postgres"] = "memory"
+    # How long startup waits for the postgres feed's LISTEN connection
+    CHANGE_FEED_START_TIMEOUT_SECONDS: float = 10
+    # Recent events kept to resume streams from Last-Event-ID
+    CHANGE_FEED_BUFFER_SIZE: int = 10_000
+    # Events queued per connection before a slow client is disconnected
+    CHANGE_FEED_QUEUE_SIZE: int = 256
+    CHANGE_FEED_HEARTBEAT_SECONDS: float = 15
+
+    # List endpoints serialize rows straight to JSON, skipping response
+    # model validation
+    FAST_JSON_RESPONSES: bool = True
+
+    INSTRUMENTATION_ENABLED: bool = False
@@ -0,0 +1,175 @@
+"""
+Per-user todo counters (the todo_counts table).
+
+Write paths call `adjust_todo_counts` before committing, so counters and
+todos change together. `check_todo_counts` compares the counters with an
+actual count of the todos table and `rebuild_todo_counts` recomputes
+them; both are available from the command line:
+
+    python -m src.todo_list.stats [--user-id ID] [--rebuild]
+"""
+
+import argparse
+import asyncio
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from sqlalchemy import Select, delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.todo_list.database import engine
+from src.todo_list.models import Todo, TodoCount, TodoListVersion, TodoState
+
+
+def state_deltas(
+    added: Iterable[TodoState] = (), removed: Iterable[TodoState] = ()
+) -> Counter:
+    deltas = Counter(added)
+    deltas.subtract(removed)
+
+    return deltas
+
+
+async def adjust_todo_counts(
+    session: AsyncSession, user_id: int, deltas: Counter
+):
+    """
+    Add `deltas` ({state: change}, negative changes included) to the
+    user's counters, creating missing ones, and bump the user's todo list
+    version. Every write to todos calls it, with no deltas when no state
+    changed. Runs in the caller's transaction.
+    """
+    rows = [
+        {"user_id": user_id, "state": state, "count": delta}
+        # A fixed order, so concurrent writers lock the rows in the same
+        # order and can't deadlock each other.
+        for state, delta in sorted(deltas.items())
+        if delta
+    ]
+    dialect = session.get_bind().dialect.name
+    dialect_insert = (postgresql if dialect == "postgresql" else sqlite).insert
+
+    if rows:
+        upsert = dialect_insert(TodoCount)
+        await session.execute(
+            upsert.values(rows).on_conflict_do_update(
+                index_elements=[TodoCount.user_id, TodoCount.state],
+                set_={"count": TodoCount.count + upsert.excluded["count"]},
+            )
+        )
+
+    # Last, after the counters, so writers take row locks in one order
+    await session.execute(
+        dialect_insert(TodoListVersion)
+        .values(user_id=user_id, version=1)
+        .on_conflict_do_update(
+            index_elements=[TodoListVersion.user_id],
+            set_={"version": TodoListVersion.version + 1},
+        )
+    )
+
+
+def todo_counts_query(user_id: int) -> Select:
+    return select(TodoCount.state, TodoCount.count).where(
+        TodoCount.user_id == user_id
+    )
+
+
+def _counted(user_id: int | None) -> Select:
+    query = (
+        select(Todo.user_id, Todo.state, func.count())
+        .where(Todo.deleted_at.is_(None))
+        .group_by(Todo.user_id, Todo.state)
+    )
+    if user_id is not None:
+        query = query.where(Todo.user_id == user_id)
+
+    return query
+
+
+@dataclass(frozen=True)
+class CountMismatch:
+    user_id: int
+    state: TodoState
+    stored: int
+    counted: int
+
+
+async def check_todo_counts(
+    session: AsyncSession, user_id: int | None = None
+) -> list[CountMismatch]:
+    """
+    Counters that disagree with the todos table, for one user or all of
+    them. A missing counter row counts as zero.
+    """
+    counted = {
+        (row_user_id, state): count
+        for row_user_id, state, count in await session.execute(
+            _counted(user_id)
+        )
+    }
+
+    counters = select(TodoCount.user_id, TodoCount.state, TodoCount.count)
+    if user_id is not None:
+        counters = counters.where(TodoCount.user_id == user_id)
+    stored = {
+        (row_user_id, state): count
+        for row_user_id, state, count in await session.execute(counters)
+    }
+
+    return [
+        CountMismatch(*key, stored.get(key, 0), counted.get(key, 0))
+        for key in sorted(counted.keys() | stored.keys())
+        if counted.get(key, 0) != stored.get(key, 0)
+    ]
+
+
+async def rebuild_todo_counts(
+    session: AsyncSession, user_id: int | None = None
+):
+    """
+    Recompute counters from the todos table and commit. Todo writes
+    racing with the rebuild can leave it off by those writes, so check
+    again afterwards, or rebuild while writes are quiet.
+    """
+    counters = delete(TodoCount)
+    if user_id is not None:
+        counters = counters.where(TodoCount.user_id == user_id)
+
+    await session.execute(counters)
+    await session.execute(
+        insert(TodoCount).from_select(
+            ["user_id", "state", "count"], _counted(user_id)
+        )
+    )
+    await session.commit()
+
+
+async def main(user_id: int | None, rebuild: bool):
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        mismatches = await check_todo_counts(session, user_id)
+        for mismatch in mismatches:
+            print(
+                f"user {mismatch.user_id} {mismatch.state.value}: "
+                f"counter {mismatch.stored}, todos {mismatch.counted}"
+            )
+        print(f"{len(mismatches)} mismatched counters")
+
+        if rebuild and mismatches:
+            await rebuild_todo_counts(session, user_id)
+            print("Counters rebuilt")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--user-id", type=int)
+    parser.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.user_id, args.rebuild))
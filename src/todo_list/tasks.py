@@ -0,0 +1,333 @@
+"""
+Deferred work, run in-process by the app's workers.
+
+Tasks are rows of the task_queue table, added with `enqueue` in the
+caller's transaction, so they exist only if the work that asked for
+them was committed. Every process started with TASKS_ENABLED polls the
+table: a claim is one UPDATE over `SELECT ... FOR UPDATE SKIP LOCKED`,
+so workers never wait on each other or claim the same task. On SQLite,
+which has no row locks, that single statement is still atomic, so the
+same queue runs locally and in tests.
+
+Delivery is at least once: a task whose worker died, or whose outcome
+could not be recorded, is run again when its lease runs out. Handlers
+must be safe to repeat.
+"""
+
+import asyncio
+import logging
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from src.todo_list.database import engine
+from src.todo_list.models import QueuedTask
+from src.todo_list.purge import purger
+from src.todo_list.settings import Settings
+from src.todo_list.stats import rebuild_todo_counts
+
+settings = Settings()  # pyright: ignore[reportCallIssue]
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[dict], Awaitable[None]]
+
+
+def utcnow() -> datetime:
+    # Queue times are naive UTC from the workers' clocks
+    return datetime.now(tz=UTC).replace(tzinfo=None)
+
+
+def enqueue(
+    session: AsyncSession,
+    kind: str,
+    payload: dict | None = None,
+    *,
+    delay_seconds: float = 0,
+) -> QueuedTask:
+    """
+    Add a task to the session; it becomes due once the session commits
+    and `delay_seconds` have passed.
+    """
+    task = QueuedTask(
+        kind=kind,
+        payload=payload or {},
+        run_after=utcnow() + timedelta(seconds=delay_seconds),
+    )
+    session.add(task)
+
+    return task
+
+
+@dataclass(frozen=True)
+class TaskKind:
+    run: Handler
+    concurrency: int
+    max_attempts: int
+
+
+@dataclass(frozen=True)
+class ClaimedTask:
+    id: int
+    kind: str
+    payload: dict
+    attempts: int
+
+
+class TaskRunner:
+    """
+    Polls the queue between `start` and `stop` and runs due tasks, at
+    most `workers` at once and at most `concurrency` of each kind.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        engine: AsyncEngine,
+        *,
+        workers: int,
+        poll_seconds: float,
+        lease_seconds: float,
+        max_attempts: int,
+        retry_base_seconds: float,
+        retry_max_seconds: float,
+        shutdown_seconds: float,
+    ):
+        self.engine = engine
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.shutdown_seconds = shutdown_seconds
+        self.kinds: dict[str, TaskKind] = {}
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+        self._running: dict[int, asyncio.Task] = {}
+        self._running_kinds: Counter[str] = Counter()
+        self._poller: asyncio.Task | None = None
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+    def handler(
+        self,
+        kind: str,
+        *,
+        concurrency: int = 1,
+        max_attempts: int | None = None,
+    ) -> Callable[[Handler], Handler]:
+        """
+        Register the decorated coroutine to run tasks of `kind`; it gets
+        the task's payload.
+        """
+
+        def register(run: Handler) -> Handler:
+            self.kinds[kind] = TaskKind(
+                run, concurrency, max_attempts or self.max_attempts
+            )
+            return run
+
+        return register
+
+    def backoff_seconds(self, attempts: int) -> float:
+        return min(
+            self.retry_base_seconds * 2 ** (attempts - 1),
+            self.retry_max_seconds,
+        )
+
+    async def start(self):
+        self._poller = asyncio.create_task(self._poll_forever())
+
+    async def stop(self):
+        """
+        Stop claiming, give running tasks `shutdown_seconds` to finish,
+        then cancel and requeue the rest.
+        """
+        if self._poller:
+            self._poller.cancel()
+            await asyncio.gather(self._poller, return_exceptions=True)
+            self._poller = None
+
+        running = list(self._running.values())
+        if not running:
+            return
+
+        _, pending = await asyncio.wait(running, timeout=self.shutdown_seconds)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    async def run_due(self) -> int:
+        """
+        Claim what is due now and wait for it to finish; returns the
+        number of tasks run.
+        """
+        claimed = await self._claim()
+        await asyncio.gather(*(self._spawn(task) for task in claimed))
+
+        return len(claimed)
+
+    async def _poll_forever(self):
+        while True:
+            try:
+                claimed = await self._claim()
+            except Exception:
+                logger.exception("Could not claim tasks")
+                claimed = []
+
+            for task in claimed:
+                self._spawn(task)
+
+            if not claimed:
+                await asyncio.sleep(self.poll_seconds)
+
+    async def _claim(self) -> list[ClaimedTask]:
+        now = utcnow()
+        claimed = []
+
+        async with AsyncSession(self.engine) as session:
+            for kind, task_kind in self.kinds.items():
+                slots = min(
+                    task_kind.concurrency - self._running_kinds[kind],
+                    self.workers - len(self._running) - len(claimed),
+                )
+                if slots <= 0:
+                    continue
+
+                due = (
+                    select(QueuedTask.id)
+                    .where(
+                        QueuedTask.kind == kind,
+                        QueuedTask.failed_at.is_(None),
+                        QueuedTask.run_after <= now,
+                    )
+                    .order_by(QueuedTask.run_after)
+                    .limit(slots)
+                    .with_for_update(skip_locked=True)
+                )
+                # Pushing run_after a lease ahead is the claim: nobody
+                # else sees the task as due until then.
+                rows = await session.execute(
+                    update(QueuedTask)
+                    .where(QueuedTask.id.in_(due.scalar_subquery()))
+                    .values(
+                        run_after=now + timedelta(seconds=self.lease_seconds),
+                        attempts=QueuedTask.attempts + 1,
+                    )
+                    .returning(
+                        QueuedTask.id,
+                        QueuedTask.kind,
+                        QueuedTask.payload,
+                        QueuedTask.attempts,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                claimed += [ClaimedTask(*row) for row in rows]
+
+            await session.commit()
+
+        return claimed
+
+    def _spawn(self, task: ClaimedTask) -> asyncio.Task:
+        self._running_kinds[task.kind] += 1
+        self._running[task.id] = asyncio.create_task(self._run(task))
+
+        return self._running[task.id]
+
+    async def _run(self, task: ClaimedTask):
+        task_kind = self.kinds[task.kind]
+
+        try:
+            await task_kind.run(task.payload)
+        except asyncio.CancelledError:
+            # Shutting down: hand the task, and the attempt, back
+            await self._record(
+                task,
+                run_after=utcnow(),
+                attempts=QueuedTask.attempts - 1,
+            )
+            raise
+        except Exception as error:
+            logger.exception(
+                "Task %s %d failed (attempt %d)",
+                task.kind,
+                task.id,
+                task.attempts,
+            )
+            if task.attempts >= task_kind.max_attempts:
+                self.failed += 1
+                retry = {"failed_at": utcnow()}
+            else:
+                self.retried += 1
+                retry = {
+                    "run_after": utcnow()
+                    + timedelta(seconds=self.backoff_seconds(task.attempts))
+                }
+            await self._record(
+                task, last_error=f"{type(error).__name__}: {error}", **retry
+            )
+        else:
+            self.completed += 1
+            await self._record(task)
+        finally:
+            del self._running[task.id]
+            self._running_kinds[task.kind] -= 1
+
+    async def _record(self, task: ClaimedTask, **values):
+        """
+        Store the outcome of a run: the given column values, or deletion
+        without any.
+        """
+        statement = (
+            update(QueuedTask).values(**values)
+            if values
+            else delete(QueuedTask)
+        )
+
+        try:
+            async with AsyncSession(self.engine) as session:
+                await session.execute(
+                    statement.where(QueuedTask.id == task.id)
+                )
+                await session.commit()
+        except Exception:
+            logger.exception(
+                "Could not record the outcome of task %d; it runs again "
+                "once its lease is over",
+                task.id,
+            )
+
+
+task_runner = TaskRunner(
+    engine,
+    workers=settings.TASK_WORKERS,
+    poll_seconds=settings.TASK_POLL_SECONDS,
+    lease_seconds=settings.TASK_LEASE_SECONDS,
+    max_attempts=settings.TASK_MAX_ATTEMPTS,
+    retry_base_seconds=settings.TASK_RETRY_BASE_SECONDS,
+    retry_max_seconds=settings.TASK_RETRY_MAX_SECONDS,
+    shutdown_seconds=settings.TASK_SHUTDOWN_SECONDS,
+)
+
+
+@task_runner.handler("purge")
+async def run_purge(payload: dict):
+    """
+    A purge pass outside the purger's own schedule.
+    """
+    await purger.purge()
+
+
+@task_runner.handler("rebuild_todo_counts")
+async def run_rebuild_todo_counts(payload: dict):
+    """
+    payload: {"user_id": ID}, or {} for every user.
+    """
+    async with AsyncSession(engine) as session:
+        await rebuild_todo_counts(session, payload.get("user_id"))
@@ -1,5 +1,6 @@
 from contextlib import contextmanager
 from datetime import datetime
+from functools import partial
 
 import pytest
 import pytest_asyncio
@@ -13,24 +14,90 @@ from sqlalchemy.orm import Session
 from testcontainers.postgres import PostgresContainer
 
 from src.todo_list.app import app
+from src.todo_list.app import settings as app_settings
+from src.todo_list.cache import InMemoryPrincipalCache, get_principal_cache
 from src.todo_list.database import get_session
+from src.todo_list.events import InMemoryChangeFeed, get_change_feed
+from src.todo_list.limits import (
+    ConcurrencyLimiter,
+    InMemoryRateLimiter,
+    get_concurrency_limiter,
+    get_rate_limiter,
+)
 from src.todo_list.models import User, table_registry
+from src.todo_list.revocation import TokenDenylist, get_token_denylist
 from src.todo_list.security import get_password_hash
 from src.todo_list.settings import Settings
 
 
 @pytest.fixture
-def client(session: Session):
+def client(  # noqa: PLR0913, PLR0917
+    session: Session,
+    principal_cache: InMemoryPrincipalCache,
+    token_denylist: TokenDenylist,
+    change_feed: InMemoryChangeFeed,
+    rate_limiter: InMemoryRateLimiter,
+    concurrency_limiter: ConcurrencyLimiter,
+):
     def get_session_override():
         return session
 
+    def get_principal_cache_override():
+        return principal_cache
+
+    def get_token_denylist_override():
+        return token_denylist
+
     with TestClient(app) as client:
         app.dependency_overrides[get_session] = get_session_override
+        app.dependency_overrides[get_principal_cache] = (
+            get_principal_cache_override
+        )
+        app.dependency_overrides[get_token_denylist] = (
+            get_token_denylist_override
+        )
+        app.dependency_overrides[get_change_feed] = lambda: change_feed
+        app.dependency_overrides[get_rate_limiter] = lambda: rate_limiter
+        app.dependency_overrides[get_concurrency_limiter] = lambda: (
+            concurrency_limiter
+        )
         yield client
 
     app.dependency_overrides.clear()
 
 
+@pytest.fixture(autouse=True)
+def no_background_jobs(monkeypatch: pytest.MonkeyPatch):
+    # The lifespan would start them on DATABASE_URL, not the test database
+    monkeypatch.setattr(app_settings, "PURGE_ENABLED", False)
+    monkeypatch.setattr(app_settings, "TASKS_ENABLED", False)
+
+
+@pytest.fixture
+def principal_cache():
+    return InMemoryPrincipalCache(max_size=100, ttl=60)
+
+
+@pytest.fixture
+def token_denylist():
+    return TokenDenylist(token_lifetime=1800)
+
+
+@pytest.fixture
+def rate_limiter():
+    return InMemoryRateLimiter(max_keys=100)
+
+
+@pytest.fixture
+def concurrency_limiter():
+    return ConcurrencyLimiter(default_limit=10, limits={})
+
+
+@pytest.fixture
+def change_feed():
+    return InMemoryChangeFeed(buffer_size=100, queue_size=10)
+
+
 @pytest.fixture(scope="session")
 def engine():
     with PostgresContainer("postgres:17", driver="psycopg") as pg:
@@ -69,6 +136,52 @@ def mock_db_time():
     return _mock_db_time
 
 
+@contextmanager
+def _count_queries(*, engine):
+    statements = []
+
+    def before_cursor_execute_hook(conn, cursor, statement, parameters, *args):
+        statements.append((statement, parameters))
+
+    event.listen(
+        engine.sync_engine, "before_cursor_execute", before_cursor_execute_hook
+    )
+
+    yield statements
+
+    event.remove(
+        engine.sync_engine, "before_cursor_execute", before_cursor_execute_hook
+    )
+
+
+@pytest.fixture
+def count_queries(engine):
+    return partial(_count_queries, engine=engine)
+
+
+@pytest.fixture
+def explain(engine):
+    """
+    Return the query plan of a statement captured by `count_queries`.
+    On Postgres sequential scans are disabled for the transaction, so the
+    plan only falls back to one when no index can serve the query.
+    """
+
+    async def explain_statement(statement: str, parameters) -> str:
+        async with engine.connect() as conn:
+            if conn.dialect.name == "postgresql":
+                await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+                prefix = "EXPLAIN "
+            else:
+                prefix = "EXPLAIN QUERY PLAN "
+
+            result = await conn.exec_driver_sql(prefix + statement, parameters)
+
+            return "\n".join(str(row[-1]) for row in result)
+
+    return explain_statement
+
+
 @pytest_asyncio.fixture
 async def user(session: AsyncSession):
     password = "mockmock"
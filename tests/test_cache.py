@@ -0,0 +1,80 @@
+import pytest
+from freezegun import freeze_time
+
+from src.todo_list.cache import InMemoryPrincipalCache
+
+SNAPSHOT = {"id": 1, "email": "chris@example.com"}
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_and_miss_counters():
+    cache = InMemoryPrincipalCache(max_size=10, ttl=60)
+
+    assert await cache.get("chris@example.com") is None
+
+    with freeze_time("2026-01-13 12:00:00") as frozen:
+        await cache.set(
+            "chris@example.com", SNAPSHOT, frozen().timestamp() + 60
+        )
+
+        assert await cache.get("chris@example.com") == SNAPSHOT
+
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_entry_expires_after_ttl():
+    cache = InMemoryPrincipalCache(max_size=10, ttl=60)
+
+    with freeze_time("2026-01-13 12:00:00") as frozen:
+        await cache.set(
+            "chris@example.com", SNAPSHOT, frozen().timestamp() + 3600
+        )
+
+    with freeze_time("2026-01-13 12:01:01"):
+        assert await cache.get("chris@example.com") is None
+
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_cache_entry_never_outlives_the_token():
+    cache = InMemoryPrincipalCache(max_size=10, ttl=3600)
+
+    with freeze_time("2026-01-13 12:00:00") as frozen:
+        await cache.set(
+            "chris@example.com", SNAPSHOT, frozen().timestamp() + 5
+        )
+
+    with freeze_time("2026-01-13 12:00:06"):
+        assert await cache.get("chris@example.com") is None
+
+
+@pytest.mark.asyncio
+async def test_cache_evicts_least_recently_used():
+    cache = InMemoryPrincipalCache(max_size=2, ttl=60)
+
+    with freeze_time("2026-01-13 12:00:00") as frozen:
+        expires_at = frozen().timestamp() + 60
+        await cache.set("a@example.com", {"id": 1}, expires_at)
+        await cache.set("b@example.com", {"id": 2}, expires_at)
+        await cache.get("a@example.com")
+        await cache.set("c@example.com", {"id": 3}, expires_at)
+
+        assert await cache.get("a@example.com") == {"id": 1}
+        assert await cache.get("b@example.com") is None
+        assert await cache.get("c@example.com") == {"id": 3}
+
+
+@pytest.mark.asyncio
+async def test_cache_delete():
+    cache = InMemoryPrincipalCache(max_size=10, ttl=60)
+
+    with freeze_time("2026-01-13 12:00:00") as frozen:
+        await cache.set(
+            "chris@example.com", SNAPSHOT, frozen().timestamp() + 60
+        )
+        await cache.delete("chris@example.com")
+
+        assert await cache.get("chris@example.com") is None
@@ -1,9 +1,18 @@
 from dataclasses import asdict
+from types import SimpleNamespace
 
 import pytest
-from sqlalchemy import select
+from sqlalchemy import select, text
+from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
+from src.todo_list.database import (
+    engine_options,
+    limit_transactions,
+    make_engine,
+    set_prepared_max,
+)
 from src.todo_list.models import User
 
 
@@ -19,7 +28,9 @@ async def test_create_user(session: AsyncSession, mock_db_time):
         await session.commit()
 
         user = await session.scalar(
-            select(User).where(User.email == "chris@example.com")
+            select(User)
+            .options(selectinload(User.todos))
+            .where(User.email == "chris@example.com")
         )
 
     assert asdict(user) == {  # pyright: ignore[reportArgumentType]
@@ -29,5 +40,120 @@ async def test_create_user(session: AsyncSession, mock_db_time):
         "password": "secret",
         "created_at": time,
         "updated_at": time,
+        "deleted_at": None,
         "todos": [],
     }
+
+
+@pytest.mark.asyncio
+async def test_user_todos_are_not_loaded_by_default(session: AsyncSession):
+    session.add(
+        User(name="Christian", email="chris@example.com", password="secret")
+    )
+    await session.commit()
+    session.expunge_all()
+
+    user = await session.scalar(
+        select(User).where(User.email == "chris@example.com")
+    )
+
+    with pytest.raises(InvalidRequestError):
+        user.todos  # pyright: ignore[reportOptionalMemberAccess]
+
+
+def test_engine_options_come_from_settings(settings):
+    expected_pool_size = 20
+    settings = settings.model_copy(
+        update={"DB_POOL_SIZE": expected_pool_size, "DB_POOL_PRE_PING": True}
+    )
+
+    options = engine_options(settings)
+
+    assert options["pool_size"] == expected_pool_size
+    assert options["pool_pre_ping"] is True
+
+
+@pytest.mark.parametrize(
+    ("pgbouncer_mode", "prepare_threshold"), [(False, 5), (True, None)]
+)
+def test_engine_options_prepare_threshold_for_psycopg(
+    settings, pgbouncer_mode, prepare_threshold
+):
+    settings = settings.model_copy(
+        update={
+            "DATABASE_URL": "postgresql+psycopg://app:secret@db/app",
+            "DB_PREPARE_THRESHOLD": 5,
+            "DB_PGBOUNCER_MODE": pgbouncer_mode,
+        }
+    )
+
+    options = engine_options(settings)
+
+    assert options["connect_args"] == {"prepare_threshold": prepare_threshold}
+
+
+def test_engine_options_skip_connect_args_for_other_drivers(settings):
+    settings = settings.model_copy(
+        update={"DATABASE_URL": "sqlite+aiosqlite:///todo.db"}
+    )
+
+    assert "connect_args" not in engine_options(settings)
+
+
+def test_set_prepared_max_sizes_the_psycopg_cache():
+    expected_prepared_max = 42
+    connection = SimpleNamespace(
+        driver_connection=SimpleNamespace(prepared_max=100)
+    )
+
+    set_prepared_max(expected_prepared_max)(connection, None)
+
+    assert connection.driver_connection.prepared_max == expected_prepared_max
+
+
+def test_make_engine_keeps_prepared_max_default_for_pgbouncer(settings):
+    def connect_listeners(pgbouncer_mode: bool) -> int:
+        engine = make_engine(
+            settings.model_copy(
+                update={
+                    "DATABASE_URL": "postgresql+psycopg://app:secret@db/app",
+                    "DB_PGBOUNCER_MODE": pgbouncer_mode,
+                }
+            )
+        )
+        return len(engine.sync_engine.pool.dispatch.connect)
+
+    assert connect_listeners(False) == connect_listeners(True) + 1
+
+
+@pytest.mark.asyncio
+async def test_limit_transactions_covers_open_and_later_transactions(
+    session: AsyncSession,
+):
+    if session.bind.dialect.name != "postgresql":
+        pytest.skip("transaction_timeout needs Postgres")
+
+    await session.execute(select(1))
+    await limit_transactions(session, 1.5)
+    open_timeout = await session.scalar(text("SHOW transaction_timeout"))
+    await session.commit()
+    later_timeout = await session.scalar(text("SHOW transaction_timeout"))
+
+    assert open_timeout == later_timeout == "1500ms"
+
+
+@pytest.mark.asyncio
+async def test_limit_transactions_stays_on_the_session(
+    session: AsyncSession,
+):
+    if session.bind.dialect.name != "postgresql":
+        pytest.skip("transaction_timeout needs Postgres")
+
+    await limit_transactions(session, 1.5)
+    await session.execute(select(1))
+    await session.commit()
+
+    async with AsyncSession(session.bind) as other:
+        timeout = await other.scalar(text("SHOW transaction_timeout"))
+
+    assert timeout == "0"
@@ -0,0 +1,135 @@
+import csv
+import json
+import os
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.todo_list.exports import EXPORT_FIELDS, export_todos
+from src.todo_list.models import Todo, TodoState, User
+from src.todo_list.schemas import Token
+
+RSS_BUDGET_BYTES = 64 * 1024 * 1024
+
+
+def current_rss() -> int:
+    with open("/proc/self/statm", encoding="ascii") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+async def seed_todos(session: AsyncSession, user_id: int, count: int):
+    """
+    Generate the rows inside the database, so seeding a million todos
+    doesn't cost a million Python dicts.
+    """
+    numbers = select(literal(1).label("n")).cte("numbers", recursive=True)
+    numbers = numbers.union_all(
+        select(numbers.c.n + 1).where(numbers.c.n < count)
+    )
+
+    await session.execute(
+        insert(Todo).from_select(
+            ["title", "description", "state", "user_id"],
+            select(
+                literal("todo ").concat(numbers.c.n),
+                literal("exported todo number ").concat(numbers.c.n),
+                literal(TodoState.todo.name),
+                literal(user_id),
+            ),
+        )
+    )
+    await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson(
+    client: TestClient, token: Token, user: User, session: AsyncSession
+):
+    expected_todos = 3
+    await seed_todos(session, user.id, expected_todos)
+
+    response = client.get(
+        "/todos/export", headers={"Authorization": f"Bearer {token}"}
+    )
+    todos = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert len(todos) == expected_todos
+    assert todos[0]["title"] == "todo 1"
+    assert list(todos[0]) == EXPORT_FIELDS
+
+
+@pytest.mark.asyncio
+async def test_export_csv(
+    client: TestClient, token: Token, user: User, session: AsyncSession
+):
+    await seed_todos(session, user.id, 2)
+
+    response = client.get(
+        "/todos/export?format=csv",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    rows = list(csv.DictReader(StringIO(response.text)))
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["content-disposition"] == (
+        'attachment; filename="todos.csv"'
+    )
+    assert [row["description"] for row in rows] == [
+        "exported todo number 1",
+        "exported todo number 2",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_export_skips_deleted_and_other_users_todos(
+    client: TestClient,
+    token: Token,
+    user: User,
+    other_user: User,
+    session: AsyncSession,
+):
+    await seed_todos(session, user.id, 2)
+    await seed_todos(session, other_user.id, 2)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    client.delete("/todos/1", headers=headers)
+    response = client.get("/todos/export", headers=headers)
+
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [
+        2
+    ]
+
+
+def test_export_unknown_format(client: TestClient, token: Token):
+    response = client.get(
+        "/todos/export?format=xml",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(
+    not os.path.exists("/proc/self/statm"), reason="needs /proc"
+)
+async def test_export_a_million_todos_in_constant_memory(
+    user: User, session: AsyncSession
+):
+    expected_todos = 1_000_000
+    await seed_todos(session, user.id, expected_todos)
+
+    baseline = peak = current_rss()
+    exported = 0
+    async for chunk in export_todos(session, user.id, "ndjson"):
+        exported += chunk.count("\n")
+        peak = max(peak, current_rss())
+
+    assert exported == expected_todos
+    assert peak - baseline < RSS_BUDGET_BYTES
@@ -0,0 +1,272 @@
+import json
+import os
+from http import HTTPStatus
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.todo_list.events import InMemoryChangeFeed
+from src.todo_list.imports import import_todos, read_lines
+from src.todo_list.models import Todo, TodoState, User
+from src.todo_list.routers import todos
+from src.todo_list.schemas import Token
+
+RSS_BUDGET_BYTES = 64 * 1024 * 1024
+
+
+def current_rss() -> int:
+    with open("/proc/self/statm", encoding="ascii") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+def ndjson(*records) -> str:
+    return "".join(
+        (record if isinstance(record, str) else json.dumps(record)) + "\n"
+        for record in records
+    )
+
+
+@pytest.mark.asyncio
+async def test_read_lines_across_chunks():
+    data = "première ligne\nsecond line\nno newline".encode()
+
+    lines = [
+        line async for batch in read_lines(chunked(data, 3)) for line in batch
+    ]
+
+    assert lines == ["première ligne", "second line", "no newline"]
+
+
+def test_import_ndjson(client: TestClient, token: Token):
+    headers = {"Authorization": f"Bearer {token}"}
+    body = ndjson(
+        {"title": "first", "description": "imported", "state": "doing"},
+        {"title": "second", "description": "imported"},
+        "",
+    )
+
+    response = client.post("/todos/import", headers=headers, content=body)
+    listed = client.get("/todos/", headers=headers).json()["todos"]
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {"imported": 2, "failed": 0, "errors": []}
+    assert sorted((todo["title"], todo["state"]) for todo in listed) == [
+        ("first", "doing"),
+        ("second", "todo"),
+    ]
+
+
+def test_import_reports_row_errors(client: TestClient, token: Token):
+    body = ndjson(
+        {"title": "ok", "description": "imported"},
+        "{not json",
+        {"title": "no description"},
+        [1, 2],
+        {"title": "bad state", "description": "x", "state": "later"},
+        {"title": "also ok", "description": "imported"},
+    )
+
+    response = client.post(
+        "/todos/import",
+        headers={"Authorization": f"Bearer {token}"},
+        content=body,
+    )
+    summary = response.json()
+
+    assert summary["imported"] == 2  # noqa: PLR2004
+    assert [error["index"] for error in summary["errors"]] == [1, 2, 3, 4]
+    assert summary["errors"][0]["detail"] == "Invalid JSON."
+    assert summary["errors"][1]["detail"].startswith("description: ")
+    assert summary["errors"][2]["detail"] == "Expected an object."
+
+
+def test_import_caps_reported_errors(
+    client: TestClient, token: Token, monkeypatch
+):
+    monkeypatch.setattr(todos.settings, "IMPORT_MAX_ERRORS", 2)
+    expected_failed = 5
+
+    response = client.post(
+        "/todos/import",
+        headers={"Authorization": f"Bearer {token}"},
+        content=ndjson(*["{"] * expected_failed),
+    )
+
+    assert response.json()["failed"] == expected_failed
+    assert len(response.json()["errors"]) == 2  # noqa: PLR2004
+
+
+def test_import_csv(client: TestClient, token: Token):
+    headers = {"Authorization": f"Bearer {token}"}
+    body = (
+        "title,description,state\r\n"
+        'first,"spans\r\ntwo lines, with a ""quote""",done\r\n'
+        "short row\r\n"
+        "second,plain,draft\r\n"
+    )
+
+    response = client.post(
+        "/todos/import?format=csv", headers=headers, content=body
+    )
+    listed = client.get("/todos/", headers=headers).json()["todos"]
+
+    assert response.json()["imported"] == 2  # noqa: PLR2004
+    assert response.json()["errors"] == [
+        {"index": 1, "id": None, "detail": "Expected 3 columns."}
+    ]
+    assert {todo["title"]: todo["description"] for todo in listed} == {
+        "first": 'spans\r\ntwo lines, with a "quote"',
+        "second": "plain",
+    }
+
+
+def test_import_csv_unterminated_quote(client: TestClient, token: Token):
+    response = client.post(
+        "/todos/import?format=csv",
+        headers={"Authorization": f"Bearer {token}"},
+        content='title,description\nfirst,"never closed\n',
+    )
+
+    assert response.json()["errors"] == [
+        {"index": 0, "id": None, "detail": "Unterminated quoted field."}
+    ]
+
+
+def test_import_csv_quote_inside_unquoted_field(
+    client: TestClient, token: Token
+):
+    expected_todos = 1_001
+    body = (
+        "title,description,state\n"
+        + 'TV 55" screen,buy,todo\n'
+        + ("ok,plain,todo\n" * (expected_todos - 1))
+    )
+
+    response = client.post(
+        "/todos/import?format=csv",
+        headers={"Authorization": f"Bearer {token}"},
+        content=body,
+    )
+
+    assert response.json()["imported"] == expected_todos
+    assert response.json()["failed"] == 0
+
+
+def test_import_csv_long_unterminated_quote_fails_one_row(
+    client: TestClient, token: Token, monkeypatch
+):
+    expected_todos = 50
+    monkeypatch.setattr(todos.settings, "IMPORT_MAX_RECORD_CHARS", 100)
+    body = 'title,description,state\nfirst,"never closed,todo\n' + (
+        "ok,plain,todo\n" * expected_todos
+    )
+
+    response = client.post(
+        "/todos/import?format=csv",
+        headers={"Authorization": f"Bearer {token}"},
+        content=body,
+    )
+
+    assert response.json()["imported"] == expected_todos
+    assert response.json()["errors"] == [
+        {
+            "index": 0,
+            "id": None,
+            "detail": "Record longer than 100 characters.",
+        }
+    ]
+
+
+@pytest.mark.asyncio
+async def test_import_commits_in_chunks(
+    session: AsyncSession, user: User, change_feed: InMemoryChangeFeed
+):
+    expected_todos = 7
+    expected_commits = 5
+    expected_resets = 2
+    body = ndjson(
+        *(
+            {"title": f"todo {number}", "description": "chunked"}
+            for number in range(expected_todos)
+        )
+    ).encode()
+    commits = 0
+    commit = session.commit
+
+    async def counting_commit():
+        nonlocal commits
+        commits += 1
+        await commit()
+
+    session.commit = counting_commit
+    seen_id = change_feed.last_id
+
+    summary = await import_todos(
+        session,
+        user.id,
+        change_feed,
+        chunked(body, 10),
+        "ndjson",
+        batch_size=2,
+        reset_rows=4,
+        max_errors=10,
+        max_record_chars=1_000,
+    )
+
+    stored = await session.scalar(
+        select(func.count()).where(Todo.user_id == user.id)
+    )
+
+    stream = change_feed.stream(user.id, seen_id, heartbeat_seconds=10)
+    events = [await anext(stream) for _ in range(expected_resets)]
+    await stream.aclose()
+
+    # one before reading the body, then one per batch of 2 (the last of 1)
+    assert commits == expected_commits
+    assert summary["imported"] == stored == expected_todos
+    # subscribers are told to refetch after the first 4 rows, then at the end
+    assert [event.split("\n")[1] for event in events] == [
+        "event: reset"
+    ] * expected_resets
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(
+    not os.path.exists("/proc/self/statm"), reason="needs /proc"
+)
+async def test_import_in_constant_memory(
+    session: AsyncSession, user: User, change_feed: InMemoryChangeFeed
+):
+    expected_todos = 200_000
+    line = json.dumps({
+        "title": "imported todo",
+        "description": "x" * 200,
+        "state": TodoState.doing.value,
+    }).encode()
+
+    async def body():
+        for _ in range(expected_todos // 1_000):
+            yield b"\n".join([line] * 1_000) + b"\n"
+
+    baseline = current_rss()
+    summary = await import_todos(
+        session,
+        user.id,
+        change_feed,
+        body(),
+        "ndjson",
+        batch_size=1_000,
+        reset_rows=10_000,
+        max_errors=100,
+        max_record_chars=1_000,
+    )
+
+    assert summary["imported"] == expected_todos
+    assert current_rss() - baseline < RSS_BUDGET_BYTES
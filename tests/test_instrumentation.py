@@ -0,0 +1,117 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.todo_list.app import app
+from src.todo_list.cache import InMemoryPrincipalCache, get_principal_cache
+from src.todo_list.database import get_session
+from src.todo_list.instrumentation import (
+    Histogram,
+    InstrumentationMiddleware,
+    instrument_engine,
+    render_metrics,
+)
+from src.todo_list.revocation import get_token_denylist
+from src.todo_list.routers.metrics import get_metrics
+
+
+@pytest.fixture
+def instrumented_client(engine, session, principal_cache, token_denylist):
+    instrument_engine(engine)
+
+    app.dependency_overrides[get_session] = lambda: session
+    app.dependency_overrides[get_principal_cache] = lambda: principal_cache
+    app.dependency_overrides[get_token_denylist] = lambda: token_denylist
+
+    with TestClient(InstrumentationMiddleware(app)) as client:
+        yield client
+
+    app.dependency_overrides.clear()
+
+
+def server_timing(response) -> dict[str, float]:
+    return {
+        name: float(duration)
+        for name, duration in re.findall(
+            r"(\w+);dur=([\d.]+)", response.headers["Server-Timing"]
+        )
+    }
+
+
+def test_server_timing_reports_sql_statements(
+    instrumented_client: TestClient, token
+):
+    response = instrumented_client.get(
+        "/todos/", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert 'desc="2 queries"' in response.headers["Server-Timing"]
+    assert server_timing(response)["jwt"] > 0
+    assert set(server_timing(response)) == {
+        "db",
+        "pool",
+        "hash",
+        "jwt",
+        "total",
+    }
+
+
+def test_server_timing_reports_password_hashing(
+    instrumented_client: TestClient, user
+):
+    response = instrumented_client.post(
+        "/auth/login",
+        data={"username": user.email, "password": user.clean_password},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert server_timing(response)["hash"] > 0
+
+
+def test_requests_are_recorded_per_route(
+    instrumented_client: TestClient, token
+):
+    instrumented_client.patch(
+        "/todos/10", json={}, headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert (
+        'http_request_duration_seconds_count{method="PATCH",'
+        'route="/todos/{todo_id}"}'
+    ) in render_metrics([])
+
+
+@pytest.mark.asyncio
+async def test_metrics_exposes_cache_counters():
+    cache = InMemoryPrincipalCache(max_size=10, ttl=60)
+    await cache.get("chris@example.com")
+
+    metrics = await get_metrics(cache)
+
+    assert "principal_cache_misses_total 1" in metrics
+    assert "# TYPE http_request_duration_seconds histogram" in metrics
+
+
+@pytest.mark.asyncio
+async def test_metrics_exposes_pool_gauges():
+    metrics = await get_metrics(InMemoryPrincipalCache(max_size=10, ttl=60))
+
+    assert "# TYPE db_pool_checked_out gauge" in metrics
+    assert "# TYPE db_pool_overflow gauge" in metrics
+    assert "# TYPE db_pool_checkout_wait_seconds histogram" in metrics
+
+
+def test_histogram_without_labels():
+    histogram = Histogram("wait_seconds", "Wait.", buckets=(0.1, 1.0))
+    histogram.observe(0.5)
+
+    assert histogram.expose()[2:] == [
+        'wait_seconds_bucket{le="0.1"} 0',
+        'wait_seconds_bucket{le="1.0"} 1',
+        'wait_seconds_bucket{le="+Inf"} 1',
+        "wait_seconds_sum 0.5",
+        "wait_seconds_count 1",
+    ]
@@ -0,0 +1,114 @@
+from http import HTTPStatus
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.todo_list import limits
+from src.todo_list.cache import InMemoryPrincipalCache
+from src.todo_list.limits import (
+    ConcurrencyLimiter,
+    InMemoryRateLimiter,
+    api_rate_limit,
+)
+from src.todo_list.models import User
+from src.todo_list.routers.metrics import get_metrics
+from src.todo_list.schemas import Token
+
+
+def test_login_is_limited_per_address(
+    client: TestClient, user: User, rate_limiter: InMemoryRateLimiter
+):
+    attempts = [
+        client.post(
+            "/auth/login", data={"username": user.email, "password": "wrong"}
+        )
+        for _ in range(6)
+    ]
+
+    assert [response.status_code for response in attempts] == [
+        *[HTTPStatus.UNAUTHORIZED] * 5,
+        HTTPStatus.TOO_MANY_REQUESTS,
+    ]
+    # A token every 6 seconds (10 per minute)
+    assert 0 < int(attempts[-1].headers["Retry-After"]) <= 6  # noqa: PLR2004
+    assert rate_limiter.rejected == {"login": 1}
+
+
+def test_api_is_limited_per_user(
+    client: TestClient,
+    other_user: User,
+    token: Token,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(api_rate_limit, "burst", 2)
+    monkeypatch.setattr(api_rate_limit, "rate", 0.01)
+    other_token = client.post(
+        "/auth/login",
+        data={"username": other_user.email, "password": "mockmock"},
+    ).json()["access_token"]
+
+    def list_todos(token: str) -> int:
+        return client.get(
+            "/todos/", headers={"Authorization": f"Bearer {token}"}
+        ).status_code
+
+    assert [list_todos(token) for _ in range(3)] == [
+        HTTPStatus.OK,
+        HTTPStatus.OK,
+        HTTPStatus.TOO_MANY_REQUESTS,
+    ]
+    assert list_todos(other_token) == HTTPStatus.OK
+
+
+@pytest.mark.asyncio
+async def test_bucket_refills_at_its_rate(monkeypatch: pytest.MonkeyPatch):
+    now = 100.0
+    monkeypatch.setattr(limits, "monotonic", lambda: now)
+    limiter = InMemoryRateLimiter(max_keys=1)
+
+    taken = [await limiter.take("api", "a", 2, 2) for _ in range(3)]
+    now += 0.5
+    refilled = await limiter.take("api", "a", 2, 2)
+    await limiter.take("api", "b", 2, 2)
+
+    assert taken == [0, 0, 0.5]
+    assert refilled == 0
+    assert limiter.rejected == {"api": 1}
+    assert len(limiter) == 1
+
+
+def test_route_over_its_cap_gets_503(
+    client: TestClient, token: Token, concurrency_limiter: ConcurrencyLimiter
+):
+    headers = {"Authorization": f"Bearer {token}"}
+    concurrency_limiter.limits["get_all_todos"] = 1
+    concurrency_limiter.acquire("get_all_todos")
+
+    busy = client.get("/todos/", headers=headers)
+    other_route = client.get("/todos/stats", headers=headers)
+    concurrency_limiter.release("get_all_todos")
+    admitted = client.get("/todos/", headers=headers)
+
+    assert busy.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert busy.headers["Retry-After"] == "1"
+    assert other_route.status_code == HTTPStatus.OK
+    assert admitted.status_code == HTTPStatus.OK
+    assert concurrency_limiter.rejected == {"get_all_todos": 1}
+    assert concurrency_limiter.in_flight["get_all_todos"] == 0
+
+
+def test_concurrency_cap_of_zero_means_unlimited():
+    limiter = ConcurrencyLimiter(default_limit=1, limits={"events": 0})
+
+    assert limiter.acquire("events")
+    assert limiter.acquire("events")
+    assert limiter.acquire("other")
+    assert not limiter.acquire("other")
+
+
+@pytest.mark.asyncio
+async def test_metrics_expose_rejections():
+    metrics = await get_metrics(InMemoryPrincipalCache(max_size=10, ttl=60))
+
+    assert "# TYPE rate_limit_rejected_total counter" in metrics
+    assert "# TYPE route_concurrency_rejected_total counter" in metrics
@@ -0,0 +1,153 @@
+from datetime import datetime, timedelta
+from http import HTTPStatus
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.todo_list.events import InMemoryChangeFeed
+from src.todo_list.models import Todo, User
+from src.todo_list.purge import TrashPurger
+from src.todo_list.schemas import Token
+from src.todo_list.stats import check_todo_counts
+
+LONG_AGO = datetime(2000, 1, 1)
+
+
+@pytest.fixture
+def purger(engine, change_feed: InMemoryChangeFeed):
+    return TrashPurger(
+        engine,
+        change_feed,
+        batch_size=2,
+        pause_seconds=0,
+        interval_seconds=60,
+        trash_after=timedelta(days=30),
+        tombstone_retention=timedelta(days=30),
+    )
+
+
+def create_todos(client: TestClient, token: Token, *states: str) -> list[int]:
+    response = client.post(
+        "/todos/bulk",
+        headers={"Authorization": f"Bearer {token}"},
+        json={
+            "todos": [
+                {"title": state, "description": "purge", "state": state}
+                for state in states
+            ]
+        },
+    )
+
+    return [todo["id"] for todo in response.json()["todos"]]
+
+
+@pytest.mark.asyncio
+async def test_delete_user_only_marks_it(
+    client: TestClient, user: User, token: Token, session: AsyncSession
+):
+    client.delete(
+        f"/users/{user.id}", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    deleted_at = await session.scalar(
+        select(User.deleted_at).where(User.id == user.id)
+    )
+    response = client.get(f"/users/{user.id}")
+    login = client.post(
+        "/auth/login",
+        data={"username": user.email, "password": user.clean_password},  # pyright: ignore[reportAttributeAccessIssue]
+    )
+
+    assert deleted_at is not None
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert login.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_deleted_users_email_can_be_reused(
+    client: TestClient, user: User, token: Token
+):
+    client.delete(
+        f"/users/{user.id}", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    response = client.post(
+        "/users/",
+        json={"name": "again", "email": user.email, "password": "secret"},
+    )
+
+    assert response.status_code == HTTPStatus.CREATED
+
+
+@pytest.mark.asyncio
+async def test_purge_removes_deleted_users_in_batches(  # noqa: PLR0913, PLR0917
+    client: TestClient,
+    user: User,
+    other_user: User,
+    token: Token,
+    session: AsyncSession,
+    purger: TrashPurger,
+):
+    create_todos(client, token, "todo", "doing", "done", "draft", "todo")
+    client.delete(
+        f"/users/{user.id}", headers={"Authorization": f"Bearer {token}"}
+    )
+    expected_todos = 5
+
+    await purger.purge()
+
+    users = await session.scalars(select(User.id))
+    todos = await session.scalar(select(func.count()).select_from(Todo))
+    assert users.all() == [other_user.id]
+    assert todos == 0
+    assert purger.purged_todos == expected_todos
+    assert purger.purged_users == 1
+    # Three for the todos, one for the user, one per phase with nothing to do
+    assert purger.batches == 6  # noqa: PLR2004
+
+
+@pytest.mark.asyncio
+async def test_purge_deletes_old_trash_and_tombstones(  # noqa: PLR0913, PLR0917
+    client: TestClient,
+    user: User,
+    token: Token,
+    session: AsyncSession,
+    change_feed: InMemoryChangeFeed,
+    purger: TrashPurger,
+):
+    old_trash, new_trash, old_tombstone, new_tombstone = create_todos(
+        client, token, "trash", "trash", "done", "done"
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+    client.delete(f"/todos/{old_tombstone}", headers=headers)
+    client.delete(f"/todos/{new_tombstone}", headers=headers)
+    await session.execute(
+        update(Todo).where(Todo.id == old_trash).values(updated_at=LONG_AGO)
+    )
+    await session.execute(
+        update(Todo)
+        .where(Todo.id == old_tombstone)
+        .values(deleted_at=LONG_AGO)
+    )
+    await session.commit()
+    stream = change_feed.stream(user.id, change_feed.last_id, 10)
+
+    await purger.purge()
+
+    todos = await session.execute(
+        select(Todo.id, Todo.deleted_at.is_not(None)).order_by(Todo.id)
+    )
+    assert todos.tuples().all() == [
+        (old_trash, True),
+        (new_trash, False),
+        (new_tombstone, True),
+    ]
+    assert purger.trashed_todos == 1
+    assert purger.purged_todos == 1
+    assert await check_todo_counts(session, user.id) == []
+    assert f'"id": {old_trash}' in await anext(stream)
+    await stream.aclose()
+
+    response = client.get("/todos/stats", headers=headers)
+    assert response.json()["counts"]["trash"] == 1
@@ -1,9 +1,19 @@
 from http import HTTPStatus
+from threading import current_thread
 
+import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
+from freezegun import freeze_time
 from jwt import decode
 
-from src.todo_list.security import create_access_token
+from src.todo_list.revocation import TokenDenylist
+from src.todo_list.security import (
+    HashingPool,
+    create_access_token,
+    get_password_hash,
+    hashing_pool,
+)
 from src.todo_list.settings import Settings
 
 
@@ -50,3 +60,121 @@ def test_get_current_user_does_not_exists(client: TestClient):
 
     assert response.status_code == HTTPStatus.UNAUTHORIZED
     assert response.json() == {"detail": "Could not validate credentials."}
+
+
+def test_get_current_user_is_served_from_cache(
+    client: TestClient, user, token, principal_cache, count_queries
+):
+    headers = {"Authorization": f"Bearer {token}"}
+    client.post("/auth/refresh_token", headers=headers)
+
+    with count_queries() as statements:
+        response = client.post("/auth/refresh_token", headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    assert not statements
+    assert principal_cache.hits == 1
+    assert principal_cache.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_runs_off_the_event_loop():
+    pool = HashingPool(max_workers=1, max_pending=1)
+
+    thread_name = await pool.run(lambda: current_thread().name)
+
+    assert thread_name.startswith("password-hash")
+    assert pool.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_rejects_when_full():
+    pool = HashingPool(max_workers=1, max_pending=0)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await pool.run(get_password_hash, "secret")
+
+    assert exc_info.value.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert pool.rejected == 1
+
+
+def test_login_returns_503_when_hashing_pool_is_full(
+    client: TestClient, user, monkeypatch
+):
+    monkeypatch.setattr(hashing_pool, "max_pending", 0)
+
+    response = client.post(
+        "auth/login",
+        data={"username": user.email, "password": user.clean_password},
+    )
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_access_token_carries_user_id(settings: Settings):
+    token = create_access_token({"sub": "test@test", "uid": 1})
+
+    decoded = decode(token, settings.SECRET_KEY, algorithms=settings.ALGORITHM)
+
+    assert decoded["uid"] == 1
+    assert "iat" in decoded
+
+
+def test_todo_routes_need_no_user_lookup(
+    client: TestClient, user, token, count_queries
+):
+    with count_queries() as statements:
+        response = client.get(
+            "/todos/", headers={"Authorization": f"Bearer {token}"}
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert not any("FROM users" in statement for statement, _ in statements)
+
+
+def test_get_current_principal_requires_user_id_claim(client: TestClient):
+    token = create_access_token({"sub": "test@test"})
+
+    response = client.get(
+        "/todos/", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_revoked_token_is_rejected(client: TestClient, user, token):
+    client.delete(
+        f"/users/{user.id}", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    response = client.get(
+        "/todos/", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_token_issued_after_revocation_is_accepted(
+    client: TestClient, user, token_denylist: TokenDenylist
+):
+    token_denylist.revoke(user.id)
+    token = create_access_token({"sub": user.email, "uid": user.id})
+
+    response = client.get(
+        "/todos/", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_denylist_forgets_revocations_older_than_token_lifetime():
+    token_denylist = TokenDenylist(token_lifetime=60)
+
+    with freeze_time("2026-01-13 12:00:00"):
+        token_denylist.revoke(1)
+
+    with freeze_time("2026-01-13 12:01:01"):
+        token_denylist.revoke(2)
+
+    assert len(token_denylist) == 1
@@ -0,0 +1,92 @@
+from http import HTTPStatus
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.todo_list.models import TodoCount, TodoState, User
+from src.todo_list.schemas import Token
+from src.todo_list.stats import (
+    CountMismatch,
+    check_todo_counts,
+    rebuild_todo_counts,
+)
+
+
+def test_stats_without_todos(client: TestClient, token: Token):
+    response = client.get(
+        "/todos/stats", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        "counts": dict.fromkeys(
+            ["draft", "todo", "doing", "done", "trash"], 0
+        ),
+        "total": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_every_write_path_keeps_counters_in_sync(
+    client: TestClient, token: Token, user: User, session: AsyncSession
+):
+    headers = {"Authorization": f"Bearer {token}"}
+    expected_total = 3
+
+    def todo(state: str) -> dict:
+        return {"title": state, "description": "counted", "state": state}
+
+    client.post("/todos/", headers=headers, json=todo("draft"))
+    client.post(
+        "/todos/bulk",
+        headers=headers,
+        json={"todos": [todo("todo"), todo("todo"), todo("doing")]},
+    )
+    client.post(
+        "/todos/import",
+        headers=headers,
+        content='{"title": "imported", "description": "counted"}\n',
+    )
+    client.patch("/todos/1", headers=headers, json={"state": "done"})
+    client.patch(
+        "/todos/bulk",
+        headers=headers,
+        json={"todos": [{"id": 2, "state": "done"}, {"id": 3, "title": "x"}]},
+    )
+    client.delete("/todos/4", headers=headers)
+    client.request("DELETE", "/todos/bulk", headers=headers, json={"ids": [5]})
+
+    response = client.get("/todos/stats", headers=headers)
+
+    assert response.json()["counts"] == {
+        "draft": 0,
+        "todo": 1,
+        "doing": 0,
+        "done": 2,
+        "trash": 0,
+    }
+    assert response.json()["total"] == expected_total
+    assert await check_todo_counts(session, user.id) == []
+
+
+@pytest.mark.asyncio
+async def test_check_and_rebuild_counters(
+    client: TestClient, token: Token, user: User, session: AsyncSession
+):
+    headers = {"Authorization": f"Bearer {token}"}
+    client.post(
+        "/todos/",
+        headers=headers,
+        json={"title": "a", "description": "b", "state": "doing"},
+    )
+    await session.execute(update(TodoCount).values(count=5))
+    await session.commit()
+
+    mismatches = await check_todo_counts(session)
+    await rebuild_todo_counts(session, user.id)
+
+    assert mismatches == [CountMismatch(user.id, TodoState.doing, 5, 1)]
+    assert await check_todo_counts(session) == []
+    assert client.get("/todos/stats", headers=headers).json()["total"] == 1
@@ -0,0 +1,187 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.todo_list.models import QueuedTask, table_registry
+from src.todo_list.tasks import TaskRunner, enqueue, utcnow
+
+
+@pytest_asyncio.fixture(params=["database", "sqlite"])
+async def queue_engine(request, session, engine, tmp_path):
+    """
+    The test database, and a local SQLite queue.
+    """
+    if request.param == "database":
+        yield engine
+        return
+
+    pytest.importorskip("aiosqlite")
+    sqlite = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/tasks.db")
+    async with sqlite.begin() as conn:
+        await conn.run_sync(table_registry.metadata.create_all)
+
+    yield sqlite
+
+    await sqlite.dispose()
+
+
+@pytest.fixture
+def runner(queue_engine):
+    return TaskRunner(
+        queue_engine,
+        workers=4,
+        poll_seconds=0.01,
+        lease_seconds=60,
+        max_attempts=3,
+        retry_base_seconds=10,
+        retry_max_seconds=25,
+        shutdown_seconds=0.1,
+    )
+
+
+async def add_tasks(queue_engine, kind: str, *payloads: dict):
+    async with AsyncSession(queue_engine) as session:
+        for payload in payloads:
+            enqueue(session, kind, payload)
+        await session.commit()
+
+
+async def queued(queue_engine) -> list[QueuedTask]:
+    async with AsyncSession(queue_engine) as session:
+        tasks = await session.scalars(
+            select(QueuedTask).order_by(QueuedTask.id)
+        )
+        return list(tasks.all())
+
+
+async def wait_until(condition):
+    async with asyncio.timeout(2):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_task_runs_once_its_transaction_commits(
+    runner: TaskRunner, queue_engine
+):
+    payloads = []
+
+    @runner.handler("record")
+    async def record(payload: dict):
+        payloads.append(payload)
+
+    async with AsyncSession(queue_engine) as session:
+        enqueue(session, "record", {"n": 1})
+        assert await runner.run_due() == 0
+        await session.commit()
+
+    assert await runner.run_due() == 1
+    assert payloads == [{"n": 1}]
+    assert runner.completed == 1
+    assert await queued(queue_engine) == []
+
+
+@pytest.mark.asyncio
+async def test_failing_task_is_retried_with_backoff_then_failed(
+    runner: TaskRunner, queue_engine
+):
+    @runner.handler("broken", max_attempts=2)
+    async def broken(payload: dict):
+        raise ValueError("boom")
+
+    await add_tasks(queue_engine, "broken", {})
+    before = utcnow()
+
+    await runner.run_due()
+    [task] = await queued(queue_engine)
+
+    assert task.attempts == 1
+    assert task.last_error == "ValueError: boom"
+    assert task.run_after >= before + timedelta(seconds=10)
+    assert await runner.run_due() == 0
+
+    async with AsyncSession(queue_engine) as session:
+        await session.execute(update(QueuedTask).values(run_after=before))
+        await session.commit()
+    await runner.run_due()
+    [task] = await queued(queue_engine)
+
+    assert task.attempts == 2  # noqa: PLR2004
+    assert task.failed_at is not None
+    assert (runner.retried, runner.failed) == (1, 1)
+    assert await runner.run_due() == 0
+
+
+def test_backoff_doubles_up_to_the_cap(runner: TaskRunner):
+    assert [runner.backoff_seconds(attempt) for attempt in (1, 2, 3)] == [
+        10,
+        20,
+        25,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_limited_per_kind(
+    runner: TaskRunner, queue_engine
+):
+    release = asyncio.Event()
+    expected_tasks = 3
+
+    @runner.handler("slow", concurrency=2)
+    async def slow(payload: dict):
+        await release.wait()
+
+    await add_tasks(queue_engine, "slow", {}, {}, {})
+    await runner.start()
+
+    await wait_until(lambda: runner.running == 2)  # noqa: PLR2004
+    await asyncio.sleep(0.05)
+    assert runner.running == 2  # noqa: PLR2004
+
+    release.set()
+    await wait_until(lambda: runner.completed == expected_tasks)
+    await runner.stop()
+
+    assert await queued(queue_engine) == []
+
+
+@pytest.mark.asyncio
+async def test_stop_requeues_unfinished_tasks(
+    runner: TaskRunner, queue_engine
+):
+    @runner.handler("stuck")
+    async def stuck(payload: dict):
+        await asyncio.Event().wait()
+
+    await add_tasks(queue_engine, "stuck", {})
+    await runner.start()
+    await wait_until(lambda: runner.running == 1)
+
+    await runner.stop()
+    [task] = await queued(queue_engine)
+
+    assert runner.running == 0
+    assert task.attempts == 0
+    assert task.run_after <= utcnow()
+
+
+@pytest.mark.asyncio
+async def test_claims_skip_locked_tasks(runner: TaskRunner, queue_engine):
+    if queue_engine.dialect.name != "postgresql":
+        pytest.skip("Row locks need Postgres")
+
+    @runner.handler("locked")
+    async def locked(payload: dict): ...
+
+    await add_tasks(queue_engine, "locked", {})
+
+    async with queue_engine.connect() as conn:
+        await conn.execute(select(QueuedTask.id).with_for_update())
+
+        assert await runner.run_due() == 0
+
+    assert await runner.run_due() == 1
@@ -1,3 +1,4 @@
+import re
 from http import HTTPStatus
 
 import factory.fuzzy
@@ -5,12 +6,18 @@ import pytest
 from factory.base import Factory
 from factory.faker import Faker
 from fastapi.testclient import TestClient
-from sqlalchemy import select
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.todo_list import responses
 from src.todo_list.models import Todo, TodoState, User
+from src.todo_list.pagination import encode_change_cursor, encode_cursor
+from src.todo_list.routers import todos
 from src.todo_list.schemas import Token
 
+SEQUENTIAL_SCAN = re.compile(r"Seq Scan on todos|SCAN todos")
+CHANGES_CURSOR = encode_change_cursor(1, 2)
+
 
 class TodoFactory(Factory):
     class Meta:  # pyright: ignore
@@ -159,6 +166,36 @@ async def test_get_all_todos_filter_state_should_return_5_todos(
     assert len(response.json()["todos"]) == expected_todos
 
 
+@pytest.mark.asyncio
+async def test_get_all_todos_filter_several_states(
+    session: AsyncSession, client: TestClient, user: User, token: Token
+):
+    session.add_all([
+        TodoFactory(user_id=user.id, state=state) for state in TodoState
+    ])
+    await session.commit()
+
+    response = client.get(
+        "/todos/?state=draft&state=done&state=doing",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert sorted(todo["state"] for todo in response.json()["todos"]) == [
+        "doing",
+        "done",
+        "draft",
+    ]
+
+
+def test_get_all_todos_filter_unknown_state(client: TestClient, token: Token):
+    response = client.get(
+        "/todos/?state=doing&state=later",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
 @pytest.mark.asyncio
 async def test_get_all_todos_should_return_all_expected_fields(
     session: AsyncSession,
@@ -190,6 +227,29 @@ async def test_get_all_todos_should_return_all_expected_fields(
     ]
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("url", ["/todos/?limit=2", "/todos/changes"])
+async def test_fast_json_matches_validated_response(  # noqa: PLR0913, PLR0917
+    session: AsyncSession,
+    client: TestClient,
+    user: User,
+    token: Token,
+    monkeypatch,
+    url: str,
+):
+    session.add_all(TodoFactory.create_batch(3, user_id=user.id))
+    await session.commit()
+    headers = {"Authorization": f"Bearer {token}"}
+    client.delete("/todos/3", headers=headers)
+
+    fast = client.get(url, headers=headers)
+    monkeypatch.setattr(responses.settings, "FAST_JSON_RESPONSES", False)
+    validated = client.get(url, headers=headers)
+
+    assert fast.json() == validated.json()
+    assert fast.headers.get("etag") == validated.headers.get("etag")
+
+
 def test_delete_error(client: TestClient, token: Token):
     response = client.delete(
         "/todos/10", headers={"Authorization": f"Bearer {token}"}
@@ -237,6 +297,151 @@ async def test_delete_other_user_todo(
     assert response.json() == {"detail": "Task not found."}
 
 
+@pytest.mark.asyncio
+async def test_deleted_todo_is_gone(
+    client: TestClient, token: Token, user: User, session: AsyncSession
+):
+    session.add(TodoFactory(user_id=user.id))
+    await session.commit()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    client.delete("/todos/1", headers=headers)
+
+    assert client.get("/todos/", headers=headers).json()["todos"] == []
+    assert client.delete("/todos/1", headers=headers).status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+    assert client.patch("/todos/1", headers=headers, json={}).status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+
+
+@pytest.mark.asyncio
+async def test_todo_changes_returns_upserts_and_tombstones(
+    client: TestClient,
+    token: Token,
+    user: User,
+    session: AsyncSession,
+    mock_db_time,
+):
+    with mock_db_time(model=Todo):
+        session.add_all(TodoFactory.create_batch(3, user_id=user.id))
+        await session.commit()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    first_sync = client.get("/todos/changes", headers=headers).json()
+    client.patch("/todos/2", headers=headers, json={"title": "Changed"})
+    client.delete("/todos/3", headers=headers)
+    second_sync = client.get(
+        f"/todos/changes?since={first_sync['next_cursor']}", headers=headers
+    ).json()
+
+    assert [todo["id"] for todo in first_sync["upserts"]] == [1, 2, 3]
+    assert first_sync["has_more"] is False
+    assert [todo["title"] for todo in second_sync["upserts"]] == ["Changed"]
+    assert [todo["id"] for todo in second_sync["tombstones"]] == [3]
+
+
+@pytest.mark.asyncio
+async def test_todo_changes_pages_with_cursor(
+    client: TestClient,
+    token: Token,
+    user: User,
+    session: AsyncSession,
+    mock_db_time,
+):
+    with mock_db_time(model=Todo):
+        session.add_all(TodoFactory.create_batch(5, user_id=user.id))
+        await session.commit()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    pages = []
+    url = "/todos/changes?limit=2"
+    while url:
+        data = client.get(url, headers=headers).json()
+        pages.append([todo["id"] for todo in data["upserts"]])
+        url = (
+            f"/todos/changes?limit=2&since={data['next_cursor']}"
+            if data["has_more"]
+            else None
+        )
+
+    assert pages == [[1, 2], [3, 4], [5]]
+
+
+@pytest.mark.asyncio
+async def test_todo_changes_without_new_changes_keeps_cursor(
+    client: TestClient, token: Token, user: User, session: AsyncSession
+):
+    session.add(TodoFactory(user_id=user.id))
+    await session.commit()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    cursor = client.get("/todos/changes", headers=headers).json()[
+        "next_cursor"
+    ]
+    response = client.get(f"/todos/changes?since={cursor}", headers=headers)
+
+    assert response.json() == {
+        "upserts": [],
+        "tombstones": [],
+        "next_cursor": cursor,
+        "has_more": False,
+    }
+
+
+@pytest.mark.asyncio
+async def test_todo_changes_wait_for_older_transactions(
+    client: TestClient,
+    token: Token,
+    user: User,
+    session: AsyncSession,
+    engine,
+):
+    if engine.dialect.name != "postgresql":
+        pytest.skip("SQLite never runs two writers at once")
+
+    session.add(TodoFactory(user_id=user.id, title="Before"))
+    await session.commit()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async with engine.connect() as slow_import:
+        await slow_import.execute(
+            insert(Todo).values(
+                title="Imported",
+                description="",
+                state=TodoState.todo,
+                user_id=user.id,
+            )
+        )
+        client.post(
+            "/todos/",
+            headers=headers,
+            json={"title": "Quick", "description": "", "state": "todo"},
+        )
+        during = client.get("/todos/changes", headers=headers).json()
+        await slow_import.commit()
+    after = client.get(
+        f"/todos/changes?since={during['next_cursor']}", headers=headers
+    ).json()
+
+    # "Quick" committed first but waited for the import it started after
+    assert [todo["title"] for todo in during["upserts"]] == ["Before"]
+    assert [todo["title"] for todo in after["upserts"]] == [
+        "Imported",
+        "Quick",
+    ]
+
+
+def test_todo_changes_invalid_cursor(client: TestClient, token: Token):
+    response = client.get(
+        f"/todos/changes?since={encode_cursor(1)}",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
 @pytest.mark.asyncio
 async def test_update_todo_error(client: TestClient, token: Token):
     response = client.patch(
@@ -264,3 +469,475 @@ async def test_update_todo(
 
     assert response.status_code == HTTPStatus.OK
     assert response.json()["title"] == "Test title"
+
+
+@pytest.mark.asyncio
+async def test_get_all_todos_does_not_load_user_todos(
+    session: AsyncSession,
+    client: TestClient,
+    user: User,
+    token: Token,
+    count_queries,
+):
+    # the principal comes from the token, only the ETag aggregate and the
+    # list query run
+    expected_statements = 2
+
+    session.add_all(TodoFactory.create_batch(5, user_id=user.id))
+    await session.commit()
+
+    with count_queries() as statements:
+        response = client.get(
+            "/todos/", headers={"Authorization": f"Bearer {token}"}
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(statements) == expected_statements
+
+
+@pytest.mark.asyncio
+async def test_delete_todo_does_not_load_user_todos(
+    client: TestClient,
+    token: Token,
+    user: User,
+    session: AsyncSession,
+    count_queries,
+):
+    # a single UPDATE ... RETURNING marks the todo deleted, plus the
+    # counter and list version upserts
+    expected_statements = 3
+
+    session.add_all(TodoFactory.create_batch(5, user_id=user.id))
+    await session.commit()
+
+    with count_queries() as statements:
+        response = client.delete(
+            "/todos/1", headers={"Authorization": f"Bearer {token}"}
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(statements) == expected_statements
+
+
+@pytest.mark.asyncio
+async def test_get_all_todos_not_modified_skips_list_query(
+    session: AsyncSession,
+    client: TestClient,
+    user: User,
+    token: Token,
+    count_queries,
+):
+    session.add_all(TodoFactory.create_batch(5, user_id=user.id))
+    await session.commit()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    etag = client.get("/todos/", headers=headers).headers["ETag"]
+    with count_queries() as statements:
+        response = client.get(
+            "/todos/", headers={**headers, "If-None-Match": etag}
+        )
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.headers["ETag"] == etag
+    assert response.headers["Cache-Control"] == "private, no-cache"
+    assert len(statements) == 1
+
+
+@pytest.mark.parametrize(
+    ("method", "url", "json"),
+    [
+        (
+            "POST",
+            "/todos/",
+            {"title": "t", "description": "d", "state": "todo"},
+        ),
+        ("PATCH", "/todos/1", {"title": "Changed title"}),
+        ("PATCH", "/todos/bulk", {"todos": [{"id": 1, "title": "Bulk"}]}),
+        ("DELETE", "/todos/1", None),
+    ],
+)
+def test_get_all_todos_etag_changes_after_write(
+    client: TestClient, token: Token, method: str, url: str, json: dict | None
+):
+    # Everything within the same second, on the real clock: timestamps
+    # alone couldn't tell these versions apart
+    headers = {"Authorization": f"Bearer {token}"}
+    client.post(
+        "/todos/",
+        headers=headers,
+        json={"title": "Seed", "description": "d", "state": "todo"},
+    )
+
+    etag = client.get("/todos/", headers=headers).headers["ETag"]
+    client.request(method, url, headers=headers, json=json)
+    response = client.get(
+        "/todos/", headers={**headers, "If-None-Match": etag}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["ETag"] != etag
+
+
+def test_get_all_todos_etag_changes_when_delete_and_create_keep_the_count(
+    client: TestClient, token: Token
+):
+    headers = {"Authorization": f"Bearer {token}"}
+    todo = {"title": "Same", "description": "d", "state": "todo"}
+    client.post("/todos/", headers=headers, json=todo)
+
+    etag = client.get("/todos/", headers=headers).headers["ETag"]
+    client.delete("/todos/1", headers=headers)
+    client.post("/todos/", headers=headers, json=todo)
+    response = client.get(
+        "/todos/", headers={**headers, "If-None-Match": etag}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.asyncio
+async def test_get_all_todos_etag_depends_on_query(
+    session: AsyncSession, client: TestClient, user: User, token: Token
+):
+    session.add_all(TodoFactory.create_batch(5, user_id=user.id))
+    await session.commit()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    etag = client.get("/todos/", headers=headers).headers["ETag"]
+    response = client.get(
+        "/todos/?limit=2", headers={**headers, "If-None-Match": etag}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.asyncio
+async def test_get_all_todos_cursor_pagination_walks_every_todo(
+    session: AsyncSession, client: TestClient, user: User, token: Token
+):
+    session.add_all(TodoFactory.create_batch(5, user_id=user.id))
+    await session.commit()
+
+    pages = []
+    url = "/todos/?limit=2"
+    while url:
+        response = client.get(
+            url, headers={"Authorization": f"Bearer {token}"}
+        )
+        data = response.json()
+        pages.append([todo["id"] for todo in data["todos"]])
+        url = (
+            f"/todos/?limit=2&cursor={data['next_cursor']}"
+            if data["next_cursor"]
+            else None
+        )
+
+    assert pages == [[1, 2], [3, 4], [5]]
+
+
+@pytest.mark.asyncio
+async def test_get_all_todos_cursor_overrides_offset(
+    session: AsyncSession, client: TestClient, user: User, token: Token
+):
+    session.add_all(TodoFactory.create_batch(5, user_id=user.id))
+    await session.commit()
+
+    response = client.get(
+        f"/todos/?limit=2&offset=3&cursor={encode_cursor(1)}",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert [todo["id"] for todo in response.json()["todos"]] == [2, 3]
+
+
+def test_get_all_todos_invalid_cursor(client: TestClient, token: Token):
+    response = client.get(
+        "/todos/?cursor=not-a-cursor",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("method", "url"),
+    [
+        ("GET", "/todos/"),
+        ("GET", "/todos/?state=draft"),
+        ("GET", "/todos/?state=draft&state=todo&state=doing&state=done"),
+        ("GET", "/todos/?title=todo"),
+        ("GET", "/todos/?search=todo"),
+        ("GET", f"/todos/?cursor={encode_cursor(2)}"),
+        ("GET", "/todos/changes"),
+        ("GET", f"/todos/changes?since={CHANGES_CURSOR}"),
+        ("PATCH", "/todos/1"),
+        ("DELETE", "/todos/1"),
+    ],
+)
+async def test_todo_queries_use_an_index(  # noqa: PLR0913, PLR0917
+    session: AsyncSession,
+    client: TestClient,
+    user: User,
+    token: Token,
+    count_queries,
+    explain,
+    method: str,
+    url: str,
+):
+    session.add_all(TodoFactory.create_batch(5, user_id=user.id))
+    await session.commit()
+
+    with count_queries() as statements:
+        response = client.request(
+            method,
+            url,
+            headers={"Authorization": f"Bearer {token}"},
+            json={"title": "Test title"} if method == "PATCH" else None,
+        )
+
+    todo_statements = [
+        (statement, parameters)
+        for statement, parameters in statements
+        if "todos" in statement
+    ]
+
+    assert response.status_code == HTTPStatus.OK
+    assert todo_statements
+    for statement, parameters in todo_statements:
+        plan = await explain(statement, parameters)
+        assert not SEQUENTIAL_SCAN.search(plan), plan
+
+
+@pytest.mark.asyncio
+async def test_get_all_todos_search_matches_title_or_description(
+    session: AsyncSession, client: TestClient, user: User, token: Token
+):
+    session.add_all([
+        TodoFactory(user_id=user.id, title="Buy GROCERIES", description="x"),
+        TodoFactory(user_id=user.id, title="x", description="groceries"),
+        TodoFactory(user_id=user.id, title="x", description="x"),
+    ])
+    await session.commit()
+
+    response = client.get(
+        "/todos/?search=groceries",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert sorted(todo["id"] for todo in response.json()["todos"]) == [1, 2]
+    assert response.json()["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_get_all_todos_search_ranks_best_match_first(
+    session: AsyncSession, client: TestClient, user: User, token: Token
+):
+    session.add_all([
+        TodoFactory(user_id=user.id, title="x", description="groceriesxyz"),
+        TodoFactory(user_id=user.id, title="groceries", description="x"),
+    ])
+    await session.commit()
+
+    response = client.get(
+        "/todos/?search=groceries",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert [todo["id"] for todo in response.json()["todos"]] == [2, 1]
+
+
+@pytest.mark.asyncio
+async def test_get_all_todos_search_escapes_wildcards(
+    session: AsyncSession, client: TestClient, user: User, token: Token
+):
+    session.add_all(TodoFactory.create_batch(5, user_id=user.id))
+    await session.commit()
+
+    response = client.get(
+        "/todos/?search=%25%25%25",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.json()["todos"] == []
+
+
+def test_get_all_todos_search_does_not_accept_cursor(
+    client: TestClient, token: Token
+):
+    response = client.get(
+        f"/todos/?search=groceries&cursor={encode_cursor(1)}",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_create_todos_bulk(client: TestClient, token: Token, count_queries):
+    payload = [
+        {"title": f"Todo {i}", "description": "Bulk", "state": "draft"}
+        for i in range(3)
+    ]
+
+    with count_queries() as statements:
+        response = client.post(
+            "/todos/bulk",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"todos": payload},
+        )
+
+    data = response.json()
+
+    assert response.status_code == HTTPStatus.OK
+    assert [todo["title"] for todo in data["todos"]] == [
+        "Todo 0",
+        "Todo 1",
+        "Todo 2",
+    ]
+    assert all(todo["created_at"] for todo in data["todos"])
+    assert data["errors"] == []
+    # principal lookup + a single INSERT ... RETURNING + counter and list
+    # version upserts
+    assert len(statements) == 4  # noqa: PLR2004
+
+
+def test_create_todos_bulk_rejects_oversized_batch(
+    client: TestClient, token: Token, monkeypatch
+):
+    monkeypatch.setattr(todos.settings, "BULK_MAX_ITEMS", 2)
+
+    response = client.post(
+        "/todos/bulk",
+        headers={"Authorization": f"Bearer {token}"},
+        json={
+            "todos": [{"title": "Todo", "description": "Bulk"}] * 3,
+        },
+    )
+
+    assert response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
+@pytest.mark.asyncio
+async def test_update_todos_bulk_reports_missing_items(
+    session: AsyncSession,
+    client: TestClient,
+    token: Token,
+    user: User,
+    other_user: User,
+):
+    session.add_all(TodoFactory.create_batch(2, user_id=user.id))
+    session.add(TodoFactory(user_id=other_user.id))
+    await session.commit()
+
+    response = client.patch(
+        "/todos/bulk",
+        headers={"Authorization": f"Bearer {token}"},
+        json={
+            "todos": [
+                {"id": 1, "title": "First"},
+                {"id": 3, "title": "Not mine"},
+                {"id": 2, "state": "done"},
+            ]
+        },
+    )
+
+    data = response.json()
+
+    assert response.status_code == HTTPStatus.OK
+    assert [(todo["id"], todo["title"]) for todo in data["todos"]][0] == (
+        1,
+        "First",
+    )
+    assert data["todos"][1]["state"] == "done"
+    assert data["errors"] == [
+        {"index": 1, "id": 3, "detail": "Task not found."}
+    ]
+
+    other_todo_title = await session.scalar(
+        select(Todo.title).where(Todo.user_id == other_user.id)
+    )
+    assert other_todo_title != "Not mine"
+
+
+@pytest.mark.asyncio
+async def test_delete_todos_bulk(
+    session: AsyncSession,
+    client: TestClient,
+    token: Token,
+    user: User,
+    other_user: User,
+):
+    session.add_all(TodoFactory.create_batch(2, user_id=user.id))
+    session.add(TodoFactory(user_id=other_user.id))
+    await session.commit()
+
+    response = client.request(
+        "DELETE",
+        "/todos/bulk",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"ids": [1, 3, 2, 10]},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        "deleted": [1, 2],
+        "errors": [
+            {"index": 1, "id": 3, "detail": "Task not found."},
+            {"index": 3, "id": 10, "detail": "Task not found."},
+        ],
+    }
+    assert await session.scalar(
+        select(Todo.id).where(Todo.user_id == other_user.id)
+    )
+
+
+def test_create_todo_issues_a_single_write(
+    client: TestClient, token: Token, count_queries
+):
+    expected_statements = 4
+
+    with count_queries() as statements:
+        response = client.post(
+            "/todos/",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"title": "Test todo", "description": "Test description"},
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["id"] == 1
+    assert response.json()["created_at"]
+    # principal lookup + INSERT ... RETURNING + counter and list version
+    # upserts, no refresh
+    assert len(statements) == expected_statements
+    assert "RETURNING" in statements[1][0]
+
+
+@pytest.mark.asyncio
+async def test_update_todo_issues_a_single_write(
+    client: TestClient,
+    token: Token,
+    user: User,
+    session: AsyncSession,
+    count_queries,
+):
+    expected_statements = 3
+
+    session.add(TodoFactory(user_id=user.id))
+    await session.commit()
+
+    with count_queries() as statements:
+        response = client.patch(
+            "/todos/1",
+            json={"title": "Test title"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["updated_at"]
+    # todo lookup + UPDATE ... RETURNING + list version upsert, no
+    # principal lookup or refresh
+    assert len(statements) == expected_statements
+    assert "RETURNING" in statements[1][0]
+    # The lookup locks the row whose state the todo counts replace
+    if session.bind.dialect.name == "postgresql":
+        assert "FOR UPDATE" in statements[0][0]
@@ -48,7 +48,7 @@ def test_get_all_users(client: TestClient, user: User, token):
     )
 
     assert response.status_code == HTTPStatus.OK
-    assert response.json() == {"users": [user_schema]}
+    assert response.json() == {"users": [user_schema], "next_cursor": None}
 
 
 def test_get_user(client: TestClient, user: User):
@@ -144,3 +144,155 @@ def test_exeption_delete_user(
     assert response.is_error
     assert response.status_code == HTTPStatus.FORBIDDEN
     assert response.json() == {"detail": "Not enough permissions."}
+
+
+def test_get_user_issues_a_single_statement(
+    client: TestClient, user: User, count_queries
+):
+    with count_queries() as statements:
+        response = client.get(f"/users/{user.id}")
+
+    [(statement, _)] = statements
+    assert response.status_code == HTTPStatus.OK
+    assert "password" not in statement
+
+
+def test_get_user_not_modified(client: TestClient, user: User):
+    etag = client.get(f"/users/{user.id}").headers["ETag"]
+
+    response = client.get(
+        f"/users/{user.id}", headers={"If-None-Match": f'W/{etag}, "other"'}
+    )
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert not response.content
+
+
+def test_get_user_etag_changes_after_update(
+    client: TestClient, user: User, token
+):
+    etag = client.get(f"/users/{user.id}").headers["ETag"]
+    client.put(
+        f"/users/{user.id}",
+        headers={"Authorization": f"Bearer {token}"},
+        json={
+            "name": "bob",
+            "email": "bob@example.com",
+            "password": "mynewpassword",
+        },
+    )
+
+    response = client.get(f"/users/{user.id}", headers={"If-None-Match": etag})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["name"] == "bob"
+
+
+def test_get_all_users_selects_only_public_columns(
+    client: TestClient, user: User, token, count_queries
+):
+    with count_queries() as statements:
+        response = client.get(
+            "/users/", headers={"Authorization": f"Bearer {token}"}
+        )
+
+    [(statement, _)] = statements
+    assert response.status_code == HTTPStatus.OK
+    assert "password" not in statement
+    assert "todos" not in statement
+
+
+def test_update_user_invalidates_cached_principal(
+    client: TestClient, user: User, token
+):
+    client.get("/users/", headers={"Authorization": f"Bearer {token}"})
+
+    client.put(
+        f"/users/{user.id}",
+        headers={"Authorization": f"Bearer {token}"},
+        json={
+            "name": "Gabriel",
+            "email": "gabriel@email.com",
+            "password": "123",
+        },
+    )
+
+    response = client.get(
+        "/users/", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_delete_user_invalidates_cached_principal(
+    client: TestClient, user: User, token
+):
+    client.get("/users/", headers={"Authorization": f"Bearer {token}"})
+    client.delete(
+        f"/users/{user.id}", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    response = client.get(
+        "/users/", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_get_all_users_cursor_pagination(
+    client: TestClient, user: User, other_user: User, token
+):
+    response = client.get(
+        "/users/?limit=1", headers={"Authorization": f"Bearer {token}"}
+    )
+    first_page = response.json()
+
+    response = client.get(
+        f"/users/?limit=1&cursor={first_page['next_cursor']}",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    second_page = response.json()
+
+    assert [u["id"] for u in first_page["users"]] == [user.id]
+    assert [u["id"] for u in second_page["users"]] == [other_user.id]
+
+
+def test_create_user_issues_a_single_write(client: TestClient, count_queries):
+    expected_statements = 2
+
+    with count_queries() as statements:
+        response = client.post(
+            "/users/",
+            json={
+                "name": "Christian",
+                "email": "christian@email.com",
+                "password": "12345678",
+            },
+        )
+
+    assert response.status_code == HTTPStatus.CREATED
+    # email check + INSERT ... RETURNING, no refresh
+    assert len(statements) == expected_statements
+    assert "RETURNING" in statements[-1][0]
+
+
+def test_update_user_issues_a_single_write(
+    client: TestClient, user: User, token, count_queries
+):
+    expected_statements = 2
+
+    with count_queries() as statements:
+        response = client.put(
+            f"/users/{user.id}",
+            headers={"Authorization": f"Bearer {token}"},
+            json={
+                "name": "Gabriel",
+                "email": "gabriel@email.com",
+                "password": "123",
+            },
+        )
+
+    assert response.status_code == HTTPStatus.OK
+    # principal lookup + UPDATE ... RETURNING, no refresh
+    assert len(statements) == expected_statements
+    assert "RETURNING" in statements[-1][0]